@@ -31,9 +31,58 @@ _venv_python = PROJECT_ROOT / ".venv" / "bin" / "python3"
 PROJECT_VENV_PYTHON = _venv_python if _venv_python.exists() else Path(shutil.which("python3") or "python3")
 DAILY_COST_CAP = float(os.environ.get("DAILY_COST_CAP", "0.50"))
 
+# ─── Upload limits ──────────────────────────────────
+MAX_UPLOAD_FILE_BYTES = int(os.environ.get("MAX_UPLOAD_FILE_MB", "500")) * 1024 * 1024
+MAX_UPLOAD_REQUEST_BYTES = int(os.environ.get("MAX_UPLOAD_REQUEST_MB", "1500")) * 1024 * 1024
+MAX_CONCURRENT_UPLOADS = int(os.environ.get("MAX_CONCURRENT_UPLOADS", "2"))
+
+# ─── Resumable (chunked) uploads ────────────────────
+UPLOAD_SESSIONS_DIR = LOGS_DIR / ".upload_sessions"
+UPLOAD_CHUNK_BYTES = int(os.environ.get("UPLOAD_CHUNK_MB", "4")) * 1024 * 1024
+UPLOAD_SESSION_TTL = int(os.environ.get("UPLOAD_SESSION_TTL_HOURS", "24")) * 3600
+BLOB_DIR = VIDEO_OUTPUT_DIR / ".cache" / "blobs"
+BLOB_TTL = int(os.environ.get("BLOB_TTL_HOURS", "72")) * 3600
+
+# ─── ffmpeg slot broker ─────────────────────────────
+_cpus = os.cpu_count() or 2
+FFMPEG_SLOTS = int(os.environ.get("FFMPEG_SLOTS", max(1, _cpus // 2)))
+FFMPEG_THREADS = int(os.environ.get("FFMPEG_THREADS", max(1, _cpus // FFMPEG_SLOTS)))
+FFMPEG_SLOTS_DIR = LOGS_DIR / ".ffmpeg_slots"
+
+# ─── Render scratch space ───────────────────────────
+SCRATCH_DIR = Path(os.environ.get("SCRATCH_DIR", "/dev/shm/openclaw-scratch"))
+SCRATCH_QUOTA_MB = int(os.environ.get("SCRATCH_QUOTA_MB", "1024"))
+SCRATCH_MIN_FREE_MB = int(os.environ.get("SCRATCH_MIN_FREE_MB", "256"))
+SCRATCH_RESERVE_MB = int(os.environ.get("SCRATCH_RESERVE_MB", "200"))
+
+# ─── Media serving ──────────────────────────────────
+# Internal nginx location aliased to PROJECT_ROOT; set to hand file bodies to nginx
+MEDIA_ACCEL_REDIRECT_PREFIX = os.environ.get("MEDIA_ACCEL_REDIRECT_PREFIX", "")
+
+# ─── Thumbnails ─────────────────────────────────────
+THUMBNAIL_WORKERS = int(os.environ.get("THUMBNAIL_WORKERS", "2"))
+
+# ─── Asset catalog + usage log ──────────────────────
+ASSET_CATALOG_PATH = ASSETS_DIR / ".catalog.sqlite"
+ASSET_RECONCILE_INTERVAL = int(os.environ.get("ASSET_RECONCILE_INTERVAL", "300"))
+ASSET_USAGE_DB = LOGS_DIR / "asset_usage.sqlite"
+
+# ─── Drive upload queue ─────────────────────────────
+GDRIVE_FOLDER = "manifest-social-videos"
+UPLOAD_SPOOL_DIR = VIDEO_OUTPUT_DIR / ".upload_queue"
+UPLOAD_TRANSFERS = int(os.environ.get("UPLOAD_TRANSFERS", "4"))
+UPLOAD_BATCH_SIZE = int(os.environ.get("UPLOAD_BATCH_SIZE", "20"))
+UPLOAD_MAX_ATTEMPTS = int(os.environ.get("UPLOAD_MAX_ATTEMPTS", "6"))
+
 
 ANTHROPIC_API_KEY = os.environ.get("ANTHROPIC_API_KEY", "")
 ANTHROPIC_MODEL = "claude-sonnet-4-5-20250929"
+LLM_USAGE_LOG = LOGS_DIR / "llm_usage.jsonl"  # per-call token + prompt-cache counts
+
+# ─── LLM context budget ─────────────────────────────
+# Approximate tokens of skill/memory context per generation call (0 = unlimited)
+CONTEXT_TOKEN_BUDGET = int(os.environ.get("CONTEXT_TOKEN_BUDGET", "12000"))
+CONTEXT_TOKEN_INDEX = LOGS_DIR / ".context_tokens.json"
 
 OUTREACH_OUTPUT_DIR = PROJECT_ROOT / "output" / "outreach"
 OUTREACH_DEFAULT_HOST = "smtp.zoho.com"
@@ -54,6 +103,8 @@ except _json.JSONDecodeError:
     OUTREACH_ACCOUNTS = []
 
 PERSONAS = ["aliyah", "riley", "sanya", "emilly"]
+# Clip folders under assets/ — includes pipeline-only personas the dashboard doesn't list
+ASSET_PERSONAS = PERSONAS + ["sophie"]
 PERSONA_COLORS = {
     "aliyah": "#8b5cf6",  # purple
     "riley": "#10b981",   # emerald
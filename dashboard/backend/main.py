@@ -1,12 +1,40 @@
 """OpenClaw Dashboard — FastAPI backend."""
 
-from fastapi import FastAPI
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
 
-from routers import logs, pipeline, content, knowledge, assets, chat, schedule, youtube_research, reddit_research, scout, outreach, analytics, revenue, stitcher, prompts
+import threading
+
+from config import MAX_UPLOAD_REQUEST_BYTES
+from services.asset_catalog import reconcile as reconcile_assets
+from services.blob_store import evict as evict_blobs
+from services.scratch import sweep_orphans
+from services.thumbnails import backfill as backfill_thumbnails
+from routers import logs, pipeline, content, knowledge, assets, chat, schedule, youtube_research, reddit_research, scout, outreach, analytics, revenue, stitcher, prompts, uploads
 
 app = FastAPI(title="OpenClaw Dashboard", version="1.0.0")
 
+UPLOAD_PATHS = {
+    "/api/stitcher/stitch",
+    "/api/assets/upload-clip",
+    "/api/assets/upload-reaction",
+}
+
+
+@app.middleware("http")
+async def reject_oversized_uploads(request: Request, call_next):
+    """Return 413 from Content-Length before the multipart body is read."""
+    if request.method == "POST" and request.url.path in UPLOAD_PATHS:
+        length = request.headers.get("content-length", "")
+        if length.isdigit() and int(length) > MAX_UPLOAD_REQUEST_BYTES:
+            return JSONResponse(
+                status_code=413,
+                content={"detail": f"Upload exceeds {MAX_UPLOAD_REQUEST_BYTES // (1024 * 1024)} MB limit"},
+            )
+    return await call_next(request)
+
+
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["*"],
@@ -30,6 +58,23 @@ app.include_router(analytics.router)
 app.include_router(revenue.router)
 app.include_router(stitcher.router)
 app.include_router(prompts.router)
+app.include_router(uploads.router)
+
+
+@app.on_event("startup")
+def clean_scratch():
+    """Drop render scratch dirs left behind by a previous process, and expired stitcher blobs."""
+    sweep_orphans(force=True)
+    evict_blobs(force=True)
+
+
+@app.on_event("startup")
+def warm_asset_catalog():
+    """Reconcile the asset catalog, then queue missing clip thumbnails — in the background."""
+    def warm():
+        reconcile_assets(force=True)
+        backfill_thumbnails()
+    threading.Thread(target=warm, daemon=True).start()
 
 
 @app.get("/api/health")
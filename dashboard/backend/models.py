@@ -14,6 +14,12 @@ class PipelineRun(BaseModel):
     content_angle: str = ""
     reel_path: Optional[str] = None
     cost_usd: Optional[float] = None
+    render_cache: Optional[str] = None  # "hit" | "miss"
+
+
+class Reel(PipelineRun):
+    preview_url: Optional[str] = None
+    poster_url: Optional[str] = None
 
 
 class OverviewStats(BaseModel):
@@ -89,6 +95,7 @@ class PipelineRunStatus(BaseModel):
     app: Optional[str] = None
     started_at: str
     output: str = ""
+    progress: Optional[dict] = None  # live ffmpeg stats: label, percent, fps, speed, eta_seconds
 
 
 class LifestyleReelRequest(BaseModel):
@@ -16,9 +16,14 @@ from services.posthog_client import (
     RETENTION_EVENTS,
 )
 from services.funnel_snapshots import list_snapshots, save_snapshot
+from services.prompt_cache import log_usage, system_blocks
 
 router = APIRouter(prefix="/api/analytics", tags=["analytics"])
 
+ASK_INSTRUCTIONS = """You are an analytics assistant for the OpenClaw project. You help analyze PostHog funnel and trend data for ManifestLock and JournalLock apps.
+
+Answer questions about the data below concisely. Reference specific numbers. Suggest actionable improvements when relevant."""
+
 
 @router.get("/funnel")
 async def funnel_endpoint(
@@ -70,13 +75,9 @@ async def ask_endpoint(req: AnalyticsAskRequest):
             yield f"data: {json.dumps({'type': 'error', 'content': 'ANTHROPIC_API_KEY not configured'})}\n\n"
         return StreamingResponse(error_gen(), media_type="text/event-stream")
 
-    metrics_text = await format_metrics_for_ai()
-
-    system = f"""You are an analytics assistant for the OpenClaw project. You help analyze PostHog funnel and trend data for ManifestLock and JournalLock apps.
-
-{metrics_text}
-
-Answer questions about this data concisely. Reference specific numbers. Suggest actionable improvements when relevant."""
+    # Fixed instructions first (cached), then the metrics snapshot — it only
+    # changes when PostHog data refreshes, so follow-up questions still hit
+    system = system_blocks(ASK_INSTRUCTIONS, await format_metrics_for_ai())
 
     messages = list(req.history)
     messages.append({"role": "user", "content": req.message})
@@ -93,6 +94,7 @@ Answer questions about this data concisely. Reference specific numbers. Suggest
             ) as stream:
                 for text in stream.text_stream:
                     yield f"data: {json.dumps({'type': 'chunk', 'content': text})}\n\n"
+                log_usage("analytics.ask", ANTHROPIC_MODEL, stream.get_final_message().usage)
             yield "data: [DONE]\n\n"
         except Exception as e:
             yield f"data: {json.dumps({'type': 'error', 'content': str(e)})}\n\n"
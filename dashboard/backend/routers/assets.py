@@ -1,18 +1,20 @@
 """Asset endpoints — reference images, clips, usage history."""
 
 import asyncio
-import shutil
 from pathlib import Path
+from urllib.parse import urlencode
 
-from fastapi import APIRouter, HTTPException, UploadFile, File, Form
-from fastapi.responses import FileResponse
+from fastapi import APIRouter, HTTPException, UploadFile, File, Form, Query, Request
+from fastapi.responses import FileResponse, Response
 
-from config import ASSETS_DIR, REF_IMAGES_DIR, MEMORY_DIR, PERSONAS, PROJECT_ROOT
+from config import ASSETS_DIR, REF_IMAGES_DIR, PERSONAS, PROJECT_ROOT
+from services import asset_catalog, asset_usage, clip_fingerprint, image_variants, thumbnail_atlas, thumbnails
+from services.ffmpeg_slots import apply_thread_budget, ffmpeg_slot_async
+from services.media_response import media_response
+from services.upload_streamer import save_upload
 
 router = APIRouter(prefix="/api/assets", tags=["assets"])
 
-THUMBS_DIR = ASSETS_DIR / ".thumbs"
-
 
 @router.get("/reference-images")
 def list_reference_images():
@@ -32,6 +34,8 @@ def list_reference_images():
                 "name": f.name,
                 "path": f"reference-images/{f.name}",
                 "persona": persona,
+                # Content version for immutable ?w=&v= variant URLs
+                "version": image_variants.version(f),
             })
     return images
 
@@ -42,55 +46,78 @@ def list_clips():
     clips = []
     clip_types = ["hook", "reaction", "hook-fear", "reaction-fear"]
     for persona in PERSONAS:
+        rows = asset_catalog.list_assets(persona=persona, exts=asset_catalog.VIDEO_EXTS)
         for clip_type in clip_types:
-            clip_dir = ASSETS_DIR / persona / clip_type
-            if not clip_dir.exists():
-                continue
-            for f in sorted(clip_dir.iterdir()):
-                if f.is_file() and f.suffix.lower() in (".mp4", ".mov"):
+            for row in rows:
+                if row["dir"] == f"{persona}/{clip_type}":
                     clips.append({
-                        "name": f.name,
-                        "path": f"{persona}/{clip_type}/{f.name}",
+                        "name": row["name"],
+                        "path": row["path"],
                         "persona": persona,
                         "type": clip_type,
+                        "size": row["size"],
+                        "duration": row["duration"],
                     })
     return clips
 
 
+@router.get("/duplicates")
+def list_duplicates(persona: str | None = None, threshold: float = clip_fingerprint.DEFAULT_THRESHOLD):
+    """Clusters of near-identical clips within each persona/type folder.
+
+    Distance is the mean number of differing dHash bits per sampled frame
+    (0 = identical picture, 64 = unrelated).
+    """
+    if persona is not None:
+        _validate_persona(persona)
+    by_dir: dict[str, list[dict]] = {}
+    for row in asset_catalog.fingerprinted_clips(persona):
+        by_dir.setdefault(row["dir"], []).append(row)
+
+    result = []
+    for folder, rows in by_dir.items():
+        for group in clip_fingerprint.clusters([r["dhash"] for r in rows], threshold):
+            members = [rows[i] for i, _ in group]
+            result.append({
+                "dir": folder,
+                "exact": len({m["sha256"] for m in members}) == 1,
+                "clips": [
+                    {"path": rows[i]["path"], "name": rows[i]["name"],
+                     "size": rows[i]["size"], "distance": distance}
+                    for i, distance in group
+                ],
+            })
+    return result
+
+
 @router.get("/usage")
-def get_asset_usage():
-    """Parse asset-usage.md and return structured usage data."""
-    usage_path = MEMORY_DIR / "asset-usage.md"
-    if not usage_path.exists():
-        return []
-    content = usage_path.read_text()
-    rows = []
-    in_table = False
-    for line in content.split("\n"):
-        line = line.strip()
-        if line.startswith("|") and "Date" in line and "Account" in line:
-            in_table = True
-            continue
-        if line.startswith("|---"):
-            continue
-        if in_table and line.startswith("|"):
-            parts = [p.strip() for p in line.split("|")[1:-1]]
-            if len(parts) >= 5:
-                rows.append({
-                    "date": parts[0],
-                    "account": parts[1],
-                    "hook_clip": parts[2],
-                    "reaction_clip": parts[3],
-                    "screen_recording": parts[4],
-                })
-        elif in_table and not line.startswith("|"):
-            in_table = False
-    return rows
+def get_asset_usage(limit: int = 30):
+    """Recent autopilot asset picks from the usage log."""
+    return [
+        {
+            "date": run["date"],
+            "account": run["account"],
+            "hook_clip": run["assets"].get("hook", ""),
+            "reaction_clip": run["assets"].get("reaction", ""),
+            "screen_recording": run["assets"].get("screen_rec", ""),
+        }
+        for run in asset_usage.recent_runs(source="autopilot", limit=limit)
+    ]
 
 
 @router.get("/file/{file_path:path}")
-def serve_asset(file_path: str):
-    """Serve an asset file (image or video)."""
+def serve_asset(
+    file_path: str,
+    request: Request,
+    w: int | None = Query(None, gt=0),
+    v: str | None = None,
+):
+    """Serve an asset file (image or video).
+
+    `?w=` on an image returns a resized WebP/JPEG variant (width rounded up
+    to a bucket); with `v=` set to the image's content version the response
+    is cacheable forever.
+    """
     full_path = ASSETS_DIR / file_path
     if not full_path.exists() or not full_path.is_file():
         raise HTTPException(status_code=404, detail="Asset not found")
@@ -100,6 +127,9 @@ def serve_asset(file_path: str):
     except ValueError:
         raise HTTPException(status_code=403, detail="Access denied")
 
+    if w is not None and full_path.suffix.lower() in asset_catalog.IMAGE_EXTS:
+        return _serve_variant(full_path, w, v, request)
+
     media_types = {
         ".mp4": "video/mp4",
         ".mov": "video/quicktime",
@@ -108,37 +138,96 @@ def serve_asset(file_path: str):
         ".jpeg": "image/jpeg",
     }
     media_type = media_types.get(full_path.suffix.lower(), "application/octet-stream")
-    return FileResponse(full_path, media_type=media_type)
+    return media_response(request, full_path, media_type)
+
+
+def _serve_variant(full_path: Path, width: int, v: str | None, request: Request):
+    fmt = image_variants.pick_format(request.headers.get("accept"))
+    try:
+        variant, content_version = image_variants.get_variant(full_path, width, fmt)
+    except ValueError:
+        raise HTTPException(status_code=404, detail="Asset not found")
+    headers = {
+        "ETag": f'"{variant.stem}.{fmt}"',
+        "Vary": "Accept",
+        "Cache-Control": "public, max-age=31536000, immutable" if v == content_version else "no-cache",
+    }
+    if request.headers.get("if-none-match") == headers["ETag"]:
+        return Response(status_code=304, headers=headers)
+    _, media_type = image_variants.FORMATS[fmt]
+    return FileResponse(variant, media_type=media_type, headers=headers)
 
 
 @router.get("/thumbnail/{file_path:path}")
 async def serve_thumbnail(file_path: str):
-    """Serve a cached JPEG thumbnail for a video clip (first frame)."""
+    """Serve a cached JPEG thumbnail for a video clip (first frame).
+
+    Normally pre-generated; if not, concurrent requests share one job.
+    """
     video_path = ASSETS_DIR / file_path
     if not video_path.exists() or not video_path.is_file():
         raise HTTPException(status_code=404, detail="Asset not found")
     try:
-        video_path.resolve().relative_to(ASSETS_DIR.resolve())
+        rel = video_path.resolve().relative_to(ASSETS_DIR.resolve()).as_posix()
     except ValueError:
         raise HTTPException(status_code=403, detail="Access denied")
 
-    # Cache path mirrors the video path but with .jpg extension
-    thumb_path = THUMBS_DIR / (file_path + ".jpg")
-    if not thumb_path.exists():
-        thumb_path.parent.mkdir(parents=True, exist_ok=True)
-        proc = await asyncio.create_subprocess_exec(
-            "ffmpeg", "-y", "-i", str(video_path),
-            "-vframes", "1", "-q:v", "8", "-vf", "scale=320:-2",
-            str(thumb_path),
-            stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.PIPE,
-        )
-        await proc.communicate()
-        if proc.returncode != 0 or not thumb_path.exists():
-            raise HTTPException(status_code=500, detail="Thumbnail generation failed")
+    try:
+        thumb_path = await thumbnails.get_thumbnail(rel)
+    except RuntimeError:
+        raise HTTPException(status_code=500, detail="Thumbnail generation failed")
 
     return FileResponse(thumb_path, media_type="image/jpeg")
 
 
+def _validate_atlas_selection(persona: str | None, clip_type: str | None):
+    if persona is not None:
+        _validate_persona(persona)
+    if clip_type is not None and clip_type not in thumbnail_atlas.CLIP_TYPES:
+        raise HTTPException(status_code=400, detail=f"Unknown clip type: {clip_type}")
+
+
+@router.get("/thumbnail-atlas")
+def get_thumbnail_atlas(
+    persona: str | None = None,
+    clip_type: str | None = Query(None, alias="type"),
+):
+    """Tile offsets of every clip thumbnail in a persona/type selection, plus the sheet URL.
+
+    Omitting persona or type selects all of them.
+    """
+    _validate_atlas_selection(persona, clip_type)
+    atlas = thumbnail_atlas.build(persona, clip_type)
+    params = {k: v for k, v in (("persona", persona), ("type", clip_type)) if v}
+    params["v"] = atlas["version"]
+    return {
+        **atlas,
+        "tiles": {path: {"x": t["x"], "y": t["y"]} for path, t in atlas["tiles"].items()},
+        "sheet_url": f"/api/assets/thumbnail-atlas/sheet?{urlencode(params)}",
+    }
+
+
+@router.get("/thumbnail-atlas/sheet")
+def get_thumbnail_atlas_sheet(
+    persona: str | None = None,
+    clip_type: str | None = Query(None, alias="type"),
+    v: str | None = None,
+):
+    """The atlas JPEG. Versioned URLs (?v= from the map) are cached forever."""
+    _validate_atlas_selection(persona, clip_type)
+    sheet = thumbnail_atlas.sheet_path(persona, clip_type)
+    atlas = thumbnail_atlas.build(persona, clip_type) if v is None or not sheet.exists() else None
+    current = atlas["version"] if atlas else thumbnail_atlas.current_version(persona, clip_type)
+    cache = "public, max-age=31536000, immutable" if v == current else "no-cache"
+    return FileResponse(sheet, media_type="image/jpeg", headers={"Cache-Control": cache})
+
+
+@router.post("/thumbnails/backfill")
+def backfill_thumbnails():
+    """Queue thumbnails for every clip that doesn't have one yet."""
+    return {"queued": thumbnails.backfill()}
+
+
 def _validate_persona(persona: str):
     if persona not in PERSONAS:
         raise HTTPException(status_code=400, detail=f"Unknown persona: {persona}")
@@ -162,11 +251,13 @@ async def upload_clip(
     dest_dir = ASSETS_DIR / persona / "hook"
     dest_dir.mkdir(parents=True, exist_ok=True)
     dest = dest_dir / clip_name
+    dest.unlink(missing_ok=True)  # may be a hard link shared with a byte-identical clip
 
-    with open(dest, "wb") as f:
-        shutil.copyfileobj(file.file, f)
+    saved = await save_upload(file, dest)
+    await asyncio.to_thread(asset_catalog.index_file, dest, saved["sha256"])
+    thumbnails.submit(f"{persona}/hook/{clip_name}")
 
-    return {"ok": True, "path": f"{persona}/hook/{clip_name}"}
+    return {"ok": True, "path": f"{persona}/hook/{clip_name}", **saved}
 
 
 @router.post("/upload-reaction")
@@ -184,26 +275,33 @@ async def upload_reaction(
     dest_dir.mkdir(parents=True, exist_ok=True)
     dest = dest_dir / clip_name
 
+    saved = {}
     if file is not None:
-        with open(dest, "wb") as f:
-            shutil.copyfileobj(file.file, f)
+        dest.unlink(missing_ok=True)  # may be a hard link shared with a byte-identical clip
+        saved = await save_upload(file, dest)
     elif auto_generate:
         hook_path = ASSETS_DIR / persona / "hook" / clip_name
         if not hook_path.exists():
             raise HTTPException(status_code=404, detail=f"Hook clip not found: {clip_name}")
+        dest.unlink(missing_ok=True)
         # Clip last 2.5s — same pattern as assemble_video.py
-        proc = await asyncio.create_subprocess_exec(
-            "ffmpeg", "-y", "-sseof", "-2.5", "-i", str(hook_path),
-            "-c:v", "libx264", "-c:a", "aac", str(dest),
-            stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.PIPE,
-        )
-        _, stderr = await proc.communicate()
+        async with ffmpeg_slot_async("reaction clip") as threads:
+            proc = await asyncio.create_subprocess_exec(
+                *apply_thread_budget([
+                    "ffmpeg", "-y", "-sseof", "-2.5", "-i", str(hook_path),
+                    "-c:v", "libx264", "-c:a", "aac", str(dest),
+                ], threads),
+                stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.PIPE,
+            )
+            _, stderr = await proc.communicate()
         if proc.returncode != 0:
             raise HTTPException(status_code=500, detail=f"FFmpeg failed: {stderr.decode()[-500:]}")
     else:
         raise HTTPException(status_code=400, detail="Provide either a file or set auto_generate=true")
+    await asyncio.to_thread(asset_catalog.index_file, dest, saved.get("sha256"))
+    thumbnails.submit(f"{persona}/reaction/{clip_name}")
 
-    return {"ok": True, "path": f"{persona}/reaction/{clip_name}"}
+    return {"ok": True, "path": f"{persona}/reaction/{clip_name}", **saved}
 
 
 @router.delete("/clip/{persona}/{clip_type}/{filename}")
@@ -225,6 +323,8 @@ async def delete_clip(persona: str, clip_type: str, filename: str):
 
     deleted = []
     target.unlink()
+    asset_catalog.remove(target)
+    thumbnails.discard(f"{persona}/{clip_type}/{filename}")
     deleted.append(f"{persona}/{clip_type}/{filename}")
 
     # Delete paired clip if it exists
@@ -232,6 +332,8 @@ async def delete_clip(persona: str, clip_type: str, filename: str):
     paired = ASSETS_DIR / persona / paired_type / filename
     if paired.exists():
         paired.unlink()
+        asset_catalog.remove(paired)
+        thumbnails.discard(f"{persona}/{paired_type}/{filename}")
         deleted.append(f"{persona}/{paired_type}/{filename}")
 
     return {"ok": True, "deleted": deleted}
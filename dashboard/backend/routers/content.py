@@ -1,17 +1,43 @@
 """Content endpoints — reel metadata and video serving."""
 
 from pathlib import Path
+from urllib.parse import quote
 
-from fastapi import APIRouter, HTTPException
-from fastapi.responses import FileResponse
+from fastapi import APIRouter, HTTPException, Request
 
 from config import VIDEO_OUTPUT_DIR, PROJECT_ROOT
+from models import Reel
 from services.log_reader import read_all_runs
+from services.media_response import WRITE_ONCE, media_response
+from services.preview_proxy import preview_paths
 
 router = APIRouter(prefix="/api/content", tags=["content"])
 
 
-@router.get("/reels")
+def _with_previews(run) -> Reel:
+    """Attach preview/poster URLs for reels rendered with proxies."""
+    reel = Reel(**run.model_dump())
+    preview, poster = preview_paths(run.reel_path)
+    q = quote(run.reel_path, safe="")
+    if preview.is_file():
+        reel.preview_url = f"/api/content/preview-by-path?path={q}"
+    if poster.is_file():
+        reel.poster_url = f"/api/content/poster-by-path?path={q}"
+    return reel
+
+
+def _resolve_in_project(path: str) -> Path:
+    """Resolve a reel path, refusing anything outside the project root."""
+    file_path = Path(path)
+    # Security: ensure the file is within project root
+    try:
+        file_path.resolve().relative_to(PROJECT_ROOT.resolve())
+    except ValueError:
+        raise HTTPException(status_code=403, detail="Access denied")
+    return file_path
+
+
+@router.get("/reels", response_model=list[Reel])
 def get_reels(persona: str | None = None, video_type: str | None = None):
     """Get all reels with metadata, optionally filtered."""
     runs = read_all_runs()
@@ -25,27 +51,41 @@ def get_reels(persona: str | None = None, video_type: str | None = None):
 
     # Sort newest first
     reels.sort(key=lambda r: r.timestamp, reverse=True)
-    return reels
+    return [_with_previews(r) for r in reels]
 
 
 @router.get("/video/{filename}")
-def serve_video(filename: str):
+def serve_video(filename: str, request: Request):
     """Serve a video file from video_output/."""
     path = VIDEO_OUTPUT_DIR / filename
     if not path.exists() or not path.is_file():
         raise HTTPException(status_code=404, detail="Video not found")
-    return FileResponse(path, media_type="video/mp4")
+    return media_response(request, path, "video/mp4", WRITE_ONCE)
 
 
 @router.get("/video-by-path")
-def serve_video_by_path(path: str):
+def serve_video_by_path(path: str, request: Request):
     """Serve a video by its full reel_path (normalized)."""
     file_path = Path(path)
     if not file_path.exists() or not file_path.is_file():
         raise HTTPException(status_code=404, detail="Video not found")
-    # Security: ensure the file is within project root
-    try:
-        file_path.resolve().relative_to(PROJECT_ROOT.resolve())
-    except ValueError:
-        raise HTTPException(status_code=403, detail="Access denied")
-    return FileResponse(file_path, media_type="video/mp4")
+    _resolve_in_project(path)
+    return media_response(request, file_path, "video/mp4", WRITE_ONCE)
+
+
+@router.get("/preview-by-path")
+def serve_preview_by_path(path: str, request: Request):
+    """Serve the low-bitrate preview proxy for a reel_path."""
+    preview, _ = preview_paths(_resolve_in_project(path))
+    if not preview.is_file():
+        raise HTTPException(status_code=404, detail="Preview not found")
+    return media_response(request, preview, "video/mp4")
+
+
+@router.get("/poster-by-path")
+def serve_poster_by_path(path: str, request: Request):
+    """Serve the poster JPEG for a reel_path."""
+    _, poster = preview_paths(_resolve_in_project(path))
+    if not poster.is_file():
+        raise HTTPException(status_code=404, detail="Poster not found")
+    return media_response(request, poster, "image/jpeg")
@@ -6,6 +6,7 @@ from fastapi import APIRouter, HTTPException
 
 from config import SKILLS_DIR, MEMORY_DIR, PROJECT_ROOT
 from models import FileContent
+from services import context_compiler
 
 router = APIRouter(prefix="/api/knowledge", tags=["knowledge"])
 
@@ -70,4 +71,5 @@ def write_file(section: str, path: str, body: FileContent):
     if not resolved.parent.exists():
         raise HTTPException(status_code=404, detail="Parent directory not found")
     resolved.write_text(body.content)
+    context_compiler.invalidate()
     return {"ok": True}
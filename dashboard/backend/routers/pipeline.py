@@ -4,6 +4,8 @@ from fastapi import APIRouter, HTTPException
 
 from config import PERSONA_APPS, PERSONA_COLORS
 from models import PersonaAppInfo, PersonaConfig, PipelineRunRequest, LifestyleReelRequest, AutoJournalReelRequest
+from services.ffmpeg_slots import slot_stats
+from services.scratch import scratch_stats
 from services.log_reader import get_overview_stats, get_persona_stats
 from services.pipeline_runner import start_pipeline_run, start_lifestyle_run, start_autojournal_run, get_run_status, list_runs
 
@@ -19,6 +21,18 @@ def overview():
     }
 
 
+@router.get("/ffmpeg-slots")
+def ffmpeg_slots():
+    """Host-wide ffmpeg slot usage: holders, queued launches, recent wait times."""
+    return slot_stats()
+
+
+@router.get("/scratch")
+def scratch():
+    """tmpfs scratch usage for render intermediates vs the quota."""
+    return scratch_stats()
+
+
 @router.get("/personas")
 def get_personas():
     """Return persona configs with apps and video types."""
@@ -1,13 +1,14 @@
 """Video stitcher endpoints — upload, poll, download."""
 
+import asyncio
 import json
-import tempfile
-from pathlib import Path
 
-from fastapi import APIRouter, File, Form, HTTPException, UploadFile
-from fastapi.responses import FileResponse
+from fastapi import APIRouter, File, Form, HTTPException, Request, UploadFile
 
-from config import VIDEO_OUTPUT_DIR
+from config import ASSETS_DIR, VIDEO_OUTPUT_DIR
+from services import asset_catalog, blob_store
+from services.media_response import WRITE_ONCE, media_response
+from services.upload_streamer import new_request_budget, save_upload
 from services.video_stitcher import get_stitch_job, start_stitch_job
 
 router = APIRouter(prefix="/api/stitcher", tags=["stitcher"])
@@ -15,16 +16,46 @@ router = APIRouter(prefix="/api/stitcher", tags=["stitcher"])
 MAX_SCENES = 10
 
 
+def _resolve_reference(scene: dict) -> tuple[str, str]:
+    """(input path, sha256) for a scene that points at a stored blob or a library asset."""
+    if scene.get("blob_sha256"):
+        blob = blob_store.find(scene["blob_sha256"])
+        if blob is None:
+            raise HTTPException(404, f"Unknown blob {scene['blob_sha256']} — upload it again")
+        blob_store.touch(blob)
+        return str(blob), scene["blob_sha256"]
+
+    path = ASSETS_DIR / scene["asset_path"]
+    try:
+        path.resolve().relative_to(ASSETS_DIR.resolve())
+    except ValueError:
+        raise HTTPException(403, "Access denied")
+    if path.suffix.lower() not in asset_catalog.VIDEO_EXTS:
+        raise HTTPException(400, f"Not a video asset: {scene['asset_path']}")
+    row = asset_catalog.lookup(path)
+    if row is None:
+        raise HTTPException(404, f"Asset not found: {scene['asset_path']}")
+    return str(path), row["sha256"]
+
+
 @router.post("/stitch")
 async def stitch(
-    files: list[UploadFile] = File(...),
+    files: list[UploadFile] = File([]),
     scenes_json: str = Form(...),
 ):
-    """Accept scene files + metadata, queue a stitch job."""
+    """Accept scene files + metadata, queue a stitch job.
+
+    A scene may reference footage the server already has instead of
+    uploading it: `blob_sha256` (a video uploaded for an earlier stitch, or
+    through /api/uploads) or `asset_path` (a clip under assets/). The other
+    scenes take the uploaded files in order. Uploaded files are kept in the
+    blob store; the response lists a reference per scene to reuse next time.
+    """
     scenes = json.loads(scenes_json)
+    fresh = [i for i, s in enumerate(scenes) if not (s.get("blob_sha256") or s.get("asset_path"))]
 
-    if len(scenes) != len(files):
-        raise HTTPException(400, f"Got {len(files)} files but {len(scenes)} scene entries")
+    if len(fresh) != len(files):
+        raise HTTPException(400, f"Got {len(files)} files but {len(fresh)} scenes without a reference")
     if len(scenes) > MAX_SCENES:
         raise HTTPException(400, f"Max {MAX_SCENES} scenes allowed")
 
@@ -32,15 +63,25 @@ async def stitch(
         if not f.content_type or not f.content_type.startswith("video/"):
             raise HTTPException(400, f"File '{f.filename}' is not a video ({f.content_type})")
 
-    # Save uploads to a temp directory (stitcher cleans up after job)
-    upload_dir = Path(tempfile.mkdtemp(prefix="stitch_upload_"))
-    for i, f in enumerate(files):
-        dest = upload_dir / f"scene_{i}{Path(f.filename or '.mp4').suffix}"
-        with open(dest, "wb") as out:
-            out.write(await f.read())
-        scenes[i]["filename"] = dest.name
+    await asyncio.to_thread(blob_store.evict)
+    for scene in scenes:
+        if scene.get("blob_sha256") or scene.get("asset_path"):
+            scene["input_path"], scene["sha256"] = await asyncio.to_thread(_resolve_reference, scene)
+
+    budget = new_request_budget()
+    for i, f in zip(fresh, files):
+        tmp = await asyncio.to_thread(blob_store.incoming_path, f.filename or ".mp4")
+        saved = await save_upload(f, tmp, budget)
+        blob = await asyncio.to_thread(blob_store.adopt, tmp, saved["sha256"], f.filename or ".mp4")
+        scenes[i]["input_path"] = str(blob)
+        scenes[i]["sha256"] = saved["sha256"]
+        scenes[i]["blob_sha256"] = saved["sha256"]
 
-    result = start_stitch_job(scenes, upload_dir)
+    result = start_stitch_job(scenes)
+    result["sources"] = [
+        {"blob_sha256": s["blob_sha256"]} if s.get("blob_sha256") else {"asset_path": s["asset_path"]}
+        for s in scenes
+    ]
     return result
 
 
@@ -53,10 +94,10 @@ async def job_status(job_id: str):
 
 
 @router.get("/download/{filename}")
-async def download(filename: str):
+async def download(filename: str, request: Request):
     if not filename.startswith("stitch_"):
         raise HTTPException(400, "Invalid filename")
     path = VIDEO_OUTPUT_DIR / filename
     if not path.exists():
         raise HTTPException(404, "File not found")
-    return FileResponse(path, media_type="video/mp4", filename=filename)
+    return media_response(request, path, "video/mp4", WRITE_ONCE, download_name=filename)
@@ -0,0 +1,76 @@
+"""Resumable upload endpoints — init, chunk, status, finalize."""
+
+import asyncio
+
+from fastapi import APIRouter, HTTPException, Request
+from pydantic import BaseModel
+
+from services import chunked_upload
+from services.chunked_upload import UploadError
+
+router = APIRouter(prefix="/api/uploads", tags=["uploads"])
+
+
+class UploadInit(BaseModel):
+    kind: str  # hook | reaction | screen-recording | stitch
+    size: int
+    sha256: str
+    persona: str | None = None  # hook / reaction
+    clip_name: str | None = None  # hook / reaction
+    app: str | None = None  # screen-recording
+    filename: str | None = None  # screen-recording name; stitch extension
+
+
+def _http_error(e: UploadError) -> HTTPException:
+    detail = {"message": e.detail, **e.extra} if e.extra else e.detail
+    return HTTPException(status_code=e.status, detail=detail)
+
+
+@router.post("")
+async def init_upload(req: UploadInit):
+    """Open a resumable upload. Completes immediately if the server already has these bytes."""
+    try:
+        dest = chunked_upload.destination(
+            req.kind, req.sha256.lower(), persona=req.persona, clip_name=req.clip_name,
+            app=req.app, filename=req.filename,
+        )
+        return await asyncio.to_thread(chunked_upload.start, req.kind, dest, req.size, req.sha256)
+    except UploadError as e:
+        raise _http_error(e)
+
+
+@router.get("/{upload_id}")
+def upload_status(upload_id: str):
+    """Bytes received so far — resume by sending the next chunk at `offset`."""
+    try:
+        return chunked_upload.status(upload_id)
+    except UploadError as e:
+        raise _http_error(e)
+
+
+@router.put("/{upload_id}")
+async def upload_chunk(upload_id: str, offset: int, request: Request):
+    """Append the raw request body at `offset` (409 with the expected offset on mismatch)."""
+    try:
+        return await chunked_upload.write_chunk(upload_id, offset, request.stream())
+    except UploadError as e:
+        raise _http_error(e)
+
+
+@router.post("/{upload_id}/finalize")
+async def finalize_upload(upload_id: str):
+    """Verify the sha256 declared at init and move the file into place."""
+    try:
+        return await asyncio.to_thread(chunked_upload.finalize, upload_id)
+    except UploadError as e:
+        raise _http_error(e)
+
+
+@router.delete("/{upload_id}")
+def abort_upload(upload_id: str):
+    """Discard an unfinished upload."""
+    try:
+        chunked_upload.abort(upload_id)
+    except UploadError as e:
+        raise _http_error(e)
+    return {"ok": True}
@@ -0,0 +1,461 @@
+"""Persistent asset catalog (SQLite).
+
+One row per media file under ASSETS_DIR: persona, type, size, mtime,
+content hash and probed media metadata. Upload, delete and clip
+generation paths update it directly; a reconciliation walk (at API
+startup, then at most every ASSET_RECONCILE_INTERVAL seconds in a
+background thread kicked off by reads) picks up anything copied in by
+hand. Reads never walk the whole tree inline, except the very first one
+against a catalog that has never been scanned. Readers — the dashboard and
+the pipeline scripts — query it instead of listing directories. Rows whose
+file has vanished are dropped as they are read, and while the last full
+scan is stale list_files() re-stats the one directory it lists, so a
+short-lived script never picks a missing file or misses a new one.
+
+Ingest also dedups storage: a file whose bytes match an existing asset is
+replaced by a hard link to it, and persona clips get a perceptual
+fingerprint (services/clip_fingerprint) for near-duplicate lookups.
+"""
+
+import fcntl
+import hashlib
+import json
+import os
+import sqlite3
+import subprocess
+import threading
+import time
+from contextlib import closing
+from pathlib import Path
+
+from config import ASSET_CATALOG_PATH, ASSET_PERSONAS, ASSET_RECONCILE_INTERVAL, ASSETS_DIR
+
+VIDEO_EXTS = (".mp4", ".mov")
+IMAGE_EXTS = (".png", ".jpg", ".jpeg")
+MEDIA_EXTS = VIDEO_EXTS + IMAGE_EXTS
+CHUNK_SIZE = 1024 * 1024
+RECONCILE_LOCK = ASSET_CATALOG_PATH.with_suffix(".lock")
+
+_next_reconcile = 0.0  # monotonic time of this process's next background reconcile
+_reconcile_guard = threading.Lock()
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS assets (
+    path      TEXT PRIMARY KEY,  -- relative to ASSETS_DIR
+    dir       TEXT NOT NULL,     -- relative parent dir, for listings
+    name      TEXT NOT NULL,
+    ext       TEXT NOT NULL,
+    persona   TEXT,
+    type      TEXT,
+    size      INTEGER NOT NULL,
+    mtime_ns  INTEGER NOT NULL,
+    sha256    TEXT,
+    duration  REAL,
+    width     INTEGER,
+    height    INTEGER,
+    codec     TEXT,
+    dhash     BLOB,              -- clip fingerprint, persona clips only
+    indexed_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS assets_dir ON assets (dir, name);
+CREATE INDEX IF NOT EXISTS assets_persona_type ON assets (persona, type);
+CREATE INDEX IF NOT EXISTS assets_sha256 ON assets (sha256);
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT);
+"""
+
+
+def _connect() -> sqlite3.Connection:
+    ASSET_CATALOG_PATH.parent.mkdir(parents=True, exist_ok=True)
+    conn = sqlite3.connect(ASSET_CATALOG_PATH, timeout=30)
+    conn.row_factory = sqlite3.Row
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.executescript(_SCHEMA)
+    columns = {r["name"] for r in conn.execute("PRAGMA table_info(assets)")}
+    if "dhash" not in columns:  # catalogs created before fingerprints
+        conn.execute("ALTER TABLE assets ADD COLUMN dhash BLOB")
+    return conn
+
+
+def _relative(path) -> str | None:
+    """Path relative to ASSETS_DIR, or None for files outside it."""
+    try:
+        return Path(path).resolve().relative_to(ASSETS_DIR.resolve()).as_posix()
+    except ValueError:
+        return None
+
+
+def _classify(rel: str) -> tuple[str | None, str | None]:
+    """(persona, type) from the asset layout.
+
+    {persona}/{type}/x.mp4 → (persona, type); screen-recordings/{app}/x.mp4 →
+    (None, "screen-recordings"); reference images get the persona from the
+    filename prefix.
+    """
+    parts = rel.split("/")
+    if len(parts) < 2:
+        return None, None
+    if parts[0] in ASSET_PERSONAS:
+        return parts[0], parts[1] if len(parts) > 2 else None
+    if parts[0] == "reference-images":
+        persona = next((p for p in ASSET_PERSONAS if parts[-1].startswith(p)), None)
+        return persona, "reference-image"
+    return None, parts[0]
+
+
+def _sha256(path: Path) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        while chunk := f.read(CHUNK_SIZE):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _probe(path: Path) -> dict:
+    """Duration, dimensions and codec of the first video stream (empty if ffprobe fails)."""
+    cmd = [
+        "ffprobe", "-v", "error", "-select_streams", "v:0",
+        "-show_entries", "stream=width,height,codec_name:format=duration",
+        "-of", "json", str(path),
+    ]
+    try:
+        result = subprocess.run(cmd, capture_output=True, text=True, timeout=30)
+        info = json.loads(result.stdout or "{}")
+    except (OSError, subprocess.TimeoutExpired, json.JSONDecodeError):
+        return {}
+    stream = (info.get("streams") or [{}])[0]
+    duration = info.get("format", {}).get("duration")
+    return {
+        "duration": float(duration) if duration not in (None, "N/A") else None,
+        "width": stream.get("width"),
+        "height": stream.get("height"),
+        "codec": stream.get("codec_name"),
+    }
+
+
+def _link_duplicate(conn: sqlite3.Connection, path: Path, rel: str, sha: str) -> sqlite3.Row | None:
+    """Replace `path` with a hard link to an existing asset with the same bytes.
+
+    Returns the original's row (its probe data and fingerprint carry over),
+    or None if there is no byte-identical asset.
+    """
+    stat = path.stat()
+    for row in conn.execute("SELECT * FROM assets WHERE sha256 = ? AND path != ?", (sha, rel)):
+        original = ASSETS_DIR / row["path"]
+        try:
+            ostat = original.stat()
+        except OSError:
+            continue
+        if ostat.st_size != stat.st_size or ostat.st_dev != stat.st_dev:
+            continue
+        if ostat.st_ino != stat.st_ino:
+            tmp = path.with_name(f".{path.name}.link")
+            tmp.unlink(missing_ok=True)
+            os.link(original, tmp)
+            os.replace(tmp, path)
+        return row
+    return None
+
+
+def _upsert(conn: sqlite3.Connection, path: Path, rel: str, stat: os.stat_result, sha: str | None = None):
+    persona, clip_type = _classify(rel)
+    ext = path.suffix.lower()
+    sha = sha or _sha256(path)
+    original = _link_duplicate(conn, path, rel, sha)
+    if original is not None:
+        stat = path.stat()  # now the original's inode
+        meta = {k: original[k] for k in ("duration", "width", "height", "codec")}
+        dhash = original["dhash"]
+    else:
+        meta = _probe(path)
+        dhash = None
+    if dhash is None and persona is not None and ext in VIDEO_EXTS:
+        from services.clip_fingerprint import fingerprint
+        dhash = fingerprint(path, meta.get("duration")) or b""  # b"": tried, unreadable
+    conn.execute(
+        """INSERT OR REPLACE INTO assets
+           (path, dir, name, ext, persona, type, size, mtime_ns, sha256,
+            duration, width, height, codec, dhash, indexed_at)
+           VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)""",
+        (
+            rel, rel.rpartition("/")[0], path.name, ext, persona, clip_type,
+            stat.st_size, stat.st_mtime_ns, sha,
+            meta.get("duration"), meta.get("width"), meta.get("height"), meta.get("codec"),
+            dhash, time.time(),
+        ),
+    )
+
+
+# ─── Write side ──────────────────────────────────────
+
+def index_file(path, sha256: str | None = None) -> bool:
+    """Add or refresh one file (call after an upload or generation writes it).
+
+    Pass `sha256` when the caller already hashed the bytes to skip re-reading the file.
+    """
+    path = Path(path)
+    rel = _relative(path)
+    if rel is None or path.suffix.lower() not in MEDIA_EXTS or not path.is_file():
+        return False
+    with closing(_connect()) as conn, conn:
+        _upsert(conn, path, rel, path.stat(), sha256)
+    return True
+
+
+def remove(path) -> None:
+    """Drop a file from the catalog (call after deleting it)."""
+    rel = _relative(path)
+    if rel is None:
+        return
+    with closing(_connect()) as conn, conn:
+        conn.execute("DELETE FROM assets WHERE path = ?", (rel,))
+
+
+def _walk():
+    """Media files under ASSETS_DIR, skipping dot dirs (.thumbs, caches) and dotfiles."""
+    for root, dirs, files in os.walk(ASSETS_DIR):
+        dirs[:] = [d for d in dirs if not d.startswith(".")]
+        for name in files:
+            if not name.startswith(".") and os.path.splitext(name)[1].lower() in MEDIA_EXTS:
+                yield Path(root) / name
+
+
+def reconcile(force: bool = False) -> dict:
+    """Bring the catalog in line with the disk. Only changed files are re-hashed/probed.
+
+    Skipped if the last scan is younger than ASSET_RECONCILE_INTERVAL (unless
+    forced) or another process is already scanning.
+    """
+    stats = {"added": 0, "updated": 0, "removed": 0, "skipped": True}
+    with closing(_connect()) as conn:
+        row = conn.execute("SELECT value FROM meta WHERE key = 'reconciled_at'").fetchone()
+        if not force and row and time.time() - float(row["value"]) < ASSET_RECONCILE_INTERVAL:
+            return stats
+
+        with open(RECONCILE_LOCK, "a") as lock:
+            try:
+                fcntl.flock(lock, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                return stats
+
+            known = {
+                r["path"]: (r["size"], r["mtime_ns"])
+                for r in conn.execute("SELECT path, size, mtime_ns FROM assets")
+            }
+            # Persona clips indexed before fingerprints existed get one on this scan
+            unfingerprinted = {
+                r["path"] for r in conn.execute(
+                    "SELECT path FROM assets WHERE persona IS NOT NULL "
+                    "AND ext IN ('.mp4', '.mov') AND dhash IS NULL"
+                )
+            }
+            seen = set()
+            for path in _walk():
+                rel = _relative(path)
+                try:
+                    stat = path.stat()
+                except OSError:
+                    continue
+                if rel is None:
+                    continue  # symlink pointing outside the asset tree
+                seen.add(rel)
+                if known.get(rel) == (stat.st_size, stat.st_mtime_ns) and rel not in unfingerprinted:
+                    continue
+                with conn:
+                    _upsert(conn, path, rel, stat)
+                stats["updated" if rel in known else "added"] += 1
+
+            gone = [p for p in known if p not in seen]
+            with conn:
+                conn.executemany("DELETE FROM assets WHERE path = ?", [(p,) for p in gone])
+                conn.execute(
+                    "INSERT OR REPLACE INTO meta (key, value) VALUES ('reconciled_at', ?)",
+                    (str(time.time()),),
+                )
+            stats["removed"] = len(gone)
+            stats["skipped"] = False
+    return stats
+
+
+# ─── Read side ───────────────────────────────────────
+
+def _scan_is_stale() -> bool:
+    """True if no full reconcile has finished within ASSET_RECONCILE_INTERVAL."""
+    with closing(_connect()) as conn:
+        row = conn.execute("SELECT value FROM meta WHERE key = 'reconciled_at'").fetchone()
+    return row is None or time.time() - float(row["value"]) >= ASSET_RECONCILE_INTERVAL
+
+
+def _sync_dir(directory: Path, rel: str):
+    """Reconcile one directory: stat its files, index new/changed ones, drop vanished rows."""
+    try:
+        entries = list(os.scandir(directory))
+    except OSError:
+        entries = []
+    with closing(_connect()) as conn:
+        known = {
+            r["name"]: (r["size"], r["mtime_ns"])
+            for r in conn.execute("SELECT name, size, mtime_ns FROM assets WHERE dir = ?", (rel,))
+        }
+        seen = set()
+        for entry in entries:
+            if entry.name.startswith(".") or os.path.splitext(entry.name)[1].lower() not in MEDIA_EXTS:
+                continue
+            path = directory / entry.name
+            file_rel = _relative(path)
+            try:
+                if not entry.is_file() or file_rel is None:
+                    continue
+                stat = entry.stat()
+            except OSError:
+                continue
+            seen.add(entry.name)
+            if known.get(entry.name) == (stat.st_size, stat.st_mtime_ns):
+                continue
+            with conn:
+                _upsert(conn, path, file_rel, stat)
+        gone = [name for name in known if name not in seen]
+        if gone:
+            with conn:
+                conn.executemany("DELETE FROM assets WHERE dir = ? AND name = ?", [(rel, n) for n in gone])
+
+
+def _schedule_reconcile():
+    """Refresh the catalog off the request path, at most once per interval per process."""
+    global _next_reconcile
+    now = time.monotonic()
+    with _reconcile_guard:
+        if now < _next_reconcile:
+            return
+        _next_reconcile = now + ASSET_RECONCILE_INTERVAL
+    with closing(_connect()) as conn:
+        scanned = conn.execute("SELECT 1 FROM meta WHERE key = 'reconciled_at'").fetchone()
+    if scanned is None:
+        reconcile()  # empty catalog: this read has nothing to return until the first scan
+    else:
+        threading.Thread(target=reconcile, daemon=True, name="asset-reconcile").start()
+
+
+def _query(sql: str, params: tuple) -> list[sqlite3.Row]:
+    _schedule_reconcile()
+    with closing(_connect()) as conn:
+        return conn.execute(sql, params).fetchall()
+
+
+def _existing(rows: list[sqlite3.Row]) -> list[sqlite3.Row]:
+    """Rows whose file is still on disk; the others are removed from the catalog."""
+    gone = {r["path"] for r in rows if not (ASSETS_DIR / r["path"]).is_file()}
+    if not gone:
+        return rows
+    with closing(_connect()) as conn, conn:
+        conn.executemany("DELETE FROM assets WHERE path = ?", [(p,) for p in gone])
+    return [r for r in rows if r["path"] not in gone]
+
+
+def _ext_clause(exts) -> tuple[str, tuple]:
+    exts = tuple(e.lower() for e in exts)
+    return f"ext IN ({', '.join('?' * len(exts))})", exts
+
+
+def list_files(directory, exts=VIDEO_EXTS) -> list[Path]:
+    """Files directly inside `directory` with one of `exts`, sorted by name.
+
+    Drop-in for a sorted iterdir(); directories outside ASSETS_DIR are
+    scanned directly.
+    """
+    directory = Path(directory)
+    rel = _relative(directory)
+    if rel is None:
+        if not directory.is_dir():
+            return []
+        return sorted(
+            f for f in directory.iterdir()
+            if f.is_file() and f.suffix.lower() in exts and not f.name.startswith(".")
+        )
+    if _scan_is_stale():
+        _sync_dir(directory, rel)
+    where, params = _ext_clause(exts)
+    rows = _query(f"SELECT path, name FROM assets WHERE dir = ? AND {where} ORDER BY name", (rel, *params))
+    return [directory / r["name"] for r in _existing(rows)]
+
+
+def list_assets(persona: str | None = None, clip_type: str | None = None,
+                exts=MEDIA_EXTS) -> list[dict]:
+    """Catalog rows (as dicts) filtered by persona/type, ordered by path."""
+    clauses, params = [], []
+    if persona is not None:
+        clauses.append("persona = ?")
+        params.append(persona)
+    if clip_type is not None:
+        clauses.append("type = ?")
+        params.append(clip_type)
+    where, ext_params = _ext_clause(exts)
+    clauses.append(where)
+    rows = _query(
+        f"SELECT * FROM assets WHERE {' AND '.join(clauses)} ORDER BY path",
+        (*params, *ext_params),
+    )
+    return [dict(r) for r in _existing(rows)]
+
+
+def fingerprinted_clips(persona: str | None = None) -> list[dict]:
+    """Persona clips that have a perceptual fingerprint, ordered by path."""
+    rows = _query(
+        "SELECT path, dir, name, persona, type, size, sha256, duration, dhash FROM assets "
+        "WHERE persona IS NOT NULL AND (? IS NULL OR persona = ?) AND length(dhash) > 0 "
+        "ORDER BY path",
+        (persona, persona),
+    )
+    return [dict(r) for r in _existing(rows)]
+
+
+def lookup(path) -> dict | None:
+    """Catalog row for one file, indexing it first if it is new or changed since (None if not an asset)."""
+    path = Path(path)
+    rel = _relative(path)
+    try:
+        stat = path.stat()
+    except OSError:
+        return None
+    if rel is None:
+        return None
+    with closing(_connect()) as conn:
+        row = conn.execute("SELECT * FROM assets WHERE path = ?", (rel,)).fetchone()
+    if row is not None and (row["size"], row["mtime_ns"]) == (stat.st_size, stat.st_mtime_ns):
+        return dict(row)
+    if not index_file(path):
+        return None
+    with closing(_connect()) as conn:
+        row = conn.execute("SELECT * FROM assets WHERE path = ?", (rel,)).fetchone()
+    return dict(row) if row is not None else None
+
+
+def find_by_sha256(sha256: str, size: int | None = None) -> Path | None:
+    """An existing asset file with these bytes (and size, if given), or None.
+
+    Rows whose file changed since it was indexed are skipped.
+    """
+    with closing(_connect()) as conn:
+        rows = conn.execute(
+            "SELECT path, size, mtime_ns FROM assets WHERE sha256 = ?", (sha256,),
+        ).fetchall()
+    for row in rows:
+        path = ASSETS_DIR / row["path"]
+        try:
+            stat = path.stat()
+        except OSError:
+            continue
+        if (stat.st_size, stat.st_mtime_ns) != (row["size"], row["mtime_ns"]):
+            continue
+        if size is None or stat.st_size == size:
+            return path
+    return None
+
+
+def count_assets(persona: str, clip_type: str, exts=VIDEO_EXTS) -> int:
+    """Number of files of one persona/type."""
+    where, params = _ext_clause(exts)
+    rows = _query(
+        f"SELECT COUNT(*) AS n FROM assets WHERE persona = ? AND type = ? AND {where}",
+        (persona, clip_type, *params),
+    )
+    return rows[0]["n"]
@@ -0,0 +1,38 @@
+"""Least-recently-used asset rotation.
+
+Each pick orders the candidate pool by when the scope (account, or
+persona/source) last used each asset — never-used assets first, ties
+broken at random — in a min-heap, and pops the first one the caller
+accepts. Last-used timestamps come from the indexed last_used table in
+services/asset_usage, so new clips join the rotation at the front as soon
+as they appear in the pool, without replaying any history.
+"""
+
+import heapq
+import random
+
+from services import asset_usage
+
+NEVER_USED = ""  # sorts before every ISO timestamp
+
+
+def rotation_heap(scope: str, role: str, pool: list[str]) -> list[tuple[str, float, str]]:
+    """Heap of (last used_at, tiebreak, asset) for `pool`, least recently used on top."""
+    stamps = asset_usage.last_used(scope, role)
+    heap = [(stamps.get(asset, NEVER_USED), random.random(), asset) for asset in pool]
+    heapq.heapify(heap)
+    return heap
+
+
+def pick_lru(scope: str, role: str, pool: list[str], accept=None) -> str | None:
+    """Least recently used asset in `pool` for this scope/role (None if the pool is empty).
+
+    `accept`, if given, filters candidates; the first accepted one in LRU
+    order is returned.
+    """
+    heap = rotation_heap(scope, role, pool)
+    while heap:
+        _, _, asset = heapq.heappop(heap)
+        if accept is None or accept(asset):
+            return asset
+    return None
@@ -0,0 +1,276 @@
+"""Structured asset-usage log (SQLite, append-only).
+
+Every reel records which assets it used: one row per (run, role, asset),
+where role is hook / reaction / screen_rec / ref_image / scene_1 /
+scene_2. Indexed by account and by asset, so "last N uses" lookups never
+read the whole history. WAL mode lets the dashboard read while several
+pipeline runs write. memory/asset-usage.md is regenerated from this log
+after each write; it is a view for the LLM context, not the source.
+
+A last_used table keeps the latest timestamp per (scope, role, asset) —
+scope being the account, or the persona/source for runs without one — so
+rotation (services/asset_rotation) never has to scan the history.
+"""
+
+import json
+import os
+import sqlite3
+import uuid
+from contextlib import closing
+from datetime import datetime, timezone
+
+from config import ASSET_USAGE_DB, MEMORY_DIR
+
+MARKDOWN_PATH = MEMORY_DIR / "asset-usage.md"
+MARKDOWN_ROWS = 30
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS usage (
+    id       INTEGER PRIMARY KEY AUTOINCREMENT,
+    run_id   TEXT NOT NULL,
+    used_at  TEXT NOT NULL,   -- ISO timestamp (UTC)
+    date     TEXT NOT NULL,   -- YYYY-MM-DD, as shown in the markdown view
+    source   TEXT NOT NULL,   -- autopilot | autopilot_video | lifestyle
+    account  TEXT,
+    persona  TEXT,
+    angle    TEXT,
+    role     TEXT NOT NULL,
+    asset    TEXT NOT NULL,
+    extra    TEXT             -- JSON: app, video_type, ...
+);
+CREATE INDEX IF NOT EXISTS usage_account_role ON usage (account, role, id);
+CREATE INDEX IF NOT EXISTS usage_asset ON usage (role, asset, id);
+CREATE INDEX IF NOT EXISTS usage_source ON usage (source, id);
+CREATE TABLE IF NOT EXISTS last_used (
+    scope    TEXT NOT NULL,
+    role     TEXT NOT NULL,
+    asset    TEXT NOT NULL,
+    used_at  TEXT NOT NULL,
+    PRIMARY KEY (scope, role, asset)
+);
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT);
+"""
+
+# Markdown sections, one per source (their column sets differ)
+_VIEWS = {
+    "autopilot": (
+        "Recent Asset Usage",
+        ["Date", "Account", "Hook Clip", "Reaction Clip", "Screen Recording"],
+        lambda r: [r["date"], r["account"], r["assets"].get("hook", ""),
+                   r["assets"].get("reaction", ""), r["assets"].get("screen_rec", "")],
+    ),
+    "autopilot_video": (
+        "AI Clip Runs",
+        ["Date", "Persona", "Reference Image", "Screen Recording", "App", "Video Type"],
+        lambda r: [r["date"], r["persona"], r["assets"].get("ref_image", ""),
+                   r["assets"].get("screen_rec", ""), r.get("app", ""), r.get("video_type", "")],
+    ),
+    "lifestyle": (
+        "Lifestyle Reels",
+        ["Date", "Type", "Scene 1", "Scene 2", "Screen Recording"],
+        lambda r: [r["date"], "lifestyle", r["assets"].get("scene_1", ""),
+                   r["assets"].get("scene_2", ""), r["assets"].get("screen_rec", "")],
+    ),
+}
+
+
+def _connect() -> sqlite3.Connection:
+    ASSET_USAGE_DB.parent.mkdir(parents=True, exist_ok=True)
+    conn = sqlite3.connect(ASSET_USAGE_DB, timeout=30)
+    conn.row_factory = sqlite3.Row
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.executescript(_SCHEMA)
+    if not conn.execute("SELECT 1 FROM meta WHERE key = 'imported_markdown'").fetchone():
+        _import_markdown(conn)
+    if not conn.execute("SELECT 1 FROM meta WHERE key = 'backfilled_last_used'").fetchone():
+        with conn:
+            # One pass over the history for logs written before last_used existed
+            conn.execute(
+                """INSERT OR REPLACE INTO last_used (scope, role, asset, used_at)
+                   SELECT COALESCE(account, persona, source), role, asset, MAX(used_at)
+                   FROM usage GROUP BY 1, 2, 3"""
+            )
+            conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('backfilled_last_used', ?)",
+                         (datetime.now(timezone.utc).isoformat(),))
+    return conn
+
+
+def _import_markdown(conn: sqlite3.Connection):
+    """One-time import of the rows in the old hand-maintained markdown tables."""
+    conn.execute("BEGIN IMMEDIATE")  # first writer imports, the rest see the flag
+    try:
+        if not conn.execute("SELECT 1 FROM meta WHERE key = 'imported_markdown'").fetchone():
+            for run in _parse_markdown():
+                _insert(conn, *run)
+            conn.execute("INSERT INTO meta (key, value) VALUES ('imported_markdown', ?)",
+                         (datetime.now(timezone.utc).isoformat(),))
+        conn.commit()
+    except BaseException:
+        conn.rollback()
+        raise
+
+
+def _parse_markdown() -> list[tuple]:
+    """Rows of the legacy markdown file as _insert() arguments (three column layouts)."""
+    if not MARKDOWN_PATH.exists():
+        return []
+    runs = []
+    for line in MARKDOWN_PATH.read_text().splitlines():
+        if not line.startswith("|") or line.startswith(("| Date", "|---")):
+            continue
+        parts = [p.strip() for p in line.split("|")[1:-1]]
+        if len(parts) >= 6:
+            runs.append(("autopilot_video", None, parts[1], {"ref_image": parts[2], "screen_rec": parts[3]},
+                         {"app": parts[4], "video_type": parts[5]}, parts[0]))
+        elif len(parts) == 5 and parts[1] == "lifestyle":
+            runs.append(("lifestyle", "lifestyle", None,
+                         {"scene_1": parts[2], "scene_2": parts[3], "screen_rec": parts[4]}, {}, parts[0]))
+        elif len(parts) == 5:
+            runs.append(("autopilot", parts[1], None,
+                         {"hook": parts[2], "reaction": parts[3], "screen_rec": parts[4]}, {}, parts[0]))
+    return [
+        (source, account, persona, None, assets, extra, f"{day}T00:00:00+00:00", day)
+        for source, account, persona, assets, extra, day in runs
+    ]
+
+
+def _insert(conn, source, account, persona, angle, assets, extra, used_at, day) -> str:
+    run_id = uuid.uuid4().hex[:12]
+    used = [(role, asset) for role, asset in assets.items() if asset]
+    conn.executemany(
+        """INSERT INTO usage (run_id, used_at, date, source, account, persona, angle, role, asset, extra)
+           VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)""",
+        [
+            (run_id, used_at, day, source, account, persona, angle, role, asset, json.dumps(extra))
+            for role, asset in used
+        ],
+    )
+    conn.executemany(
+        """INSERT INTO last_used (scope, role, asset, used_at) VALUES (?, ?, ?, ?)
+           ON CONFLICT (scope, role, asset) DO UPDATE SET used_at = MAX(used_at, excluded.used_at)""",
+        [(account or persona or source, role, asset, used_at) for role, asset in used],
+    )
+    return run_id
+
+
+# ─── Write side ──────────────────────────────────────
+
+def record(source: str, assets: dict[str, str], account: str | None = None,
+           persona: str | None = None, angle: str | None = None, **extra) -> str:
+    """Log one reel's assets ({role: filename}) and refresh the markdown view. Returns the run id."""
+    now = datetime.now(timezone.utc)
+    with closing(_connect()) as conn:
+        with conn:
+            run_id = _insert(conn, source, account, persona, angle, assets, extra,
+                             now.isoformat(), now.date().isoformat())
+        _write_markdown(conn)
+    return run_id
+
+
+# ─── Read side ───────────────────────────────────────
+
+def _runs(conn, where: str, params: tuple, limit: int) -> list[dict]:
+    """Newest `limit` runs matching `where`, oldest first, with their assets folded in."""
+    ids = [r["run_id"] for r in conn.execute(
+        f"SELECT run_id, MAX(id) AS last FROM usage WHERE {where} GROUP BY run_id ORDER BY last DESC LIMIT ?",
+        (*params, limit),
+    )]
+    if not ids:
+        return []
+    rows = conn.execute(
+        f"SELECT * FROM usage WHERE run_id IN ({', '.join('?' * len(ids))}) ORDER BY id",
+        ids,
+    ).fetchall()
+    runs: dict[str, dict] = {}
+    for row in rows:
+        run = runs.setdefault(row["run_id"], {
+            "run_id": row["run_id"], "date": row["date"], "used_at": row["used_at"],
+            "source": row["source"], "account": row["account"], "persona": row["persona"],
+            "angle": row["angle"], "assets": {}, **json.loads(row["extra"] or "{}"),
+        })
+        run["assets"][row["role"]] = row["asset"]
+    return list(runs.values())
+
+
+def recent_runs(source: str | None = None, account: str | None = None, limit: int = 30) -> list[dict]:
+    """Last `limit` reels, oldest first, optionally for one source/account."""
+    clauses, params = ["1"], []
+    if source is not None:
+        clauses.append("source = ?")
+        params.append(source)
+    if account is not None:
+        clauses.append("account = ?")
+        params.append(account)
+    with closing(_connect()) as conn:
+        return _runs(conn, " AND ".join(clauses), tuple(params), limit)
+
+
+def recent_assets(role: str, account: str | None = None, source: str | None = None,
+                  limit: int = 7) -> list[str]:
+    """Assets used in `role` by the last `limit` reels (of an account/source), newest first."""
+    clauses, params = ["role = ?"], [role]
+    if account is not None:
+        clauses.append("account = ?")
+        params.append(account)
+    if source is not None:
+        clauses.append("source = ?")
+        params.append(source)
+    with closing(_connect()) as conn:
+        rows = conn.execute(
+            f"SELECT asset FROM usage WHERE {' AND '.join(clauses)} ORDER BY id DESC LIMIT ?",
+            (*params, limit),
+        ).fetchall()
+    return [r["asset"] for r in rows]
+
+
+def last_used(scope: str, role: str) -> dict[str, str]:
+    """{asset: last used_at} for one scope (account, or persona/source) and role."""
+    with closing(_connect()) as conn:
+        rows = conn.execute(
+            "SELECT asset, used_at FROM last_used WHERE scope = ? AND role = ?", (scope, role),
+        ).fetchall()
+    return {r["asset"]: r["used_at"] for r in rows}
+
+
+def asset_history(asset: str, role: str | None = None, limit: int = 20) -> list[dict]:
+    """Last `limit` uses of one asset, newest first."""
+    clauses, params = ["asset = ?"], [asset]
+    if role is not None:
+        clauses.append("role = ?")
+        params.append(role)
+    with closing(_connect()) as conn:
+        rows = conn.execute(
+            f"SELECT used_at, source, account, persona, role FROM usage "
+            f"WHERE {' AND '.join(clauses)} ORDER BY id DESC LIMIT ?",
+            (*params, limit),
+        ).fetchall()
+    return [dict(r) for r in rows]
+
+
+# ─── Markdown view ───────────────────────────────────
+
+def _write_markdown(conn: sqlite3.Connection):
+    lines = [
+        "# Asset Usage Tracker",
+        "",
+        "_Generated from the asset usage log after every run — edits here are overwritten._",
+    ]
+    for source, (title, columns, cells) in _VIEWS.items():
+        runs = _runs(conn, "source = ?", (source,), MARKDOWN_ROWS)
+        if not runs:
+            continue
+        lines += ["", f"## {title}", "",
+                  "| " + " | ".join(columns) + " |",
+                  "|" + "|".join("-" * (len(c) + 2) for c in columns) + "|"]
+        lines += ["| " + " | ".join(str(c or "") for c in cells(r)) + " |" for r in runs]
+
+    MEMORY_DIR.mkdir(parents=True, exist_ok=True)
+    tmp = MARKDOWN_PATH.with_suffix(f".{os.getpid()}.tmp")
+    tmp.write_text("\n".join(lines) + "\n")
+    os.replace(tmp, MARKDOWN_PATH)
+
+
+def regenerate_markdown():
+    """Rewrite memory/asset-usage.md from the log."""
+    with closing(_connect()) as conn:
+        _write_markdown(conn)
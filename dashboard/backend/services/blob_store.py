@@ -0,0 +1,96 @@
+"""Content-addressed store for stitcher source videos.
+
+Each blob is named by the sha256 of its bytes ({sha256}{ext}) under
+BLOB_DIR, so a video uploaded once can be referenced by hash from any
+later stitch instead of being sent again. A blob's mtime is its last use:
+every reference touches it, and blobs unused for BLOB_TTL are evicted.
+"""
+
+import os
+import re
+import time
+import uuid
+from pathlib import Path
+
+from config import BLOB_DIR, BLOB_TTL
+
+EVICT_INTERVAL = 600  # seconds between eviction scans
+_EVICT_STAMP = ".last_evict"
+
+_SHA256_RE = re.compile(r"[0-9a-f]{64}")
+_EXT_RE = re.compile(r"\.[a-z0-9]{1,5}")
+
+
+def valid_sha256(sha256: str) -> bool:
+    return bool(_SHA256_RE.fullmatch(sha256 or ""))
+
+
+def blob_path(sha256: str, filename: str = "") -> Path:
+    """Where a blob with this hash lives; the extension comes from `filename` (default .mp4)."""
+    if not valid_sha256(sha256):
+        raise ValueError(f"Not a sha256 hex digest: {sha256!r}")
+    ext = Path(filename).suffix.lower()
+    return BLOB_DIR / f"{sha256}{ext if _EXT_RE.fullmatch(ext) else '.mp4'}"
+
+
+def find(sha256: str) -> Path | None:
+    """The stored blob with this hash, whatever its extension, or None."""
+    if not valid_sha256(sha256) or not BLOB_DIR.is_dir():
+        return None
+    for path in BLOB_DIR.glob(f"{sha256}.*"):
+        if path.is_file():
+            return path
+    return None
+
+
+def touch(path: Path):
+    """Mark a blob as used now (restarts its TTL)."""
+    try:
+        os.utime(path)
+    except OSError:
+        pass
+
+
+def incoming_path(filename: str = "") -> Path:
+    """Hidden temp file in BLOB_DIR to stream an upload into before adopt()."""
+    BLOB_DIR.mkdir(parents=True, exist_ok=True)
+    return BLOB_DIR / f".incoming.{uuid.uuid4().hex}{Path(filename).suffix.lower()}"
+
+
+def adopt(tmp: Path, sha256: str, filename: str = "") -> Path:
+    """Move a fully written temp file into the store under its hash (dropping it if already stored)."""
+    existing = find(sha256)
+    if existing is not None:
+        tmp.unlink(missing_ok=True)
+        touch(existing)
+        return existing
+    dest = blob_path(sha256, filename)
+    os.replace(tmp, dest)
+    return dest
+
+
+def evict(force: bool = False) -> list[str]:
+    """Delete blobs unused for BLOB_TTL. Rate-limited to once per EVICT_INTERVAL unless forced.
+
+    Leftover .incoming files from crashed requests are removed the same way;
+    resumable-upload partials belong to their sessions and are left alone.
+    """
+    stamp = BLOB_DIR / _EVICT_STAMP
+    if not BLOB_DIR.is_dir():
+        return []
+    if not force and stamp.exists() and time.time() - stamp.stat().st_mtime < EVICT_INTERVAL:
+        return []
+    stamp.touch()
+
+    cutoff = time.time() - BLOB_TTL
+    removed = []
+    for path in BLOB_DIR.iterdir():
+        if path.name == _EVICT_STAMP or path.name.endswith(".part"):
+            continue
+        try:
+            if path.is_file() and path.stat().st_mtime < cutoff:
+                path.unlink()
+                removed.append(path.name)
+        except OSError:
+            continue
+    return removed
@@ -0,0 +1,344 @@
+"""Resumable chunked uploads.
+
+A client declares the file (kind, destination, size, sha256), then PUTs
+it in chunks of UPLOAD_CHUNK_BYTES, each at the offset the server reports,
+and finalizes. Chunks are appended to a hidden partial file next to the
+final destination, so finishing is a rename, not a copy. After a dropped
+connection the client asks for the offset and resumes from there.
+
+The hash is kept running while chunks arrive in order, so finalize only
+re-reads the file if the process restarted mid-upload. Declaring a hash
+the server already has (a catalog asset, or a stitcher blob) completes
+the upload at init without sending any bytes.
+
+Session state is one JSON file per upload in UPLOAD_SESSIONS_DIR; the
+received offset is the partial file's size, so any worker can resume it.
+"""
+
+import asyncio
+import fcntl
+import hashlib
+import json
+import os
+import re
+import shutil
+import threading
+import time
+import uuid
+from pathlib import Path
+
+from config import (
+    ASSETS_DIR, MAX_UPLOAD_FILE_BYTES, PERSONAS, UPLOAD_CHUNK_BYTES,
+    UPLOAD_SESSION_TTL, UPLOAD_SESSIONS_DIR,
+)
+from services import asset_catalog, blob_store, thumbnails
+
+KINDS = ("hook", "reaction", "screen-recording", "stitch")
+WRITE_SIZE = 1024 * 1024  # request-stream bytes buffered per disk write
+_SAFE_NAME_RE = re.compile(r"[A-Za-z0-9][A-Za-z0-9._ -]*")
+
+# Running hash per session: upload_id → (bytes hashed, sha256 object)
+_digests: dict[str, tuple[int, object]] = {}
+_digests_lock = threading.Lock()
+
+
+class UploadError(Exception):
+    """Rejected request; `status` is the HTTP status the router returns."""
+
+    def __init__(self, status: int, detail: str, **extra):
+        super().__init__(detail)
+        self.status = status
+        self.detail = detail
+        self.extra = extra
+
+
+# ─── Destinations ────────────────────────────────────
+
+def _safe_name(name: str | None, what: str) -> str:
+    if not name or not _SAFE_NAME_RE.fullmatch(name) or ".." in name:
+        raise UploadError(400, f"Invalid {what}: {name!r}")
+    return name
+
+
+def destination(kind: str, sha256: str, persona: str | None = None, clip_name: str | None = None,
+                app: str | None = None, filename: str | None = None) -> Path:
+    """Final path for an upload of `kind`; raises UploadError (400) for bad fields."""
+    if kind in ("hook", "reaction"):
+        if persona not in PERSONAS:
+            raise UploadError(400, f"Unknown persona: {persona}")
+        name = _safe_name(clip_name, "clip name")
+        if not name.lower().endswith(asset_catalog.VIDEO_EXTS):
+            raise UploadError(400, "Filename must end with .mp4 or .mov")
+        return ASSETS_DIR / persona / kind / name
+    if kind == "screen-recording":
+        name = _safe_name(filename, "filename")
+        if not name.lower().endswith(asset_catalog.VIDEO_EXTS):
+            raise UploadError(400, "Filename must end with .mp4 or .mov")
+        return ASSETS_DIR / "screen-recordings" / _safe_name(app, "app") / name
+    if kind == "stitch":
+        try:
+            return blob_store.blob_path(sha256, filename or "")
+        except ValueError as e:
+            raise UploadError(400, str(e))
+    raise UploadError(400, f"Unknown upload kind: {kind}")
+
+
+# ─── Session files ───────────────────────────────────
+
+def _session_path(upload_id: str) -> Path:
+    if not re.fullmatch(r"[0-9a-f]{32}", upload_id):
+        raise UploadError(404, "Upload not found")
+    return UPLOAD_SESSIONS_DIR / f"{upload_id}.json"
+
+
+def _load(upload_id: str) -> dict:
+    try:
+        return json.loads(_session_path(upload_id).read_text())
+    except (OSError, json.JSONDecodeError):
+        raise UploadError(404, "Upload not found")
+
+
+def _save(session: dict):
+    UPLOAD_SESSIONS_DIR.mkdir(parents=True, exist_ok=True)
+    path = _session_path(session["id"])
+    tmp = path.with_suffix(f".{os.getpid()}.tmp")
+    tmp.write_text(json.dumps(session))
+    os.replace(tmp, path)
+
+
+def _drop(session: dict, keep_partial: bool = False):
+    if not keep_partial:
+        Path(session["partial"]).unlink(missing_ok=True)
+    _session_path(session["id"]).unlink(missing_ok=True)
+    with _digests_lock:
+        _digests.pop(session["id"], None)
+
+
+def _sha256(path: Path) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        while chunk := f.read(WRITE_SIZE):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _offset(session: dict) -> int:
+    try:
+        return Path(session["partial"]).stat().st_size
+    except OSError:
+        return 0
+
+
+def _status(session: dict, **extra) -> dict:
+    return {
+        "id": session["id"],
+        "kind": session["kind"],
+        "size": session["size"],
+        "offset": _offset(session),
+        "chunk_size": UPLOAD_CHUNK_BYTES,
+        "complete": False,
+        **extra,
+    }
+
+
+def _completed(kind: str, dest: Path, sha256: str, size: int, **extra) -> dict:
+    result = {"complete": True, "kind": kind, "size": size, "sha256": sha256, **extra}
+    if kind != "stitch":
+        result["path"] = dest.relative_to(ASSETS_DIR).as_posix()
+    return result
+
+
+# ─── Protocol ────────────────────────────────────────
+
+def _known_copy(kind: str, sha256: str, size: int) -> Path | None:
+    """An existing file with the declared bytes, if the server already has it."""
+    if kind == "stitch":
+        blob = blob_store.find(sha256)
+        if blob is None or blob.stat().st_size != size:
+            return None
+        blob_store.touch(blob)
+        return blob
+    return asset_catalog.find_by_sha256(sha256, size)
+
+
+def _installed(kind: str, dest: Path, sha256: str):
+    """Catalog (and thumbnail) a file that just landed under ASSETS_DIR."""
+    if kind == "stitch":
+        return
+    asset_catalog.index_file(dest, sha256)
+    if kind in ("hook", "reaction"):
+        thumbnails.submit(dest.relative_to(ASSETS_DIR).as_posix())
+
+
+def start(kind: str, dest: Path, size: int, sha256: str) -> dict:
+    """Open an upload session, or complete at once if these bytes are already stored. Blocking."""
+    sha256 = (sha256 or "").lower()
+    if not blob_store.valid_sha256(sha256):
+        raise UploadError(400, "sha256 must be a hex digest")
+    if size <= 0:
+        raise UploadError(400, "size must be positive")
+    if size > MAX_UPLOAD_FILE_BYTES:
+        raise UploadError(413, f"File exceeds {MAX_UPLOAD_FILE_BYTES // (1024 * 1024)} MB limit")
+    sweep_expired()
+
+    known = _known_copy(kind, sha256, size)
+    if known is not None:
+        if kind != "stitch" and known != dest:  # blobs are looked up by hash alone
+            dest.parent.mkdir(parents=True, exist_ok=True)
+            tmp = dest.with_name(f".{dest.name}.link")
+            tmp.unlink(missing_ok=True)
+            try:
+                os.link(known, tmp)
+            except OSError:  # other filesystem
+                shutil.copyfile(known, tmp)
+            os.replace(tmp, dest)
+            _installed(kind, dest, sha256)
+        return _completed(kind, dest, sha256, size, deduplicated=True)
+
+    upload_id = uuid.uuid4().hex
+    dest.parent.mkdir(parents=True, exist_ok=True)
+    partial = dest.with_name(f".{dest.name}.{upload_id}.part")
+    partial.touch()
+    session = {
+        "id": upload_id,
+        "kind": kind,
+        "dest": str(dest),
+        "partial": str(partial),
+        "size": size,
+        "sha256": sha256,
+        "created_at": time.time(),
+    }
+    _save(session)
+    return _status(session)
+
+
+def status(upload_id: str) -> dict:
+    """Current offset of an open upload (where the next chunk must start)."""
+    return _status(_load(upload_id))
+
+
+async def write_chunk(upload_id: str, offset: int, stream) -> dict:
+    """Append a request body stream at `offset`. 409 (with the real offset) if it doesn't match.
+
+    One chunk per session at a time (flock), so a retried request can't
+    interleave with the one it replaces.
+    """
+    session = _load(upload_id)
+    try:
+        out = open(session["partial"], "r+b")
+    except FileNotFoundError:
+        _drop(session)  # partial swept or removed: the session can't be resumed
+        raise UploadError(404, "Upload data is gone — start the upload again")
+    with out:
+        try:
+            fcntl.flock(out, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            raise UploadError(409, "Another chunk for this upload is in progress", offset=_offset(session))
+        current = os.fstat(out.fileno()).st_size
+        if offset != current:
+            raise UploadError(409, f"Expected offset {current}", offset=current)
+
+        with _digests_lock:
+            hashed, digest = _digests.get(upload_id, (0, None))
+        if digest is None and offset == 0:
+            digest = hashlib.sha256()
+        elif hashed != offset:
+            digest = None  # resumed in another process: finalize re-reads the file
+
+        out.seek(offset)
+        position = offset
+        buffer = bytearray()
+
+        async def flush():
+            nonlocal position
+            await asyncio.to_thread(out.write, buffer)
+            if digest is not None:
+                digest.update(buffer)
+            position += len(buffer)
+            buffer.clear()
+
+        try:
+            async for piece in stream:
+                if position + len(buffer) + len(piece) > session["size"]:
+                    raise UploadError(413, f"Chunk runs past the declared size ({session['size']} bytes)",
+                                      offset=position)
+                buffer += piece
+                if len(buffer) >= WRITE_SIZE:
+                    await flush()
+            if buffer:
+                await flush()
+        except BaseException:
+            out.flush()
+            out.truncate(position)  # drop a half-written buffer; keep every whole write
+            raise
+        finally:
+            with _digests_lock:
+                if digest is not None:
+                    _digests[upload_id] = (position, digest)
+                else:
+                    _digests.pop(upload_id, None)
+
+    return _status(session)
+
+
+def finalize(upload_id: str) -> dict:
+    """Verify the received bytes against the declared sha256 and move them into place. Blocking.
+
+    A hash mismatch discards the upload (422): the client starts over.
+    """
+    session = _load(upload_id)
+    partial, dest = Path(session["partial"]), Path(session["dest"])
+    received = _offset(session)
+    if received != session["size"]:
+        raise UploadError(409, f"Upload incomplete: {received} of {session['size']} bytes", offset=received)
+
+    with _digests_lock:
+        hashed, digest = _digests.get(upload_id, (0, None))
+    if digest is not None and hashed == received:
+        actual = digest.hexdigest()
+    else:
+        actual = _sha256(partial)
+    if actual != session["sha256"]:
+        _drop(session)
+        raise UploadError(422, f"sha256 mismatch: declared {session['sha256']}, received {actual}")
+
+    if session["kind"] == "stitch" and dest.exists():
+        partial.unlink(missing_ok=True)  # same blob finished by a parallel upload
+    else:
+        os.replace(partial, dest)
+    _drop(session, keep_partial=True)
+    _installed(session["kind"], dest, actual)
+    return _completed(session["kind"], dest, actual, received)
+
+
+def abort(upload_id: str):
+    """Discard an open upload and its partial file."""
+    _drop(_load(upload_id))
+
+
+def _last_activity(session: dict) -> float:
+    """When the session last received bytes (the partial's mtime), or was created."""
+    try:
+        return max(session.get("created_at", 0), Path(session["partial"]).stat().st_mtime)
+    except OSError:
+        return session.get("created_at", 0)
+
+
+def sweep_expired() -> int:
+    """Discard sessions idle for UPLOAD_SESSION_TTL. Returns the number removed.
+
+    Idle means no chunk received, so a long upload that keeps resuming is never cut off.
+    """
+    if not UPLOAD_SESSIONS_DIR.is_dir():
+        return 0
+    removed = 0
+    cutoff = time.time() - UPLOAD_SESSION_TTL
+    for path in UPLOAD_SESSIONS_DIR.glob("*.json"):
+        try:
+            session = json.loads(path.read_text())
+        except (OSError, json.JSONDecodeError):
+            continue
+        if _last_activity(session) < cutoff:
+            _drop(session)
+            removed += 1
+    return removed
@@ -3,23 +3,10 @@
 import anthropic
 
 from config import ANTHROPIC_API_KEY, ANTHROPIC_MODEL
+from services.prompt_cache import log_usage, system_blocks
 from services.skill_loader import load_context
 
-
-async def build_system_prompt(skill_files: list[str] | None = None, memory_files: list[str] | None = None, include_analytics: bool = False) -> str:
-    """Build system prompt with loaded skill context."""
-    context = load_context(skill_files, memory_files)
-
-    analytics_block = ""
-    if include_analytics:
-        from services.posthog_client import format_metrics_for_ai
-        analytics_block = "\n\n" + await format_metrics_for_ai()
-
-    return f"""You are the OpenClaw content engine assistant. You help create, analyze, and optimize UGC-style video content for the ManifestLock and JournalLock apps.
-
-You have access to the following knowledge:
-
-{context}{analytics_block}
+INSTRUCTIONS = """You are the OpenClaw content engine assistant. You help create, analyze, and optimize UGC-style video content for the ManifestLock and JournalLock apps.
 
 You can help with:
 - Generating hook text and reaction text for reels
@@ -28,7 +15,21 @@ You can help with:
 - Reviewing and improving captions
 - Answering questions about the pipeline and content strategy
 
-Be concise, creative, and speak in a Gen Z-friendly voice when generating content. For strategy questions, be analytical and data-driven."""
+Be concise, creative, and speak in a Gen Z-friendly voice when generating content. For strategy questions, be analytical and data-driven.
+
+You have access to the following knowledge:"""
+
+
+async def build_system_prompt(skill_files: list[str] | None = None, memory_files: list[str] | None = None, include_analytics: bool = False) -> list[dict]:
+    """Build system prompt blocks: instructions + skills, memory (both cached), then live analytics."""
+    skills, memory = load_context(skill_files, memory_files)
+
+    analytics_block = ""
+    if include_analytics:
+        from services.posthog_client import format_metrics_for_ai
+        analytics_block = await format_metrics_for_ai()
+
+    return system_blocks(f"{INSTRUCTIONS}\n\n{skills}", memory, volatile=analytics_block)
 
 
 async def stream_chat(messages: list[dict], skill_files: list[str] | None = None, memory_files: list[str] | None = None, include_analytics: bool = False):
@@ -48,3 +49,4 @@ async def stream_chat(messages: list[dict], skill_files: list[str] | None = None
     ) as stream:
         for text in stream.text_stream:
             yield text
+        log_usage("chat.stream", ANTHROPIC_MODEL, stream.get_final_message().usage)
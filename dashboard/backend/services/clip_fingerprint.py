@@ -0,0 +1,93 @@
+"""Perceptual fingerprints for near-duplicate clip detection.
+
+A fingerprint is the dHash of FRAMES frames sampled evenly across the
+clip: each frame is shrunk to 9x8 grey pixels by ffmpeg, and the 64 bits
+say whether each pixel is brighter than its left neighbour. Veo
+regenerations and re-uploads of the same take land within a few bits of
+each other. Distances are mean Hamming bits per frame, computed for a
+whole folder at once with NumPy.
+"""
+
+import subprocess
+
+import numpy as np
+
+from services.ffmpeg_slots import run_ffmpeg
+
+FRAMES = 8
+HASH_W, HASH_H = 9, 8
+DEFAULT_THRESHOLD = 6.0  # mean differing bits per frame (of 64)
+
+# Bits set in every byte value — popcount by table lookup
+_POPCOUNT = np.array([bin(i).count("1") for i in range(256)], dtype=np.uint8)
+
+
+def dhash_frames(gray: np.ndarray) -> np.ndarray:
+    """(k, 8, 9) uint8 grey frames → (k,) uint64 dHashes."""
+    bits = gray[:, :, 1:] > gray[:, :, :-1]
+    packed = np.packbits(bits.reshape(len(gray), 64), axis=1)
+    return packed.view(">u8").ravel().astype(np.uint64)
+
+
+def fingerprint(path, duration: float | None) -> bytes | None:
+    """FRAMES dHashes of a clip as bytes (for the catalog), or None if ffmpeg fails."""
+    rate = FRAMES / duration if duration else 2
+    try:
+        result = run_ffmpeg([
+            "ffmpeg", "-v", "error", "-i", str(path),
+            "-vf", f"fps={rate:.4f},scale={HASH_W}:{HASH_H}:flags=area,format=gray",
+            "-frames:v", str(FRAMES), "-f", "rawvideo", "pipe:1",
+        ], "fingerprint", text=False, timeout=120)
+    except (OSError, subprocess.TimeoutExpired):
+        return None
+    frame_size = HASH_W * HASH_H
+    count = len(result.stdout) // frame_size
+    if result.returncode != 0 or count == 0:
+        return None
+    frames = np.frombuffer(result.stdout[:count * frame_size], dtype=np.uint8)
+    frames = frames.reshape(count, HASH_H, HASH_W)
+    # Short clips can yield fewer frames — stretch to FRAMES so vectors align
+    frames = frames[np.linspace(0, count - 1, FRAMES).round().astype(int)]
+    return dhash_frames(frames).tobytes()
+
+
+def as_matrix(blobs: list[bytes]) -> np.ndarray:
+    """Stack catalog fingerprint blobs into an (n, FRAMES) uint64 matrix."""
+    return np.frombuffer(b"".join(blobs), dtype=np.uint64).reshape(len(blobs), FRAMES)
+
+
+def distances(matrix: np.ndarray) -> np.ndarray:
+    """(n, n) mean Hamming distance per frame between every pair of fingerprints."""
+    n = len(matrix)
+    xor = matrix[:, None, :] ^ matrix[None, :, :]
+    bits = _POPCOUNT[xor.view(np.uint8)].reshape(n, n, FRAMES, 8).sum(axis=3)
+    return bits.mean(axis=2)
+
+
+def clusters(blobs: list[bytes], threshold: float = DEFAULT_THRESHOLD) -> list[list[tuple[int, float]]]:
+    """Groups of indices whose fingerprints are within `threshold` of each other.
+
+    Single-linkage (union-find over close pairs). Each member is returned as
+    (index, distance to the group's first member); singletons are omitted.
+    """
+    if len(blobs) < 2:
+        return []
+    dist = distances(as_matrix(blobs))
+    parent = list(range(len(blobs)))
+
+    def find(i):
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    for i, j in zip(*np.nonzero(np.triu(dist <= threshold, k=1))):
+        parent[find(i)] = find(j)
+
+    groups: dict[int, list[int]] = {}
+    for i in range(len(blobs)):
+        groups.setdefault(find(i), []).append(i)
+    return [
+        [(i, round(float(dist[members[0], i]), 2)) for i in members]
+        for members in groups.values() if len(members) > 1
+    ]
@@ -0,0 +1,255 @@
+"""Compiled skill/memory context for LLM system prompts.
+
+Every call site assembles its context the same way: a list of markdown
+files, each under a header line, joined with blank lines. The assembled
+text is cached per section list and reused while every file's (mtime,
+size) stamp is unchanged, so a multi-account autopilot run or a chat
+session re-reads nothing after the first call — each call only stats
+the files. The output is a pure function of the file contents, so
+repeated system prompts are byte-identical (and stay warm in the API's
+prompt cache). Knowledge-editor writes call invalidate() as well, for
+edits that land within the filesystem's mtime resolution.
+
+budget_context() additionally caps the assembled size. It works from a
+token index — per-file and per-"## "-section counts, persisted to
+CONTEXT_TOKEN_INDEX and recomputed only for files whose stamp changed —
+so it can decide what fits before reading anything. Counts are estimates
+(~4 characters per token), which is close enough to bound prompt size.
+"""
+
+import json
+import os
+import re
+import threading
+from pathlib import Path
+
+from config import CONTEXT_TOKEN_BUDGET, CONTEXT_TOKEN_INDEX
+
+CHARS_PER_TOKEN = 4
+TRIM_MARKER = "[… trimmed to fit the context budget]"
+
+_SECTION_RE = re.compile(r"^## ", re.MULTILINE)
+
+# (section list) → (file stamps, compiled text)
+_cache: dict[tuple, tuple[tuple, str | tuple]] = {}
+_lock = threading.Lock()
+_stats = {"hits": 0, "misses": 0}
+
+# str(path) → {"stamp": [mtime_ns, size], "tokens": n, "sections": [[heading, start, end, tokens], ...]}
+_index: dict[str, dict] | None = None
+_index_dirty = False
+
+
+def _stamp(path: Path) -> tuple[int, int] | None:
+    try:
+        stat = path.stat()
+    except OSError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+
+def compile_context(sections: list[tuple[Path, str]]) -> str:
+    """Join (file, header) sections as "header\\ncontent" blocks, cached until a file changes.
+
+    Content is stripped; missing and empty files are left out.
+    """
+    key = tuple((str(path), header) for path, header in sections)
+    stamps = tuple(_stamp(Path(path)) for path, _ in sections)
+    with _lock:
+        cached = _cache.get(key)
+        if cached is not None and cached[0] == stamps:
+            _stats["hits"] += 1
+            return cached[1]
+        _stats["misses"] += 1
+
+    parts = []
+    for (path, header), stamp in zip(sections, stamps):
+        if stamp is None:
+            continue
+        try:
+            content = Path(path).read_text().strip()
+        except OSError:
+            continue
+        if content:
+            parts.append(f"{header}\n{content}")
+    compiled = "\n\n".join(parts)
+
+    with _lock:
+        _cache[key] = (stamps, compiled)
+    return compiled
+
+
+def estimate_tokens(text: str) -> int:
+    return -(-len(text) // CHARS_PER_TOKEN)
+
+
+def _load_index() -> dict[str, dict]:
+    global _index
+    if _index is None:
+        try:
+            _index = json.loads(CONTEXT_TOKEN_INDEX.read_text())
+        except (OSError, ValueError):
+            _index = {}
+    return _index
+
+
+def _save_index():
+    global _index_dirty
+    with _lock:
+        if not _index_dirty:
+            return
+        data = json.dumps(_index)
+        _index_dirty = False
+    try:
+        CONTEXT_TOKEN_INDEX.parent.mkdir(parents=True, exist_ok=True)
+        tmp = CONTEXT_TOKEN_INDEX.with_suffix(f".{os.getpid()}.tmp")
+        tmp.write_text(data)
+        os.replace(tmp, CONTEXT_TOKEN_INDEX)
+    except OSError:
+        pass
+
+
+def _index_file(path: Path, stamp: tuple[int, int]) -> dict | None:
+    """Token entry for a file: total plus one row per section (intro, then each "## " heading)."""
+    global _index_dirty
+    with _lock:
+        entry = _load_index().get(str(path))
+    if entry is not None and tuple(entry["stamp"]) == stamp:
+        return entry
+    try:
+        content = path.read_text().strip()
+    except OSError:
+        return None
+    starts = [0] + [m.start() for m in _SECTION_RE.finditer(content) if m.start() > 0]
+    ends = starts[1:] + [len(content)]
+    sections = []
+    for start, end in zip(starts, ends):
+        heading = content[start:end].split("\n", 1)[0] if content.startswith("## ", start) else ""
+        sections.append([heading, start, end, estimate_tokens(content[start:end])])
+    entry = {"stamp": list(stamp), "tokens": estimate_tokens(content), "sections": sections}
+    with _lock:
+        _load_index()[str(path)] = entry
+        _index_dirty = True
+    return entry
+
+
+def token_index(paths: list[Path]) -> dict[str, dict]:
+    """Index entries (token totals and sections) for existing files, refreshing changed ones."""
+    entries = {}
+    for path in map(Path, paths):
+        stamp = _stamp(path)
+        entry = _index_file(path, stamp) if stamp is not None else None
+        if entry is not None:
+            entries[str(path)] = entry
+    _save_index()
+    return entries
+
+
+def budget_context(blocks: list[list[tuple[Path, str, int]]],
+                   budget: int | None = None, reserve: list[int] | None = None) -> tuple[list[str], dict]:
+    """Compile blocks of (file, header, priority) sections within a token budget.
+
+    Blocks are filled in order, so what a block keeps never depends on the
+    blocks after it: pass them most-shared first and the shared prompt
+    prefix stays identical across calls. `reserve` gives a floor per block:
+    those tokens are held back from the blocks before it, so a later block
+    gets at least its reserve plus whatever the earlier blocks left. Within
+    a block, files are admitted by priority (0 first, ties in list order):
+    whole if they fit, else cut back to their leading "## " sections, else
+    dropped. Each block's text keeps its own list order. Budget defaults to
+    CONTEXT_TOKEN_BUDGET; 0 means unlimited. Returns (one text per block,
+    report) where the report holds the budget, estimated tokens used, file
+    count and trimmed/dropped names.
+    """
+    budget = CONTEXT_TOKEN_BUDGET if budget is None else budget
+    reserve = list(reserve or [0] * len(blocks))
+    flat = [(b, i, Path(path), header, priority)
+            for b, block in enumerate(blocks) for i, (path, header, priority) in enumerate(block)]
+    key = ("budget", budget, tuple(reserve),
+           tuple((b, str(path), header, priority) for b, _, path, header, priority in flat))
+    stamps = tuple(_stamp(path) for _, _, path, _, _ in flat)
+    with _lock:
+        cached = _cache.get(key)
+        if cached is not None and cached[0] == stamps:
+            _stats["hits"] += 1
+            texts, report = cached[1]
+            return list(texts), dict(report)
+        _stats["misses"] += 1
+
+    entries = {}
+    for (b, i, path, _, _), stamp in zip(flat, stamps):
+        entry = _index_file(path, stamp) if stamp is not None else None
+        if entry is not None and entry["tokens"]:
+            entries[b, i] = entry
+    _save_index()
+
+    remaining = budget or float("inf")
+    keep: dict[tuple[int, int], int | None] = {}  # (block, position) → cut offset, None for whole file
+    report = {"budget": budget, "tokens": 0, "files": 0, "trimmed": [], "dropped": []}
+    for b, i, path, header, _ in sorted(flat, key=lambda f: (f[0], f[4], f[1])):
+        entry = entries.get((b, i))
+        if entry is None:
+            continue
+        available = remaining - sum(reserve[b + 1:])
+        header_tokens = estimate_tokens(header) + 1
+        if header_tokens + entry["tokens"] <= available:
+            keep[b, i] = None
+            cost = header_tokens + entry["tokens"]
+        else:
+            cost, cut = header_tokens + estimate_tokens(TRIM_MARKER) + 1, 0
+            for _, _, end, tokens in entry["sections"]:
+                if cost + tokens > available:
+                    break
+                cost, cut = cost + tokens, end
+            if not cut:
+                report["dropped"].append(path.name)
+                continue
+            keep[b, i] = cut
+            report["trimmed"].append(path.name)
+        remaining -= cost
+        report["tokens"] += cost
+
+    texts = []
+    for b, block in enumerate(blocks):
+        parts = []
+        for i, (path, header, _) in enumerate(block):
+            if (b, i) not in keep:
+                continue
+            try:
+                content = Path(path).read_text().strip()
+            except OSError:
+                continue
+            cut = keep[b, i]
+            if cut is not None:
+                content = f"{content[:cut].rstrip()}\n\n{TRIM_MARKER}"
+            parts.append(f"{header}\n{content}")
+        texts.append("\n\n".join(parts))
+    report["files"] = len(keep)
+
+    with _lock:
+        _cache[key] = (stamps, (tuple(texts), report))
+    return texts, dict(report)
+
+
+def format_report(report: dict) -> str:
+    """One-line summary of a budget_context() report for run logs."""
+    budget = report["budget"] or "unlimited"
+    line = f"context: ~{report['tokens']}/{budget} tokens, {report['files']} files"
+    if report["trimmed"]:
+        line += f", trimmed {', '.join(report['trimmed'])}"
+    if report["dropped"]:
+        line += f", dropped {', '.join(report['dropped'])}"
+    return line
+
+
+def invalidate():
+    """Drop every cached context and token entry (after a skill or memory file is edited)."""
+    global _index
+    with _lock:
+        _cache.clear()
+        _index = {}
+
+
+def cache_stats() -> dict:
+    with _lock:
+        return {"entries": len(_cache), **_stats}
@@ -0,0 +1,147 @@
+"""ffmpeg -progress parsing — percent, encode fps, speed and ETA for running encodes.
+
+Used in-process by the stitcher, and by the pipeline scripts, which print one
+marker line per update so pipeline_runner can pick progress out of stdout.
+"""
+
+import json
+import os
+import subprocess
+import threading
+
+from services.ffmpeg_slots import apply_thread_budget, ffmpeg_slot
+
+# Prefix for machine-readable progress lines on a script's stdout
+PROGRESS_MARKER = "@@ffmpeg-progress "
+
+# pipeline_runner sets this for its child processes; scripts stay quiet otherwise
+PROGRESS_ENV = "OPENCLAW_FFMPEG_PROGRESS"
+
+
+def probe_duration(path) -> float | None:
+    """Return media duration in seconds via ffprobe, or None if unknown."""
+    try:
+        result = subprocess.run(
+            ["ffprobe", "-v", "error", "-show_entries", "format=duration",
+             "-of", "default=noprint_wrappers=1:nokey=1", str(path)],
+            capture_output=True, text=True, timeout=30,
+        )
+        return float(result.stdout.strip())
+    except (OSError, ValueError, subprocess.TimeoutExpired):
+        return None
+
+
+def estimate_duration(cmd: list[str]) -> float | None:
+    """Best-effort output duration: the first file input, capped by -t if present."""
+    duration = None
+    if "-i" in cmd:
+        source = cmd[cmd.index("-i") + 1]
+        if os.path.isfile(source):
+            duration = probe_duration(source)
+    if "-t" in cmd:
+        try:
+            limit = float(cmd[cmd.index("-t") + 1])
+            duration = min(duration, limit) if duration else limit
+        except (IndexError, ValueError):
+            pass
+    return duration
+
+
+def _parse_speed(value: str) -> float | None:
+    value = value.strip().rstrip("x")
+    try:
+        return float(value)
+    except ValueError:
+        return None
+
+
+def _snapshot(fields: dict, duration: float | None) -> dict:
+    """Turn one block of ffmpeg key=value progress output into a status dict."""
+    out_us = fields.get("out_time_us") or fields.get("out_time_ms")
+    try:
+        done = max(0.0, int(out_us) / 1_000_000) if out_us else 0.0
+    except ValueError:
+        done = 0.0
+
+    try:
+        fps = float(fields.get("fps", "0"))
+    except ValueError:
+        fps = 0.0
+    speed = _parse_speed(fields.get("speed", ""))
+
+    finished = fields.get("progress") == "end"
+    percent = None
+    eta = None
+    if duration:
+        percent = 100.0 if finished else min(99.9, done / duration * 100)
+        if speed and not finished:
+            eta = max(0.0, (duration - done) / speed)
+
+    return {
+        "state": "done" if finished else "running",
+        "out_time": round(done, 2),
+        "duration": round(duration, 2) if duration else None,
+        "percent": round(percent, 1) if percent is not None else None,
+        "fps": round(fps, 1),
+        "speed": speed,
+        "eta_seconds": round(eta, 1) if eta is not None else None,
+    }
+
+
+def run_ffmpeg_with_progress(cmd: list[str], duration: float | None = None,
+                             on_progress=None, label: str = "ffmpeg") -> subprocess.CompletedProcess:
+    """Run an ffmpeg command, calling on_progress(dict) as the encode advances.
+
+    `cmd` starts with "ffmpeg"; -progress pipe:1 is injected after it. stderr
+    is drained on a separate thread so a chatty encode can't fill the pipe.
+    The encode waits for a host-wide ffmpeg slot first.
+    """
+    if duration is None:
+        duration = estimate_duration(cmd)
+
+    with ffmpeg_slot(label) as threads:
+        full_cmd = apply_thread_budget([cmd[0], "-progress", "pipe:1", "-nostats"] + cmd[1:], threads)
+        proc = subprocess.Popen(
+            full_cmd,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            text=True,
+        )
+        stderr_chunks: list[str] = []
+        drain = threading.Thread(target=lambda: stderr_chunks.append(proc.stderr.read()), daemon=True)
+        drain.start()
+
+        fields: dict[str, str] = {}
+        for line in proc.stdout:
+            key, _, value = line.strip().partition("=")
+            if not key:
+                continue
+            fields[key] = value
+            if key == "progress":
+                if on_progress:
+                    on_progress(_snapshot(fields, duration))
+                fields = {}
+
+        proc.wait()
+        drain.join()
+    return subprocess.CompletedProcess(full_cmd, proc.returncode, "", "".join(stderr_chunks))
+
+
+def progress_enabled() -> bool:
+    """True when the parent process asked for progress marker lines."""
+    return os.environ.get(PROGRESS_ENV) == "1"
+
+
+def format_progress_line(label: str, progress: dict) -> str:
+    """Serialize a progress update for a script's stdout."""
+    return PROGRESS_MARKER + json.dumps({"label": label, **progress})
+
+
+def parse_progress_line(line: str) -> dict | None:
+    """Parse a marker line from a child script's stdout; None for ordinary output."""
+    if not line.startswith(PROGRESS_MARKER):
+        return None
+    try:
+        return json.loads(line[len(PROGRESS_MARKER):])
+    except json.JSONDecodeError:
+        return None
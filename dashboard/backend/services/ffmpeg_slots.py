@@ -0,0 +1,247 @@
+"""Host-wide ffmpeg slot broker.
+
+ffmpeg is launched from the API (thumbnails, reaction clips, the stitcher),
+from pipeline scripts started by the dashboard, and from dispatcher runs.
+Every launch takes one of FFMPEG_SLOTS flock-backed slots first, so the
+host never runs more encodes than it can handle, and each encode is capped
+at FFMPEG_THREADS threads. Locks are released by the kernel if a process
+dies, so a crashed run never leaks a slot.
+"""
+
+import asyncio
+import fcntl
+import json
+import os
+import subprocess
+import time
+import uuid
+from contextlib import asynccontextmanager, contextmanager
+from datetime import datetime, timezone
+
+from config import FFMPEG_SLOTS, FFMPEG_SLOTS_DIR, FFMPEG_THREADS
+
+POLL_INTERVAL = 0.25  # seconds between attempts while every slot is busy
+WAITING_DIR = FFMPEG_SLOTS_DIR / "waiting"
+HISTORY_PATH = FFMPEG_SLOTS_DIR / "history.jsonl"
+HISTORY_KEEP = 500
+
+
+def _slot_path(i: int):
+    return FFMPEG_SLOTS_DIR / f"slot{i}.lock"
+
+
+def _pid_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+def _try_acquire():
+    """Grab any free slot without blocking. Returns (index, open file) or None."""
+    for i in range(FFMPEG_SLOTS):
+        f = open(_slot_path(i), "a+")
+        try:
+            fcntl.flock(f, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            f.close()
+            continue
+        return i, f
+    return None
+
+
+def _record_wait(entry: dict):
+    """Append to the wait history, trimming it so it never grows unbounded."""
+    with open(HISTORY_PATH, "a+") as f:
+        fcntl.flock(f, fcntl.LOCK_EX)
+        f.write(json.dumps(entry) + "\n")
+        f.flush()
+        f.seek(0)
+        lines = f.readlines()
+        if len(lines) > HISTORY_KEEP * 2:
+            f.seek(0)
+            f.truncate()
+            f.writelines(lines[-HISTORY_KEEP:])
+
+
+def _claim(index: int, lock, label: str, requested: float):
+    """Record the new holder in its slot file and the wait history."""
+    waited = time.time() - requested
+    lock.seek(0)
+    lock.truncate()
+    lock.write(json.dumps({
+        "pid": os.getpid(), "label": label,
+        "since": time.time(), "waited_s": round(waited, 2),
+    }))
+    lock.flush()
+    _record_wait({
+        "at": datetime.now(timezone.utc).isoformat(),
+        "label": label, "slot": index, "waited_s": round(waited, 2),
+    })
+
+
+def _release(lock):
+    lock.seek(0)
+    lock.truncate()
+    fcntl.flock(lock, fcntl.LOCK_UN)
+    lock.close()
+
+
+def _try_claim(label: str, requested: float):
+    """_try_acquire, then _claim the slot if one was free — one call to run off the event loop."""
+    acquired = _try_acquire()
+    if acquired is not None:
+        try:
+            _claim(*acquired, label, requested)
+        except BaseException:
+            _release(acquired[1])
+            raise
+    return acquired
+
+
+def _release_abandoned(task: asyncio.Future):
+    """Done-callback for an acquire whose waiter was cancelled mid-call: give the slot back."""
+    if not task.cancelled() and task.exception() is None and task.result() is not None:
+        _release(task.result()[1])
+
+
+async def _try_claim_async(label: str, requested: float):
+    task = asyncio.ensure_future(asyncio.to_thread(_try_claim, label, requested))
+    try:
+        return await asyncio.shield(task)
+    except asyncio.CancelledError:
+        task.add_done_callback(_release_abandoned)
+        raise
+
+
+def _waiter_file(label: str, requested: float):
+    WAITING_DIR.mkdir(parents=True, exist_ok=True)
+    waiter = WAITING_DIR / f"{os.getpid()}-{uuid.uuid4().hex[:8]}.json"
+    waiter.write_text(json.dumps({"pid": os.getpid(), "label": label, "since": requested}))
+    return waiter
+
+
+@contextmanager
+def ffmpeg_slot(label: str = "ffmpeg"):
+    """Block until a slot is free; yields the thread budget for this encode."""
+    FFMPEG_SLOTS_DIR.mkdir(parents=True, exist_ok=True)
+    requested = time.time()
+    acquired = _try_acquire()
+    if acquired is None:
+        waiter = _waiter_file(label, requested)
+        try:
+            while acquired is None:
+                time.sleep(POLL_INTERVAL)
+                acquired = _try_acquire()
+        finally:
+            waiter.unlink(missing_ok=True)
+
+    index, lock = acquired
+    try:
+        _claim(index, lock, label, requested)
+        yield FFMPEG_THREADS
+    finally:
+        _release(lock)
+
+
+@asynccontextmanager
+async def ffmpeg_slot_async(label: str = "ffmpeg"):
+    """ffmpeg_slot for async routes — polls with asyncio.sleep, so a queued
+    request holds neither the event loop nor a default-executor thread.
+    Each attempt, and all other file I/O, runs in a worker thread."""
+    await asyncio.to_thread(FFMPEG_SLOTS_DIR.mkdir, parents=True, exist_ok=True)
+    requested = time.time()
+    acquired = await _try_claim_async(label, requested)
+    if acquired is None:
+        waiter = await asyncio.to_thread(_waiter_file, label, requested)
+        try:
+            while acquired is None:
+                await asyncio.sleep(POLL_INTERVAL)
+                acquired = await _try_claim_async(label, requested)
+        finally:
+            # also when the client goes away while queued
+            await asyncio.to_thread(waiter.unlink, missing_ok=True)
+
+    try:
+        yield FFMPEG_THREADS
+    finally:
+        await asyncio.to_thread(_release, acquired[1])
+
+
+def apply_thread_budget(cmd: list[str], threads: int) -> list[str]:
+    """Cap filter and encoder threads: global filter flags, plus -threads after each -c:v."""
+    out = [cmd[0], "-filter_threads", str(threads), "-filter_complex_threads", str(threads)]
+    args = cmd[1:]
+    i = 0
+    while i < len(args):
+        out.append(args[i])
+        if args[i] == "-c:v" and i + 1 < len(args):
+            out += [args[i + 1], "-threads", str(threads)]
+            i += 1
+        i += 1
+    return out
+
+
+def run_ffmpeg(cmd: list[str], label: str = "ffmpeg", **kwargs) -> subprocess.CompletedProcess:
+    """subprocess.run for an ffmpeg command, inside a slot and thread budget."""
+    kwargs.setdefault("capture_output", True)
+    kwargs.setdefault("text", True)
+    with ffmpeg_slot(label) as threads:
+        return subprocess.run(apply_thread_budget(cmd, threads), **kwargs)
+
+
+def slot_stats() -> dict:
+    """Who holds each slot, who is queued, and recent wait times."""
+    busy = []
+    for i in range(FFMPEG_SLOTS):
+        path = _slot_path(i)
+        if not path.exists():
+            continue
+        with open(path, "a+") as f:
+            try:
+                fcntl.flock(f, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                fcntl.flock(f, fcntl.LOCK_UN)
+                continue  # free
+            except BlockingIOError:
+                pass
+            f.seek(0)
+            try:
+                holder = json.loads(f.read() or "{}")
+            except json.JSONDecodeError:
+                holder = {}
+        busy.append({"slot": i, **holder})
+
+    waiting = []
+    if WAITING_DIR.exists():
+        for path in WAITING_DIR.glob("*.json"):
+            try:
+                entry = json.loads(path.read_text())
+            except (OSError, json.JSONDecodeError):
+                continue
+            if not _pid_alive(entry["pid"]):
+                path.unlink(missing_ok=True)  # waiter died without cleaning up
+                continue
+            entry["waiting_s"] = round(time.time() - entry["since"], 1)
+            waiting.append(entry)
+    waiting.sort(key=lambda w: w["since"])
+
+    recent = []
+    if HISTORY_PATH.exists():
+        recent = [json.loads(line) for line in HISTORY_PATH.read_text().splitlines()[-100:] if line]
+    waits = [r["waited_s"] for r in recent]
+
+    return {
+        "slots": FFMPEG_SLOTS,
+        "threads_per_slot": FFMPEG_THREADS,
+        "busy": busy,
+        "waiting": waiting,
+        "recent": {
+            "count": len(waits),
+            "avg_wait_s": round(sum(waits) / len(waits), 2) if waits else 0.0,
+            "max_wait_s": max(waits, default=0.0),
+            "queued": sum(1 for w in waits if w > POLL_INTERVAL),
+        },
+    }
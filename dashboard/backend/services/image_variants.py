@@ -0,0 +1,88 @@
+"""Resized, re-encoded variants of reference images for grids and previews.
+
+Originals are multi-megabyte JPEG/PNG portraits. A variant is the image
+scaled down to a width bucket (requests round up to the next bucket, so a
+handful of files serve every layout) and encoded as WebP when the browser
+accepts it, JPEG otherwise. Variants are keyed by the original's content
+hash, so their URLs never change meaning and can be cached forever; a
+replaced image gets a new hash and therefore new URLs.
+"""
+
+import os
+import threading
+from pathlib import Path
+
+from PIL import Image, ImageOps
+
+from services import asset_catalog
+from services.thumbnails import THUMBS_DIR
+
+VARIANTS_DIR = THUMBS_DIR / ".variants"
+WIDTH_BUCKETS = (160, 320, 480, 640, 960, 1280)
+FORMATS = {"webp": ("WEBP", "image/webp"), "jpeg": ("JPEG", "image/jpeg")}
+QUALITY = 80
+VERSION_LENGTH = 16  # hex chars of the content hash used in URLs
+
+_locks: dict[str, threading.Lock] = {}
+_locks_guard = threading.Lock()
+
+
+def bucket(width: int) -> int:
+    """Smallest bucket at least `width` wide (the largest bucket caps it)."""
+    for b in WIDTH_BUCKETS:
+        if width <= b:
+            return b
+    return WIDTH_BUCKETS[-1]
+
+
+def pick_format(accept: str | None) -> str:
+    """WebP when the Accept header allows it, else JPEG."""
+    return "webp" if accept and "image/webp" in accept else "jpeg"
+
+
+def version(path: Path) -> str | None:
+    """Short content hash of an image (from the catalog), or None if it isn't an asset."""
+    row = asset_catalog.lookup(path)
+    if row is None or not row["sha256"]:
+        return None
+    return row["sha256"][:VERSION_LENGTH]
+
+
+def _variant_path(content_version: str, width: int, fmt: str) -> Path:
+    return VARIANTS_DIR / content_version[:2] / f"{content_version}_w{width}.{fmt}"
+
+
+def _lock_for(key: str) -> threading.Lock:
+    with _locks_guard:
+        return _locks.setdefault(key, threading.Lock())
+
+
+def get_variant(path: Path, width: int, fmt: str) -> tuple[Path, str]:
+    """(variant file, content version) for an image, generating it on first request. Blocking.
+
+    Raises ValueError if `path` is not a cataloged image.
+    """
+    content_version = version(path)
+    if content_version is None or path.suffix.lower() not in asset_catalog.IMAGE_EXTS:
+        raise ValueError(f"Not an image asset: {path}")
+    width = bucket(width)
+    variant = _variant_path(content_version, width, fmt)
+    if variant.exists():
+        return variant, content_version
+
+    # One encoder per variant; concurrent requests for it wait and reuse the file
+    with _lock_for(str(variant)):
+        if variant.exists():
+            return variant, content_version
+        with Image.open(path) as img:
+            img = ImageOps.exif_transpose(img)
+            if img.width > width:
+                img = img.resize((width, round(img.height * width / img.width)), Image.LANCZOS)
+            if fmt == "jpeg" or img.mode not in ("RGB", "RGBA"):
+                img = img.convert("RGB")
+            variant.parent.mkdir(parents=True, exist_ok=True)
+            tmp = variant.with_suffix(f".{os.getpid()}.tmp")
+            pil_format, _ = FORMATS[fmt]
+            img.save(tmp, pil_format, quality=QUALITY, optimize=True)
+        os.replace(tmp, variant)
+    return variant, content_version
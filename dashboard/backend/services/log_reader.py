@@ -6,9 +6,10 @@ from typing import Optional
 
 from config import (
     JSONL_PATH, DAILY_SPEND_PATH, DAILY_COST_CAP, VIDEO_OUTPUT_DIR,
-    ASSETS_DIR, PERSONA_COLORS, PERSONAS, PROJECT_ROOT,
+    PERSONA_COLORS, PERSONAS, PROJECT_ROOT,
 )
 from models import PipelineRun, OverviewStats, DailySpend, PersonaStats
+from services.asset_catalog import count_assets
 
 
 def _normalize_reel_path(reel_path: Optional[str]) -> Optional[str]:
@@ -80,10 +81,8 @@ def get_persona_stats() -> list[PersonaStats]:
         last_run = persona_runs[-1].timestamp if persona_runs else None
 
         # Count clips
-        hook_dir = ASSETS_DIR / persona / "hook"
-        reaction_dir = ASSETS_DIR / persona / "reaction"
-        hook_clips = len(list(hook_dir.glob("*.mp4"))) if hook_dir.exists() else 0
-        reaction_clips = len(list(reaction_dir.glob("*.mp4"))) if reaction_dir.exists() else 0
+        hook_clips = count_assets(persona, "hook", exts=(".mp4",))
+        reaction_clips = count_assets(persona, "reaction", exts=(".mp4",))
 
         stats.append(PersonaStats(
             persona=persona,
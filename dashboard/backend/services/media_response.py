@@ -0,0 +1,135 @@
+"""File responses for video and asset endpoints: validators, ranges, offload.
+
+Every response carries an ETag (size + mtime), Last-Modified and a
+Cache-Control policy, and conditional requests are answered with 304 before
+any bytes are read. A single `Range: bytes=` request (what <video> sends
+while scrubbing) gets a 206 streamed with positioned reads; If-Range is
+honoured, multi-range requests get the whole file.
+
+With MEDIA_ACCEL_REDIRECT_PREFIX set, files under PROJECT_ROOT are not
+streamed by Python at all: the response is an empty X-Accel-Redirect to
+that internal nginx location, and nginx serves the bytes (ranges and
+conditional requests included).
+"""
+
+import asyncio
+import os
+import re
+from email.utils import formatdate, parsedate_to_datetime
+from pathlib import Path
+from urllib.parse import quote
+
+from fastapi import Request
+from fastapi.responses import FileResponse, Response, StreamingResponse
+
+from config import MEDIA_ACCEL_REDIRECT_PREFIX, PROJECT_ROOT
+
+READ_SIZE = 256 * 1024
+REVALIDATE = "no-cache"  # may change in place (e.g. a re-uploaded clip): always revalidate
+WRITE_ONCE = "public, max-age=86400"  # timestamped outputs that are never rewritten
+
+UNSATISFIABLE = "unsatisfiable"
+
+_RANGE_RE = re.compile(r"bytes=(\d*)-(\d*)")
+
+
+def _etag(stat: os.stat_result) -> str:
+    return f'"{stat.st_size:x}-{stat.st_mtime_ns:x}"'
+
+
+def _not_modified(request: Request, etag: str, mtime: float) -> bool:
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        tags = [t.strip().removeprefix("W/") for t in if_none_match.split(",")]
+        return "*" in tags or etag in tags
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since:
+        try:
+            return int(mtime) <= parsedate_to_datetime(if_modified_since).timestamp()
+        except (TypeError, ValueError):
+            return False
+    return False
+
+
+def _byte_range(request: Request, size: int, etag: str, last_modified: str) -> tuple[int, int] | str | None:
+    """Inclusive (start, end) of a single satisfiable range, None for the whole file, or UNSATISFIABLE."""
+    header = request.headers.get("range")
+    if not header:
+        return None
+    if_range = request.headers.get("if-range")
+    if if_range is not None and if_range not in (etag, last_modified):
+        return None  # representation changed since the client's partial copy
+    match = _RANGE_RE.fullmatch(header.strip())
+    if not match:
+        return None  # multi-range or other units: serve the whole file
+    first, last = match.groups()
+    if first:
+        start = int(first)
+        end = min(int(last), size - 1) if last else size - 1
+    elif last:
+        start, end = max(0, size - int(last)), size - 1  # suffix range: final N bytes
+    else:
+        return None
+    if start >= size or start > end:
+        return UNSATISFIABLE
+    return start, end
+
+
+async def _read_range(path: Path, start: int, end: int):
+    fd = await asyncio.to_thread(os.open, path, os.O_RDONLY)
+    try:
+        position = start
+        while position <= end:
+            chunk = await asyncio.to_thread(os.pread, fd, min(READ_SIZE, end - position + 1), position)
+            if not chunk:
+                break
+            position += len(chunk)
+            yield chunk
+    finally:
+        os.close(fd)
+
+
+def _accel_path(path: Path) -> str | None:
+    """Internal nginx URI for a file, if offload is enabled and the file is under PROJECT_ROOT."""
+    if not MEDIA_ACCEL_REDIRECT_PREFIX:
+        return None
+    try:
+        rel = path.resolve().relative_to(PROJECT_ROOT.resolve())
+    except ValueError:
+        return None
+    return f"{MEDIA_ACCEL_REDIRECT_PREFIX.rstrip('/')}/{quote(rel.as_posix())}"
+
+
+def media_response(request: Request, path: Path, media_type: str,
+                   cache_control: str = REVALIDATE, download_name: str | None = None) -> Response:
+    """Serve `path` with validators, conditional 304s, byte ranges, or an nginx offload."""
+    headers = {"Cache-Control": cache_control, "Accept-Ranges": "bytes"}
+    if download_name:
+        headers["Content-Disposition"] = f"attachment; filename=\"{download_name}\""
+
+    accel = _accel_path(path)
+    if accel is not None:
+        headers["X-Accel-Redirect"] = accel
+        return Response(headers=headers, media_type=media_type)
+
+    stat = path.stat()
+    etag = _etag(stat)
+    last_modified = formatdate(stat.st_mtime, usegmt=True)
+    headers.update({"ETag": etag, "Last-Modified": last_modified})
+
+    if _not_modified(request, etag, stat.st_mtime):
+        return Response(status_code=304, headers=headers)
+
+    byte_range = _byte_range(request, stat.st_size, etag, last_modified)
+    if byte_range == UNSATISFIABLE:
+        return Response(status_code=416, headers={**headers, "Content-Range": f"bytes */{stat.st_size}"})
+    if byte_range is None:
+        return FileResponse(path, media_type=media_type, headers=headers, stat_result=stat)
+
+    start, end = byte_range
+    headers.update({
+        "Content-Range": f"bytes {start}-{end}/{stat.st_size}",
+        "Content-Length": str(end - start + 1),
+    })
+    return StreamingResponse(_read_range(path, start, end), status_code=206,
+                             media_type=media_type, headers=headers)
@@ -1,5 +1,6 @@
 """Subprocess management for pipeline runs."""
 
+import os
 import queue
 import subprocess
 import threading
@@ -8,6 +9,7 @@ from datetime import datetime, timezone
 
 from config import PROJECT_ROOT, PROJECT_VENV_PYTHON, SCRIPTS_DIR
 from models import PipelineRunRequest, PipelineRunStatus, LifestyleReelRequest, AutoJournalReelRequest
+from services.ffmpeg_progress import PROGRESS_ENV, parse_progress_line
 
 # In-memory store for run tracking
 _runs: dict[str, dict] = {}
@@ -41,13 +43,19 @@ def _worker_loop():
                 stdout=subprocess.PIPE,
                 stderr=subprocess.STDOUT,
                 text=True,
-                env=None,  # inherit env (dotenv loaded in config)
+                # inherit env (dotenv loaded in config); ask scripts for ffmpeg progress lines
+                env={**os.environ, PROGRESS_ENV: "1"},
             )
             _runs[run_id]["process"] = proc
             output_lines = []
             for line in proc.stdout:
+                progress = parse_progress_line(line)
+                if progress is not None:
+                    _runs[run_id]["progress"] = progress
+                    continue
                 output_lines.append(line)
                 _runs[run_id]["output"] = "".join(output_lines)
+            _runs[run_id]["progress"] = None
             proc.wait()
             _runs[run_id]["status"] = "completed" if proc.returncode == 0 else "failed"
         except Exception as e:
@@ -204,6 +212,7 @@ def get_run_status(run_id: str) -> PipelineRunStatus | None:
         app=run.get("app"),
         started_at=run["started_at"],
         output=run["output"],
+        progress=run.get("progress"),
     )
 
 
@@ -217,6 +226,7 @@ def list_runs() -> list[PipelineRunStatus]:
             app=r.get("app"),
             started_at=r["started_at"],
             output=r["output"][-500:] if r["output"] else "",
+            progress=r.get("progress"),
         )
         for r in _runs.values()
     ]
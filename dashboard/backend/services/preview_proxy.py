@@ -0,0 +1,51 @@
+"""Low-bitrate preview proxies and poster frames for rendered reels.
+
+Every render path appends these as extra outputs of its final concat pass,
+so the dashboard can show a reel without pulling the 8 Mbps master.
+"""
+
+from pathlib import Path
+
+PREVIEW_WIDTH = 720  # 720x1280 for our 9:16 reels
+PREVIEW_BITRATE = "900k"
+POSTER_AT = 1.0  # seconds in — skips black/fade-in first frames
+
+
+def preview_paths(master) -> tuple[Path, Path]:
+    """(preview.mp4, poster.jpg) sitting next to a master reel."""
+    master = Path(master)
+    return (
+        master.with_name(f"{master.stem}.preview.mp4"),
+        master.with_name(f"{master.stem}.poster.jpg"),
+    )
+
+
+def master_output_args(master) -> list[str]:
+    """Stream-copy output for the master, explicitly mapped so it can share a command."""
+    return [
+        "-map", "0:v", "-map", "0:a?",
+        "-c", "copy",
+        "-movflags", "+faststart",
+        str(master),
+    ]
+
+
+def preview_output_args(master) -> list[str]:
+    """Extra ffmpeg outputs (preview proxy + poster JPEG) for input 0 of a concat pass."""
+    preview, poster = preview_paths(master)
+    scale = f"scale={PREVIEW_WIDTH}:-2"
+    return [
+        "-map", "0:v", "-map", "0:a?",
+        "-vf", scale,
+        "-c:v", "libx264", "-preset", "veryfast",
+        "-b:v", PREVIEW_BITRATE, "-maxrate", PREVIEW_BITRATE, "-bufsize", "1800k",
+        "-c:a", "aac", "-b:a", "64k",
+        "-movflags", "+faststart",
+        str(preview),
+        "-map", "0:v",
+        "-ss", str(POSTER_AT),
+        "-frames:v", "1",
+        "-vf", scale,
+        "-q:v", "4",
+        str(poster),
+    ]
@@ -0,0 +1,79 @@
+"""Anthropic prompt caching for skill-context system prompts, plus usage logging.
+
+System prompts are sent as a list of text blocks ordered from most stable
+to least (shared skill files → memory → per-call specifics). Each stable
+block ends with a cache breakpoint, so consecutive calls that share a
+prefix — the seven accounts of an autopilot run, the turns of a chat —
+read it from the cache instead of re-processing it. Blocks below the
+model's minimum cacheable length are simply not cached; nothing breaks.
+
+Every call's usage (including cache read/creation token counts) is
+appended to LLM_USAGE_LOG. The SDK honours ANTHROPIC_BASE_URL, and raw
+HTTP callers use messages_url(), so all call sites can be pointed at a
+local stub (scripts/anthropic_stub.py).
+"""
+
+import json
+import os
+import threading
+from datetime import datetime, timezone
+
+from config import LLM_USAGE_LOG
+
+MAX_BREAKPOINTS = 4  # API limit on cache_control blocks per request
+USAGE_FIELDS = ("input_tokens", "cache_creation_input_tokens", "cache_read_input_tokens", "output_tokens")
+
+_log_lock = threading.Lock()
+
+
+def messages_url() -> str:
+    """Messages endpoint for raw HTTP callers (follows ANTHROPIC_BASE_URL like the SDK)."""
+    base = os.environ.get("ANTHROPIC_BASE_URL") or "https://api.anthropic.com"
+    return f"{base.rstrip('/')}/v1/messages"
+
+
+def system_blocks(*stable: str, volatile: str = "") -> list[dict]:
+    """System prompt blocks: each non-empty `stable` part cached, `volatile` appended uncached.
+
+    Pass parts most-stable first. A breakpoint caches everything before it,
+    so when there are more stable parts than breakpoints the earliest ones
+    ride along with the first marked block.
+    """
+    parts = [p for p in stable if p]
+    blocks = [{"type": "text", "text": p} for p in parts]
+    for block in blocks[-MAX_BREAKPOINTS:]:
+        block["cache_control"] = {"type": "ephemeral"}
+    if volatile:
+        blocks.append({"type": "text", "text": volatile})
+    return blocks
+
+
+def _usage_dict(usage) -> dict:
+    if usage is None:
+        return {}
+    if isinstance(usage, dict):
+        return {k: usage.get(k) or 0 for k in USAGE_FIELDS}
+    return {k: getattr(usage, k, None) or 0 for k in USAGE_FIELDS}
+
+
+def log_usage(source: str, model: str, usage) -> dict:
+    """Record one call's token usage (SDK Usage object or API JSON dict). Never raises."""
+    counts = _usage_dict(usage)
+    entry = {"ts": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+             "source": source, "model": model, **counts}
+    try:
+        with _log_lock:
+            LLM_USAGE_LOG.parent.mkdir(parents=True, exist_ok=True)
+            with open(LLM_USAGE_LOG, "a") as f:
+                f.write(json.dumps(entry) + "\n")
+    except OSError:
+        pass
+    return entry
+
+
+def format_usage(entry: dict) -> str:
+    """One-line summary for run logs."""
+    return (f"tokens: {entry.get('input_tokens', 0)} in "
+            f"(+{entry.get('cache_read_input_tokens', 0)} cache read, "
+            f"+{entry.get('cache_creation_input_tokens', 0)} cache write), "
+            f"{entry.get('output_tokens', 0)} out")
@@ -0,0 +1,155 @@
+"""Whole-reel render memoization.
+
+A render key hashes everything that decides the output: input content
+hashes, overlay texts, speed, font file, the ffmpeg build and the caller's
+render profile. When a key was rendered before and the reel is still on
+disk, callers reuse it instead of re-encoding.
+"""
+
+import fcntl
+import hashlib
+import json
+import os
+import shutil
+import subprocess
+from datetime import datetime, timezone
+from functools import lru_cache
+from pathlib import Path
+
+from config import VIDEO_OUTPUT_DIR
+from services import asset_catalog
+from services.preview_proxy import preview_paths
+
+RENDER_CACHE_DIR = VIDEO_OUTPUT_DIR / ".cache" / "renders"
+DIGEST_INDEX = RENDER_CACHE_DIR / "digests.json"
+DIGEST_LOCK = DIGEST_INDEX.with_suffix(".lock")
+
+CHUNK_SIZE = 1024 * 1024
+
+
+def _write_json(path: Path, data: dict):
+    """Atomic JSON write — readers never see a half-written entry."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix(f".{os.getpid()}.tmp")
+    tmp.write_text(json.dumps(data, indent=2))
+    os.replace(tmp, path)
+
+
+def _read_digests() -> dict:
+    try:
+        return json.loads(DIGEST_INDEX.read_text())
+    except (OSError, json.JSONDecodeError):
+        return {}
+
+
+def file_sha256(path) -> str:
+    """Content hash of a file, memoized on (path, size, mtime) so repeat runs skip the read.
+
+    Assets come from the asset catalog; other files (fonts, uploads) use
+    DIGEST_INDEX, which is updated under a lock and pruned of files that
+    no longer exist.
+    """
+    path = Path(path).resolve()
+    row = asset_catalog.lookup(path)
+    if row and row.get("sha256"):
+        return row["sha256"]
+
+    stat = path.stat()
+    stamp = f"{stat.st_size}:{stat.st_mtime_ns}"
+    cached = _read_digests().get(str(path))
+    if cached and cached.get("stamp") == stamp:
+        return cached["sha256"]
+
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        while chunk := f.read(CHUNK_SIZE):
+            digest.update(chunk)
+    sha = digest.hexdigest()
+
+    DIGEST_LOCK.parent.mkdir(parents=True, exist_ok=True)
+    with open(DIGEST_LOCK, "a") as lock:
+        fcntl.flock(lock, fcntl.LOCK_EX)
+        index = {p: e for p, e in _read_digests().items() if os.path.exists(p)}
+        index[str(path)] = {"stamp": stamp, "sha256": sha}
+        _write_json(DIGEST_INDEX, index)
+    return sha
+
+
+@lru_cache(maxsize=1)
+def engine_version() -> str:
+    """First line of `ffmpeg -version` — a different build may encode differently."""
+    try:
+        result = subprocess.run(["ffmpeg", "-version"], capture_output=True, text=True, timeout=10)
+        return result.stdout.split("\n", 1)[0].strip()
+    except (OSError, subprocess.TimeoutExpired):
+        return "unknown"
+
+
+def render_key(profile: dict, inputs: list[str | None], params: dict) -> str:
+    """Deterministic key for one render.
+
+    profile: the caller's output settings + RENDER_PROFILE_VERSION.
+    inputs: content hashes of the input files, in order (None for absent).
+    params: everything else that changes pixels — overlay texts, speed, font hash.
+    """
+    payload = {
+        "engine": engine_version(),
+        "profile": profile,
+        "inputs": inputs,
+        "params": params,
+    }
+    blob = json.dumps(payload, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(blob.encode()).hexdigest()
+
+
+def _entry_path(key: str) -> Path:
+    return RENDER_CACHE_DIR / f"{key}.json"
+
+
+def lookup(key: str) -> Path | None:
+    """Return the cached reel for `key` if it still exists unchanged, else None."""
+    entry_path = _entry_path(key)
+    try:
+        entry = json.loads(entry_path.read_text())
+    except (OSError, json.JSONDecodeError):
+        return None
+
+    output = Path(entry["output"])
+    if not output.is_file() or output.stat().st_size != entry.get("size"):
+        # Reel was deleted or replaced — drop the stale entry
+        entry_path.unlink(missing_ok=True)
+        return None
+    return output
+
+
+def record(key: str, output, meta: dict | None = None):
+    """Remember that `key` rendered to `output`."""
+    output = Path(output)
+    _write_json(_entry_path(key), {
+        "output": str(output.resolve()),
+        "size": output.stat().st_size,
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        **(meta or {}),
+    })
+
+
+def materialize(cached: Path, output) -> Path:
+    """Make a cache hit available at the caller's requested path.
+
+    Hardlinks the master (and its preview/poster) so nothing is re-encoded or
+    copied; falls back to a plain copy across filesystems.
+    """
+    output = Path(output)
+    if output.resolve() == cached.resolve():
+        return output
+    output.parent.mkdir(parents=True, exist_ok=True)
+    pairs = [(cached, output), *zip(preview_paths(cached), preview_paths(output))]
+    for src, dst in pairs:
+        if not src.is_file():
+            continue
+        dst.unlink(missing_ok=True)
+        try:
+            os.link(src, dst)
+        except OSError:
+            shutil.copy2(src, dst)
+    return output
@@ -0,0 +1,236 @@
+"""Scratch space for render intermediates — tmpfs first, disk as fallback.
+
+Normalized segments and concat lists are written once and read once, so
+they belong in RAM (SCRATCH_DIR, /dev/shm by default) rather than on the
+VPS disk next to uploads. A host-wide quota (SCRATCH_QUOTA_MB) and a
+free-space floor decide when a new directory has to fall back to the
+system temp dir instead. Callers size the reservation from their inputs
+(estimate_mb) and place each large intermediate with intermediate_path(),
+which re-checks the quota and spills to a disk twin of the directory once
+tmpfs would go over. Every scratch dir records its owner pid, so dirs
+left behind by a crashed render are swept on the next allocation.
+"""
+
+import fcntl
+import os
+import shutil
+import tempfile
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
+from config import SCRATCH_DIR, SCRATCH_MIN_FREE_MB, SCRATCH_QUOTA_MB, SCRATCH_RESERVE_MB
+
+MB = 1024 * 1024
+OWNER_FILE = ".owner"
+# Prefixes used by render paths — only these are ever swept as orphans
+SCRATCH_PREFIXES = ("reel_", "stitch_", "lifestyle_", "autojournal_")
+ORPHAN_MAX_AGE = 6 * 3600  # legacy dirs without an owner file
+SWEEP_INTERVAL = 600
+_SWEEP_STAMP = ".last_sweep"
+INTERMEDIATE_FACTOR = 2  # normalized segment vs. its source, worst case (low-bitrate screen recordings)
+STILL_SCENE_MB = 20  # segment rendered from a still image or text card
+
+
+def _dir_bytes(path: Path) -> int:
+    total = 0
+    for root, _, files in os.walk(path):
+        for name in files:
+            try:
+                total += os.lstat(os.path.join(root, name)).st_size
+            except OSError:
+                pass
+    return total
+
+
+def _read_owner(path: Path) -> tuple[int, int] | None:
+    """(pid, reserved bytes) for a scratch dir, or None for dirs we didn't create."""
+    try:
+        pid, reserved = (path / OWNER_FILE).read_text().split()
+        return int(pid), int(reserved)
+    except (OSError, ValueError):
+        return None
+
+
+def _pid_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+def _scratch_dirs(base: Path):
+    if not base.is_dir():
+        return
+    for path in base.iterdir():
+        if path.is_dir() and path.name.startswith(SCRATCH_PREFIXES):
+            yield path
+
+
+def tmpfs_usage() -> int:
+    """Bytes charged against the quota: max(actual, reserved) per live tmpfs dir."""
+    used = 0
+    for path in _scratch_dirs(SCRATCH_DIR):
+        owner = _read_owner(path)
+        reserved = owner[1] if owner else 0
+        used += max(_dir_bytes(path), reserved)
+    return used
+
+
+def sweep_orphans(force: bool = False) -> list[str]:
+    """Remove scratch dirs whose owner died (or legacy dirs older than 6h).
+
+    Covers both SCRATCH_DIR and the disk fallback. Rate-limited to once per
+    SWEEP_INTERVAL unless forced.
+    """
+    stamp = SCRATCH_DIR / _SWEEP_STAMP
+    if not force and stamp.exists() and time.time() - stamp.stat().st_mtime < SWEEP_INTERVAL:
+        return []
+    try:
+        if SCRATCH_DIR.is_dir():
+            stamp.touch()
+    except OSError:
+        pass
+
+    removed = []
+    for base in (SCRATCH_DIR, Path(tempfile.gettempdir())):
+        for path in _scratch_dirs(base):
+            owner = _read_owner(path)
+            if owner:
+                orphaned = not _pid_alive(owner[0])
+            else:
+                try:
+                    orphaned = time.time() - path.stat().st_mtime > ORPHAN_MAX_AGE
+                except OSError:
+                    continue
+            if orphaned:
+                shutil.rmtree(path, ignore_errors=True)
+                removed.append(str(path))
+    return removed
+
+
+def _pick_base(reserve: int) -> Path:
+    """SCRATCH_DIR if the reservation fits the quota and free-space floor, else disk."""
+    try:
+        SCRATCH_DIR.mkdir(parents=True, exist_ok=True)
+        free = shutil.disk_usage(SCRATCH_DIR).free
+    except OSError:
+        return Path(tempfile.gettempdir())
+    if free - reserve < SCRATCH_MIN_FREE_MB * MB:
+        return Path(tempfile.gettempdir())
+    if tmpfs_usage() + reserve > SCRATCH_QUOTA_MB * MB:
+        return Path(tempfile.gettempdir())
+    return SCRATCH_DIR
+
+
+def estimate_mb(inputs=(), stills: int = 0) -> float:
+    """Scratch (MB) for intermediates rendered from video `inputs` plus `stills` image scenes.
+
+    Missing inputs count as zero (dry runs).
+    """
+    total = 0
+    for path in inputs:
+        try:
+            total += os.stat(path).st_size
+        except OSError:
+            pass
+    return total * INTERMEDIATE_FACTOR / MB + stills * STILL_SCENE_MB
+
+
+def make_scratch_dir(prefix: str, reserve_mb: float | None = None) -> Path:
+    """mkdtemp on tmpfs when there's room, else on disk. Caller removes it (remove_scratch_dir)."""
+    reserve = int((reserve_mb if reserve_mb is not None else SCRATCH_RESERVE_MB) * MB)
+    sweep_orphans()
+
+    try:
+        SCRATCH_DIR.mkdir(parents=True, exist_ok=True)
+        lock = open(SCRATCH_DIR / ".lock", "a")
+    except OSError:
+        # No usable tmpfs (read-only or missing /dev/shm, macOS): straight to disk
+        return _make_dir(prefix, Path(tempfile.gettempdir()), 0)
+
+    # Serialize pick + create so two renders can't both claim the last of the quota
+    with lock:
+        fcntl.flock(lock, fcntl.LOCK_EX)
+        base = _pick_base(reserve)
+        return _make_dir(prefix, base, reserve if base == SCRATCH_DIR else 0)
+
+
+def _make_dir(prefix: str, base: Path, reserved: int) -> Path:
+    path = Path(tempfile.mkdtemp(prefix=prefix, dir=base))
+    (path / OWNER_FILE).write_text(f"{os.getpid()} {reserved}")
+    return path
+
+
+def _disk_twin(path: Path) -> Path:
+    return Path(tempfile.gettempdir()) / path.name
+
+
+def _fits(path: Path, expected: int) -> bool:
+    """Whether `expected` more bytes in tmpfs dir `path` stay within the quota and free-space floor."""
+    if shutil.disk_usage(SCRATCH_DIR).free - expected < SCRATCH_MIN_FREE_MB * MB:
+        return False
+    owner = _read_owner(path)
+    reserved = owner[1] if owner else 0
+    own = _dir_bytes(path)
+    others = tmpfs_usage() - max(own, reserved)
+    return others + max(own + expected, reserved) <= SCRATCH_QUOTA_MB * MB
+
+
+def intermediate_path(path: Path, name: str, expected_mb: float) -> Path:
+    """Where to write one intermediate of about `expected_mb` into scratch dir `path`.
+
+    Inside `path` while tmpfs has room for it; otherwise in a disk twin of
+    the dir (same name under the system temp dir), removed with it.
+    """
+    path = Path(path)
+    if path.parent != SCRATCH_DIR:
+        return path / name
+    try:
+        with open(SCRATCH_DIR / ".lock", "a") as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            if _fits(path, int(expected_mb * MB)):
+                return path / name
+    except OSError:
+        pass
+    twin = _disk_twin(path)
+    if not twin.is_dir():
+        twin.mkdir(exist_ok=True)
+        (twin / OWNER_FILE).write_text(f"{os.getpid()} 0")
+    return twin / name
+
+
+def remove_scratch_dir(path: Path):
+    """Remove a scratch dir and its disk twin, if anything spilled there."""
+    path = Path(path)
+    shutil.rmtree(path, ignore_errors=True)
+    if path.parent == SCRATCH_DIR:
+        shutil.rmtree(_disk_twin(path), ignore_errors=True)
+
+
+@contextmanager
+def scratch_dir(prefix: str, reserve_mb: float | None = None):
+    """TemporaryDirectory replacement backed by make_scratch_dir."""
+    path = make_scratch_dir(prefix, reserve_mb)
+    try:
+        yield path
+    finally:
+        remove_scratch_dir(path)
+
+
+def scratch_stats() -> dict:
+    """Current tmpfs scratch usage against the quota."""
+    try:
+        free = shutil.disk_usage(SCRATCH_DIR).free
+    except OSError:
+        free = None
+    return {
+        "dir": str(SCRATCH_DIR),
+        "used_mb": round(tmpfs_usage() / MB, 1),
+        "quota_mb": SCRATCH_QUOTA_MB,
+        "free_mb": round(free / MB, 1) if free is not None else None,
+        "dirs": sum(1 for _ in _scratch_dirs(SCRATCH_DIR)),
+    }
@@ -1,6 +1,7 @@
 """Read and walk skills/ and memory/ trees for chat context."""
 
 from config import SKILLS_DIR, MEMORY_DIR
+from services.context_compiler import compile_context
 
 DEFAULT_SKILL_FILES = [
     "INDEX.md",
@@ -31,24 +32,14 @@ def list_memory_files() -> list[str]:
     return sorted(str(f.relative_to(MEMORY_DIR)) for f in MEMORY_DIR.rglob("*.md"))
 
 
-def load_context(skill_files: list[str] | None = None, memory_files: list[str] | None = None) -> str:
-    """Load skill + memory files as context string (matching autopilot_video.py pattern)."""
+def load_context(skill_files: list[str] | None = None, memory_files: list[str] | None = None) -> list[str]:
+    """Load skill + memory files as [skills, memory] context blocks (matching autopilot_video.py pattern)."""
     if skill_files is None:
         skill_files = DEFAULT_SKILL_FILES
     if memory_files is None:
         memory_files = DEFAULT_MEMORY_FILES
 
-    parts = []
-    for name in skill_files:
-        path = SKILLS_DIR / name
-        if path.exists():
-            parts.append(f"=== SKILL: {name} ===\n{path.read_text()}")
-
-    for name in memory_files:
-        path = MEMORY_DIR / name
-        if path.exists():
-            content = path.read_text().strip()
-            if content:
-                parts.append(f"=== MEMORY: {name} ===\n{content}")
-
-    return "\n\n".join(parts)
+    return [
+        compile_context([(SKILLS_DIR / name, f"=== SKILL: {name} ===") for name in skill_files]),
+        compile_context([(MEMORY_DIR / name, f"=== MEMORY: {name} ===") for name in memory_files]),
+    ]
@@ -0,0 +1,162 @@
+"""Sprite-sheet atlases of clip thumbnails for the asset grid.
+
+One JPEG per (persona, clip type) selection plus a JSON map of tile
+offsets, so the grid loads two files instead of one per clip. Atlases are
+rebuilt incrementally: tiles for clips that haven't changed are copied
+from the previous build, and only new or re-uploaded clips decode their
+thumbnail. Tiles are copied from a lossless PNG master kept next to the
+served JPEG, so reused tiles are encoded to JPEG once per build rather than
+accumulating a generation of loss each time.
+
+A sheet holds at most MAX_ROWS rows (far below JPEG's 65535 px limit);
+clips past that, or whose thumbnail isn't ready within THUMBNAIL_WAIT,
+are left out of the map and the grid loads their thumbnail directly.
+"""
+
+import hashlib
+import json
+import os
+import threading
+from concurrent.futures import wait
+
+from PIL import Image, ImageOps
+
+from config import PERSONAS
+from services import asset_catalog, thumbnails
+
+ATLAS_DIR = thumbnails.THUMBS_DIR / ".atlas"
+CLIP_TYPES = ("hook", "reaction", "hook-fear", "reaction-fear")
+TILE_WIDTH = 180
+TILE_HEIGHT = 320  # 9:16, cropped like the grid's object-cover
+COLUMNS = 10
+MAX_ROWS = 60  # 19200 px tall, 600 clips per sheet
+JPEG_QUALITY = 80
+THUMBNAIL_WAIT = 20  # seconds to wait for missing thumbnails before building without them
+
+_locks: dict[str, threading.Lock] = {}
+_locks_guard = threading.Lock()
+
+
+def _key(persona: str | None, clip_type: str | None) -> str:
+    return f"{persona or 'all'}__{clip_type or 'all'}"
+
+
+def sheet_path(persona: str | None, clip_type: str | None):
+    return ATLAS_DIR / f"{_key(persona, clip_type)}.jpg"
+
+
+def _master_path(persona: str | None, clip_type: str | None):
+    return ATLAS_DIR / f"{_key(persona, clip_type)}.png"
+
+
+def _map_path(persona: str | None, clip_type: str | None):
+    return ATLAS_DIR / f"{_key(persona, clip_type)}.json"
+
+
+def _lock_for(key: str) -> threading.Lock:
+    with _locks_guard:
+        return _locks.setdefault(key, threading.Lock())
+
+
+def _clips(persona: str | None, clip_type: str | None) -> list[str]:
+    """Relative clip paths in the selection, in grid order (persona, then type, then name)."""
+    personas = [persona] if persona else PERSONAS
+    types = [clip_type] if clip_type else CLIP_TYPES
+    paths = []
+    for p in personas:
+        rows = asset_catalog.list_assets(persona=p, exts=asset_catalog.VIDEO_EXTS)
+        for t in types:
+            paths += [r["path"] for r in rows if r["dir"] == f"{p}/{t}"]
+    return paths
+
+
+def _load_map(persona, clip_type) -> dict:
+    try:
+        return json.loads(_map_path(persona, clip_type).read_text())
+    except (OSError, json.JSONDecodeError):
+        return {}
+
+
+def current_version(persona: str | None, clip_type: str | None) -> str | None:
+    """Version of the sheet on disk, without checking whether clips changed."""
+    return _load_map(persona, clip_type).get("version")
+
+
+def build(persona: str | None = None, clip_type: str | None = None) -> dict:
+    """Return the atlas map for a selection, rebuilding the sheet if clips changed.
+
+    Missing thumbnails are generated first (through the shared thumbnail
+    pool, for up to THUMBNAIL_WAIT seconds); clips whose thumbnail isn't
+    ready, and clips beyond MAX_ROWS rows, are left out of the map.
+    """
+    key = _key(persona, clip_type)
+    with _lock_for(key):
+        clips = _clips(persona, clip_type)[:MAX_ROWS * COLUMNS]
+        missing = [thumbnails.submit(rel) for rel in clips if not thumbnails.is_fresh(rel)]
+        wait(missing, timeout=THUMBNAIL_WAIT)
+
+        stamps = {}
+        for rel in clips:
+            try:
+                stamps[rel] = thumbnails.thumb_path(rel).stat().st_mtime_ns
+            except OSError:
+                continue  # generation failed
+        version = hashlib.sha256(json.dumps(stamps).encode()).hexdigest()[:16]
+
+        previous = _load_map(persona, clip_type)
+        sheet = sheet_path(persona, clip_type)
+        if previous.get("version") == version and sheet.exists():
+            return previous
+
+        order = list(stamps)
+        rows = max(1, -(-len(order) // COLUMNS))
+        width = TILE_WIDTH * min(COLUMNS, max(1, len(order)))
+        height = TILE_HEIGHT * rows
+        atlas = Image.new("RGB", (width, height))
+
+        old_sheet = None
+        old_tiles = previous.get("tiles", {})
+        master = _master_path(persona, clip_type)
+        if old_tiles and master.exists():
+            old_sheet = Image.open(master)
+            old_sheet.load()
+
+        tiles = {}
+        reused = 0
+        for i, rel in enumerate(order):
+            x, y = (i % COLUMNS) * TILE_WIDTH, (i // COLUMNS) * TILE_HEIGHT
+            old = old_tiles.get(rel)
+            if old_sheet is not None and old and old.get("stamp") == stamps[rel]:
+                box = (old["x"], old["y"], old["x"] + TILE_WIDTH, old["y"] + TILE_HEIGHT)
+                atlas.paste(old_sheet.crop(box), (x, y))
+                reused += 1
+            else:
+                with Image.open(thumbnails.thumb_path(rel)) as thumb:
+                    tile = ImageOps.fit(thumb.convert("RGB"), (TILE_WIDTH, TILE_HEIGHT))
+                atlas.paste(tile, (x, y))
+            tiles[rel] = {"x": x, "y": y, "stamp": stamps[rel]}
+        if old_sheet is not None:
+            old_sheet.close()
+
+        ATLAS_DIR.mkdir(parents=True, exist_ok=True)
+        tmp = master.with_suffix(f".{os.getpid()}.tmp.png")
+        atlas.save(tmp, "PNG", compress_level=1)
+        os.replace(tmp, master)
+        tmp = sheet.with_suffix(f".{os.getpid()}.tmp.jpg")
+        atlas.save(tmp, "JPEG", quality=JPEG_QUALITY, optimize=True)
+        os.replace(tmp, sheet)
+
+        result = {
+            "version": version,
+            "tile_width": TILE_WIDTH,
+            "tile_height": TILE_HEIGHT,
+            "width": width,
+            "height": height,
+            "tiles": tiles,
+            "reused": reused,
+        }
+        map_path = _map_path(persona, clip_type)
+        tmp = map_path.with_suffix(f".{os.getpid()}.tmp")
+        tmp.write_text(json.dumps(result))
+        os.replace(tmp, map_path)
+        return result
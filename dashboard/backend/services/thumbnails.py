@@ -0,0 +1,97 @@
+"""Clip thumbnails — generated once, off the request path.
+
+Uploads and clip generation queue a thumbnail as soon as the clip lands;
+a backfill pass covers clips that predate that. Requests for a thumbnail
+that is still missing join the in-flight job for that clip instead of
+starting their own ffmpeg, and a small worker pool (THUMBNAIL_WORKERS)
+caps how many are generated at once.
+"""
+
+import asyncio
+import os
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from pathlib import Path
+
+from config import ASSETS_DIR, THUMBNAIL_WORKERS
+from services import asset_catalog
+from services.ffmpeg_slots import run_ffmpeg
+
+THUMBS_DIR = ASSETS_DIR / ".thumbs"
+THUMB_WIDTH = 320
+
+_pool = ThreadPoolExecutor(max_workers=THUMBNAIL_WORKERS, thread_name_prefix="thumbnail")
+_inflight: dict[str, Future] = {}
+_lock = threading.RLock()
+
+
+def thumb_path(rel: str) -> Path:
+    """Cache path mirrors the clip path with a .jpg extension."""
+    return THUMBS_DIR / (rel + ".jpg")
+
+
+def is_fresh(rel: str) -> bool:
+    """Thumbnail exists and is newer than its clip (a re-upload invalidates it)."""
+    try:
+        return thumb_path(rel).stat().st_mtime >= (ASSETS_DIR / rel).stat().st_mtime
+    except OSError:
+        return False
+
+
+def generate(rel: str) -> Path:
+    """Render the first frame of ASSETS_DIR/rel to a JPEG. Blocking."""
+    thumb = thumb_path(rel)
+    if is_fresh(rel):
+        return thumb
+    thumb.parent.mkdir(parents=True, exist_ok=True)
+    partial = thumb.with_suffix(".part.jpg")
+    result = run_ffmpeg([
+        "ffmpeg", "-y", "-i", str(ASSETS_DIR / rel),
+        "-vframes", "1", "-q:v", "8", "-vf", f"scale={THUMB_WIDTH}:-2",
+        str(partial),
+    ], "thumbnail", timeout=60)
+    if result.returncode != 0 or not partial.exists():
+        partial.unlink(missing_ok=True)
+        raise RuntimeError(f"Thumbnail generation failed for {rel}: {result.stderr[-300:]}")
+    os.replace(partial, thumb)
+    return thumb
+
+
+def _forget(rel: str, fut: Future):
+    with _lock:
+        if _inflight.get(rel) is fut:
+            del _inflight[rel]
+
+
+def submit(rel: str) -> Future:
+    """Queue a thumbnail, or return the job already in flight for this clip."""
+    with _lock:
+        fut = _inflight.get(rel)
+        if fut is None:
+            fut = _pool.submit(generate, rel)
+            _inflight[rel] = fut
+            fut.add_done_callback(lambda f: _forget(rel, f))
+    return fut
+
+
+async def get_thumbnail(rel: str) -> Path:
+    """Path to a fresh thumbnail, waiting on the shared job if it isn't cached yet."""
+    if is_fresh(rel):
+        return thumb_path(rel)
+    # shield: a client going away must not cancel the job other requests are waiting on
+    return await asyncio.shield(asyncio.wrap_future(submit(rel)))
+
+
+def discard(rel: str):
+    """Remove a deleted clip's thumbnail."""
+    thumb_path(rel).unlink(missing_ok=True)
+
+
+def backfill() -> int:
+    """Queue thumbnails for every persona clip that lacks a fresh one. Returns the count queued."""
+    queued = 0
+    for row in asset_catalog.list_assets(exts=asset_catalog.VIDEO_EXTS):
+        if row["persona"] is not None and not is_fresh(row["path"]):
+            submit(row["path"])
+            queued += 1
+    return queued
@@ -0,0 +1,239 @@
+"""Durable Google Drive upload queue.
+
+Render paths enqueue finished reels and return immediately. Each job is one
+JSON record in the spool directory (the queue index); a single uploader
+worker (scripts/upload_worker.py) drains it, batching several files per
+rclone invocation with parallel transfers and retrying with backoff.
+"""
+
+import fcntl
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+import uuid
+from datetime import datetime, timezone
+from pathlib import Path
+
+from config import (
+    GDRIVE_FOLDER, PROJECT_ROOT, UPLOAD_BATCH_SIZE, UPLOAD_MAX_ATTEMPTS,
+    UPLOAD_SPOOL_DIR, UPLOAD_TRANSFERS,
+)
+
+DEFAULT_REMOTE = f"gdrive:{GDRIVE_FOLDER}/"
+WORKER_LOCK = UPLOAD_SPOOL_DIR / "worker.lock"
+HISTORY_PATH = UPLOAD_SPOOL_DIR / "history.jsonl"
+WORKER_SCRIPT = PROJECT_ROOT / "scripts" / "upload_worker.py"
+
+BACKOFF_BASE = 30  # seconds; doubles per failed attempt
+BACKOFF_MAX = 30 * 60
+RCLONE_TIMEOUT = 60 * 60
+
+
+def _now() -> float:
+    return time.time()
+
+
+def _job_path(job_id: str) -> Path:
+    return UPLOAD_SPOOL_DIR / f"{job_id}.json"
+
+
+def _write_job(job: dict):
+    """Atomic write so the worker never reads a half-written record."""
+    UPLOAD_SPOOL_DIR.mkdir(parents=True, exist_ok=True)
+    path = _job_path(job["id"])
+    tmp = path.with_suffix(".tmp")
+    tmp.write_text(json.dumps(job, indent=2))
+    os.replace(tmp, path)
+
+
+def _read_jobs() -> list[dict]:
+    if not UPLOAD_SPOOL_DIR.exists():
+        return []
+    jobs = []
+    for path in sorted(UPLOAD_SPOOL_DIR.glob("*.json")):
+        try:
+            jobs.append(json.loads(path.read_text()))
+        except (OSError, json.JSONDecodeError):
+            continue
+    return jobs
+
+
+def _archive(job: dict):
+    """Move a finished job out of the spool into the append-only history."""
+    with open(HISTORY_PATH, "a") as f:
+        f.write(json.dumps(job) + "\n")
+    _job_path(job["id"]).unlink(missing_ok=True)
+
+
+# ─── Producer side ───────────────────────────────────
+
+def enqueue(path, remote: str = DEFAULT_REMOTE, start_worker: bool = True) -> dict:
+    """Queue a file for upload and (by default) make sure a worker is running."""
+    job = {
+        "id": f"{datetime.now().strftime('%Y%m%d_%H%M%S')}_{uuid.uuid4().hex[:6]}",
+        "path": str(Path(path).resolve()),
+        "remote": remote,
+        "status": "pending",
+        "attempts": 0,
+        "next_attempt_at": _now(),
+        "enqueued_at": datetime.now(timezone.utc).isoformat(),
+        "last_error": None,
+    }
+    _write_job(job)
+    if start_worker:
+        kick_worker()
+    return job
+
+
+def worker_running() -> bool:
+    """True if an uploader currently holds the worker lock."""
+    if not WORKER_LOCK.exists():
+        return False
+    with open(WORKER_LOCK, "a") as f:
+        try:
+            fcntl.flock(f, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            return True
+        fcntl.flock(f, fcntl.LOCK_UN)
+    return False
+
+
+def kick_worker():
+    """Start a detached uploader unless one is already draining the queue."""
+    if worker_running():
+        return
+    log_path = PROJECT_ROOT / "logs" / "upload_worker.log"
+    log_path.parent.mkdir(exist_ok=True)
+    # The child keeps its own copy of the descriptor; close ours
+    with open(log_path, "a") as log:
+        subprocess.Popen(
+            [sys.executable, str(WORKER_SCRIPT)],
+            cwd=str(PROJECT_ROOT),
+            stdout=log,
+            stderr=subprocess.STDOUT,
+            start_new_session=True,
+        )
+
+
+def queue_stats() -> dict:
+    """Counts by status plus the oldest pending job, for status displays."""
+    jobs = _read_jobs()
+    pending = [j for j in jobs if j["status"] == "pending"]
+    return {
+        "pending": len(pending),
+        "failed": sum(1 for j in jobs if j["status"] == "failed"),
+        "oldest_pending": min((j["enqueued_at"] for j in pending), default=None),
+        "worker_running": worker_running(),
+    }
+
+
+def retry_failed() -> int:
+    """Put uploads that exhausted their attempts back in the queue."""
+    count = 0
+    for job in _read_jobs():
+        if job["status"] == "failed" and Path(job["path"]).is_file():
+            job.update(status="pending", attempts=0, next_attempt_at=_now())
+            _write_job(job)
+            count += 1
+    return count
+
+
+# ─── Worker side ─────────────────────────────────────
+
+def _backoff(attempts: int) -> float:
+    return min(BACKOFF_MAX, BACKOFF_BASE * 2 ** (attempts - 1))
+
+
+def _upload_batch(jobs: list[dict], log) -> bool:
+    """Upload files that share a parent dir + remote in one rclone call."""
+    parent = Path(jobs[0]["path"]).parent
+    remote = jobs[0]["remote"]
+    with tempfile.NamedTemporaryFile("w", suffix=".txt", delete=False) as f:
+        f.write("\n".join(Path(j["path"]).name for j in jobs) + "\n")
+        files_from = f.name
+    cmd = [
+        "rclone", "copy", str(parent), remote,
+        "--files-from", files_from,
+        "--transfers", str(UPLOAD_TRANSFERS),
+        "--retries", "1",
+    ]
+    log(f"Uploading {len(jobs)} file(s) from {parent} → {remote}")
+    try:
+        result = subprocess.run(cmd, capture_output=True, text=True, timeout=RCLONE_TIMEOUT)
+        ok, error = result.returncode == 0, result.stderr.strip()[-500:]
+    except (OSError, subprocess.TimeoutExpired) as e:
+        ok, error = False, str(e)
+    finally:
+        os.unlink(files_from)
+
+    for job in jobs:
+        job["attempts"] += 1
+        if ok:
+            job["status"] = "done"
+            job["uploaded_at"] = datetime.now(timezone.utc).isoformat()
+            _archive(job)
+            log(f"  ✅ {Path(job['path']).name}")
+            continue
+        job["last_error"] = error
+        if job["attempts"] >= UPLOAD_MAX_ATTEMPTS:
+            job["status"] = "failed"
+            log(f"  ❌ {Path(job['path']).name}: giving up after {job['attempts']} attempts")
+        else:
+            job["next_attempt_at"] = _now() + _backoff(job["attempts"])
+            log(f"  ⚠️  {Path(job['path']).name}: attempt {job['attempts']} failed, retrying later")
+        _write_job(job)
+    return ok
+
+
+def drain(log=print) -> int:
+    """Upload everything pending, sleeping through backoff windows. Returns files uploaded.
+
+    Only one drain runs at a time host-wide; a second caller returns 0 at once.
+    """
+    UPLOAD_SPOOL_DIR.mkdir(parents=True, exist_ok=True)
+    with open(WORKER_LOCK, "a") as lock:
+        try:
+            fcntl.flock(lock, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            log("Another upload worker is running — exiting")
+            return 0
+
+        uploaded = 0
+        while True:
+            pending = [j for j in _read_jobs() if j["status"] == "pending"]
+            if not pending:
+                # A job enqueued while we held the lock saw worker_running() and
+                # started no worker of its own: release, then look once more
+                fcntl.flock(lock, fcntl.LOCK_UN)
+                if not any(j["status"] == "pending" for j in _read_jobs()):
+                    return uploaded
+                try:
+                    fcntl.flock(lock, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                except BlockingIOError:
+                    return uploaded  # a freshly kicked worker took over
+                continue
+
+            due = [j for j in pending if j["next_attempt_at"] <= _now()]
+            if not due:
+                time.sleep(max(1.0, min(j["next_attempt_at"] for j in pending) - _now()))
+                continue
+
+            groups: dict[tuple[str, str], list[dict]] = {}
+            for job in due:
+                if not Path(job["path"]).is_file():
+                    job["status"] = "failed"
+                    job["last_error"] = "file no longer exists"
+                    _write_job(job)
+                    log(f"  ❌ {job['path']}: file no longer exists")
+                    continue
+                key = (str(Path(job["path"]).parent), job["remote"])
+                groups.setdefault(key, []).append(job)
+
+            for jobs in groups.values():
+                for i in range(0, len(jobs), UPLOAD_BATCH_SIZE):
+                    batch = jobs[i:i + UPLOAD_BATCH_SIZE]
+                    if _upload_batch(batch, log):
+                        uploaded += len(batch)
@@ -0,0 +1,72 @@
+"""Bounded-memory streaming writes for multipart uploads.
+
+Uploads are copied to disk in fixed-size chunks and hashed on the fly, so a
+request never holds a whole video in RAM no matter how large it is.
+"""
+
+import asyncio
+import hashlib
+from pathlib import Path
+
+from fastapi import HTTPException, UploadFile
+
+from config import MAX_CONCURRENT_UPLOADS, MAX_UPLOAD_FILE_BYTES, MAX_UPLOAD_REQUEST_BYTES
+
+CHUNK_SIZE = 1024 * 1024  # 1 MB
+
+# Caps how many uploads are being copied at once across all requests
+_upload_slots = asyncio.Semaphore(MAX_CONCURRENT_UPLOADS)
+
+
+def new_request_budget() -> dict:
+    """Per-request byte budget shared by every file in one multipart body."""
+    return {"remaining": MAX_UPLOAD_REQUEST_BYTES}
+
+
+def _too_large(detail: str) -> HTTPException:
+    return HTTPException(status_code=413, detail=detail)
+
+
+async def save_upload(
+    upload: UploadFile,
+    dest: Path,
+    budget: dict | None = None,
+    max_bytes: int = MAX_UPLOAD_FILE_BYTES,
+) -> dict:
+    """Stream an UploadFile to `dest` in chunks. Returns {"size", "sha256"}.
+
+    Raises 413 as soon as the file exceeds `max_bytes` or the request budget,
+    and removes the partial file.
+    """
+    if budget is None:
+        budget = new_request_budget()
+
+    digest = hashlib.sha256()
+    size = 0
+
+    async with _upload_slots:
+        try:
+            with open(dest, "wb") as out:
+                while True:
+                    chunk = await upload.read(CHUNK_SIZE)
+                    if not chunk:
+                        break
+                    size += len(chunk)
+                    budget["remaining"] -= len(chunk)
+                    if size > max_bytes:
+                        raise _too_large(
+                            f"File '{upload.filename}' exceeds {max_bytes // (1024 * 1024)} MB limit"
+                        )
+                    if budget["remaining"] < 0:
+                        raise _too_large(
+                            f"Request exceeds {MAX_UPLOAD_REQUEST_BYTES // (1024 * 1024)} MB upload limit"
+                        )
+                    digest.update(chunk)
+                    await asyncio.to_thread(out.write, chunk)
+        except BaseException:
+            dest.unlink(missing_ok=True)
+            raise
+        finally:
+            await upload.close()
+
+    return {"size": size, "sha256": digest.hexdigest()}
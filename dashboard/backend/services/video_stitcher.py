@@ -5,9 +5,7 @@ import os
 import queue
 import shutil
 import smtplib
-import subprocess
 import sys
-import tempfile
 import threading
 import uuid
 from datetime import datetime, timezone
@@ -18,6 +16,12 @@ from pathlib import Path
 import httpx
 
 from config import VIDEO_OUTPUT_DIR
+from services.ffmpeg_progress import probe_duration, run_ffmpeg_with_progress
+from services.ffmpeg_slots import run_ffmpeg as run_slotted
+from services.preview_proxy import master_output_args, preview_output_args
+from services import render_cache
+from services.scratch import estimate_mb, intermediate_path, scratch_dir
+from services.upload_queue import enqueue as enqueue_upload
 
 GDRIVE_FOLDER = "manifest-social-videos"
 
@@ -39,6 +43,9 @@ HORIZONTAL_PAD = 60
 STROKE_WIDTH = 3
 CHARS_PER_LINE = 32
 
+# Bump when the filter graph changes in a way the settings above don't capture
+RENDER_PROFILE_VERSION = 1
+
 FONT_DIR = Path(__file__).resolve().parent.parent.parent.parent / "fonts"
 
 
@@ -118,7 +125,7 @@ def build_drawtext_filter(text, font_path):
 
 # ─── Scene processing ────────────────────────────────
 
-def _process_scene(input_path, output_path, text, speed, font_path, log_lines):
+def _process_scene(input_path, output_path, text, speed, font_path, log_lines, on_progress=None):
     """Normalize a single scene: scale/pad + optional speed + optional text overlay."""
     vf_parts = []
 
@@ -149,7 +156,11 @@ def _process_scene(input_path, output_path, text, speed, font_path, log_lines):
     if speed and speed != 1.0:
         log_lines.append(f"    Speed: {speed}x")
 
-    result = subprocess.run(cmd, capture_output=True, text=True)
+    duration = probe_duration(input_path)
+    if duration and speed and speed != 1.0:
+        duration = duration / speed
+
+    result = run_ffmpeg_with_progress(cmd, duration, on_progress, label="stitch scene")
     if result.returncode != 0:
         log_lines.append(f"  ERROR: {result.stderr}")
         return False
@@ -157,7 +168,7 @@ def _process_scene(input_path, output_path, text, speed, font_path, log_lines):
 
 
 def _concatenate(clip_paths, output_path, log_lines):
-    """Concat processed clips using ffmpeg concat demuxer."""
+    """Concat processed clips, writing the preview proxy + poster in the same pass."""
     log_lines.append(f"  Concatenating {len(clip_paths)} clips...")
 
     list_path = clip_paths[0].parent / "concat_list.txt"
@@ -169,12 +180,11 @@ def _concatenate(clip_paths, output_path, log_lines):
         "ffmpeg", "-y", "-hide_banner", "-loglevel", "warning",
         "-f", "concat", "-safe", "0",
         "-i", str(list_path),
-        "-c", "copy",
-        "-movflags", "+faststart",
-        str(output_path),
+        *master_output_args(output_path),
+        *preview_output_args(output_path),
     ]
 
-    result = subprocess.run(cmd, capture_output=True, text=True)
+    result = run_slotted(cmd, "stitch concat")
     list_path.unlink(missing_ok=True)
 
     if result.returncode != 0:
@@ -183,6 +193,31 @@ def _concatenate(clip_paths, output_path, log_lines):
     return True
 
 
+def _stitch_render_key(scenes, font_path):
+    """Render-cache key from the uploads' sha256s + per-scene text/speed."""
+    profile = {
+        "renderer": "video_stitcher",
+        "version": RENDER_PROFILE_VERSION,
+        "size": [WIDTH, HEIGHT],
+        "fps": FPS,
+        "bitrate": BITRATE,
+        "font_size": FONT_SIZE,
+        "text_y": TEXT_Y_RATIO,
+        "pad": HORIZONTAL_PAD,
+        "stroke": STROKE_WIDTH,
+        "chars_per_line": CHARS_PER_LINE,
+    }
+    inputs = [s["sha256"] for s in scenes]
+    params = {
+        "scenes": [
+            {"text": (s.get("text") or "").strip(), "speed": float(s.get("speed") or 1.0)}
+            for s in scenes
+        ],
+        "font": render_cache.file_sha256(font_path) if font_path else None,
+    }
+    return render_cache.render_key(profile, inputs, params)
+
+
 # ─── Caption + email ─────────────────────────────────
 
 def _generate_caption(scene_texts, log_lines):
@@ -275,17 +310,18 @@ def _worker_loop():
         job_id, scenes, upload_dir = _queue.get()
         try:
             _jobs[job_id]["status"] = "running"
-            _run_stitch(job_id, scenes, upload_dir)
+            _run_stitch(job_id, scenes)
         except Exception as e:
             _jobs[job_id]["status"] = "failed"
             _jobs[job_id]["output"] += f"\nFatal error: {e}"
         finally:
-            # Clean up uploaded files
-            shutil.rmtree(upload_dir, ignore_errors=True)
+            # Clean up uploaded files (blob-store sources are kept for reuse)
+            if upload_dir is not None:
+                shutil.rmtree(upload_dir, ignore_errors=True)
             _queue.task_done()
 
 
-def _run_stitch(job_id, scenes, upload_dir):
+def _run_stitch(job_id, scenes):
     log_lines = []
     job = _jobs[job_id]
 
@@ -297,6 +333,15 @@ def _run_stitch(job_id, scenes, upload_dir):
     if not font_path:
         sync_log("WARNING: No font found — text overlays will be skipped")
 
+    # Duplicate submission (same uploads, text and speeds) — hand back the earlier reel
+    cache_key = _stitch_render_key(scenes, font_path)
+    cached = render_cache.lookup(cache_key)
+    if cached:
+        sync_log(f"Render cache hit {cache_key[:12]} — reusing {cached.name}")
+        job["status"] = "completed"
+        job["result_filename"] = cached.name
+        return
+
     sync_log(f"Stitching {len(scenes)} scenes...")
 
     VIDEO_OUTPUT_DIR.mkdir(exist_ok=True)
@@ -304,19 +349,23 @@ def _run_stitch(job_id, scenes, upload_dir):
     out_filename = f"stitch_{ts}_{job_id}.mp4"
     out_path = VIDEO_OUTPUT_DIR / out_filename
 
-    with tempfile.TemporaryDirectory(prefix="stitch_") as tmp:
+    with scratch_dir("stitch_", estimate_mb(s["input_path"] for s in scenes)) as tmp:
         tmp = Path(tmp)
         processed = []
 
         for i, scene in enumerate(scenes):
-            input_file = upload_dir / scene["filename"]
-            output_file = tmp / f"{i:02d}_scene.mp4"
+            input_file = Path(scene["input_path"])
+            output_file = intermediate_path(tmp, f"{i:02d}_scene.mp4", estimate_mb([input_file]))
 
             sync_log(f"\nScene {i + 1}/{len(scenes)}:")
+
+            def on_progress(p, scene_num=i + 1):
+                job["progress"] = {"scene": scene_num, "scenes": len(scenes), **p}
+
             ok = _process_scene(
                 input_file, output_file,
                 scene.get("text"), scene.get("speed"),
-                font_path, log_lines,
+                font_path, log_lines, on_progress,
             )
             job["output"] = "\n".join(log_lines)
 
@@ -328,6 +377,7 @@ def _run_stitch(job_id, scenes, upload_dir):
             processed.append(output_file)
 
         sync_log("")
+        job["progress"] = None
         ok = _concatenate(processed, out_path, log_lines)
         job["output"] = "\n".join(log_lines)
 
@@ -336,16 +386,13 @@ def _run_stitch(job_id, scenes, upload_dir):
             sync_log("\nFAILED at concatenation")
             return
 
+    render_cache.record(cache_key, out_path)
     size_mb = out_path.stat().st_size / (1024 * 1024)
     sync_log(f"\nDone! Output: {out_filename} ({size_mb:.1f} MB)")
 
-    # Upload to Google Drive via rclone
-    sync_log(f"\nUploading to Google Drive ({GDRIVE_FOLDER})...")
-    rc = os.system(f"rclone copy {out_path} gdrive:{GDRIVE_FOLDER}/")
-    if rc == 0:
-        sync_log(f"Uploaded to Google Drive.")
-    else:
-        sync_log(f"WARNING: Drive upload failed (exit code {rc}). Video saved locally.")
+    # Upload to Google Drive in the background via the upload queue
+    enqueue_upload(out_path, remote=f"gdrive:{GDRIVE_FOLDER}/")
+    sync_log(f"\nQueued for Google Drive upload ({GDRIVE_FOLDER}).")
 
     # Generate caption from text overlays and email it
     scene_texts = [s.get("text", "") for s in scenes]
@@ -376,7 +423,7 @@ def _run_stitch(job_id, scenes, upload_dir):
 
 # ─── Public API ──────────────────────────────────────
 
-def start_stitch_job(scenes: list[dict], upload_dir: Path) -> dict:
+def start_stitch_job(scenes: list[dict], upload_dir: Path | None = None) -> dict:
     job_id = str(uuid.uuid4())[:8]
     _jobs[job_id] = {
         "id": job_id,
@@ -384,6 +431,7 @@ def start_stitch_job(scenes: list[dict], upload_dir: Path) -> dict:
         "started_at": datetime.now(timezone.utc).isoformat(),
         "output": "",
         "result_filename": None,
+        "progress": None,
     }
     _ensure_worker()
     _queue.put((job_id, scenes, upload_dir))
@@ -399,4 +447,5 @@ def get_stitch_job(job_id: str) -> dict | None:
         "status": job["status"],
         "output": job["output"],
         "result_filename": job.get("result_filename"),
+        "progress": job.get("progress"),
     }
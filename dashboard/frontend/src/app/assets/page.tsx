@@ -13,14 +13,18 @@ import { Trash2, Upload, Loader2, Play } from "lucide-react";
 import {
   getReferenceImages,
   getClips,
+  getThumbnailAtlas,
   getAssetUsage,
+  apiUrl,
   assetUrl,
+  assetVariantUrl,
   thumbnailUrl,
-  uploadClip,
+  uploadResumable,
   uploadReaction,
   deleteClip,
   type AssetInfo,
   type AssetUsageRow,
+  type ThumbnailAtlas,
 } from "@/lib/api";
 
 const PERSONA_COLORS: Record<string, string> = {
@@ -34,9 +38,28 @@ const PERSONAS = ["aliyah", "riley", "sanya", "emilly"];
 
 type UploadStep = "persona" | "hook" | "reaction" | "uploading";
 
+/** Atlas key for a clip — one sheet per persona/type keeps each image small. */
+function atlasKey(clip: AssetInfo) {
+  return `${clip.persona}/${clip.type}`;
+}
+
+/** Background style that shows one atlas tile scaled to fill its grid cell. */
+function atlasTileStyle(atlas: ThumbnailAtlas | undefined, path: string) {
+  const tile = atlas?.tiles[path];
+  if (!atlas || !tile) return null;
+  const spanX = atlas.width - atlas.tile_width;
+  const spanY = atlas.height - atlas.tile_height;
+  return {
+    backgroundImage: `url(${apiUrl(atlas.sheet_url)})`,
+    backgroundSize: `${(atlas.width / atlas.tile_width) * 100}% ${(atlas.height / atlas.tile_height) * 100}%`,
+    backgroundPosition: `${spanX ? (tile.x / spanX) * 100 : 0}% ${spanY ? (tile.y / spanY) * 100 : 0}%`,
+  };
+}
+
 export default function AssetManagerPage() {
   const [images, setImages] = useState<AssetInfo[]>([]);
   const [clips, setClips] = useState<AssetInfo[]>([]);
+  const [atlases, setAtlases] = useState<Record<string, ThumbnailAtlas>>({});
   const [usage, setUsage] = useState<AssetUsageRow[]>([]);
 
   // Upload state
@@ -57,7 +80,15 @@ export default function AssetManagerPage() {
   const [deleting, setDeleting] = useState<string | null>(null);
 
   const refreshClips = useCallback(() => {
-    getClips().then(setClips);
+    getClips().then((list) => {
+      setClips(list);
+      for (const key of Array.from(new Set(list.map(atlasKey)))) {
+        const [persona, type] = key.split("/");
+        getThumbnailAtlas(persona, type)
+          .then((atlas) => setAtlases((prev) => ({ ...prev, [key]: atlas })))
+          .catch(() => {});
+      }
+    });
   }, []);
 
   useEffect(() => {
@@ -83,23 +114,27 @@ export default function AssetManagerPage() {
     setUploadError("");
 
     try {
-      // Upload hook clip
-      const hookForm = new FormData();
-      hookForm.append("file", hookFile);
-      hookForm.append("persona", selectedPersona);
-      hookForm.append("clip_name", clipName);
-      await uploadClip(hookForm);
+      // Upload hook clip (chunked, resumes after network drops)
+      await uploadResumable(hookFile, {
+        kind: "hook",
+        persona: selectedPersona,
+        clip_name: clipName,
+      });
 
       // Upload or auto-generate reaction
-      const reactionForm = new FormData();
-      reactionForm.append("persona", selectedPersona);
-      reactionForm.append("clip_name", clipName);
       if (reactionMode === "upload" && reactionFile) {
-        reactionForm.append("file", reactionFile);
+        await uploadResumable(reactionFile, {
+          kind: "reaction",
+          persona: selectedPersona,
+          clip_name: clipName,
+        });
       } else {
+        const reactionForm = new FormData();
+        reactionForm.append("persona", selectedPersona);
+        reactionForm.append("clip_name", clipName);
         reactionForm.append("auto_generate", "true");
+        await uploadReaction(reactionForm);
       }
-      await uploadReaction(reactionForm);
 
       resetUpload();
       refreshClips();
@@ -170,8 +205,10 @@ export default function AssetManagerPage() {
                   <div className="aspect-[9/16] bg-muted rounded-md overflow-hidden">
                     {/* eslint-disable-next-line @next/next/no-img-element */}
                     <img
-                      src={assetUrl(img.path)}
+                      src={assetVariantUrl(img.path, 320, img.version)}
+                      srcSet={`${assetVariantUrl(img.path, 320, img.version)} 1x, ${assetVariantUrl(img.path, 640, img.version)} 2x`}
                       alt={img.name}
+                      loading="lazy"
                       className="w-full h-full object-cover"
                     />
                   </div>
@@ -351,13 +388,22 @@ export default function AssetManagerPage() {
                     className="aspect-[9/16] bg-muted rounded-md overflow-hidden relative cursor-pointer"
                     onClick={() => setPreviewClip(clip)}
                   >
-                    {/* eslint-disable-next-line @next/next/no-img-element */}
-                    <img
-                      src={thumbnailUrl(clip.path)}
-                      alt={clip.name}
-                      className="w-full h-full object-cover"
-                      loading="lazy"
-                    />
+                    {atlasTileStyle(atlases[atlasKey(clip)], clip.path) ? (
+                      <div
+                        role="img"
+                        aria-label={clip.name}
+                        className="w-full h-full"
+                        style={atlasTileStyle(atlases[atlasKey(clip)], clip.path)!}
+                      />
+                    ) : (
+                      // eslint-disable-next-line @next/next/no-img-element
+                      <img
+                        src={thumbnailUrl(clip.path)}
+                        alt={clip.name}
+                        className="w-full h-full object-cover"
+                        loading="lazy"
+                      />
+                    )}
                     <div className="absolute inset-0 flex items-center justify-center bg-black/20 opacity-0 group-hover:opacity-100 transition-opacity">
                       <Play className="h-6 w-6 text-white" />
                     </div>
@@ -14,32 +14,41 @@ import {
 } from "lucide-react";
 import {
   submitStitch,
+  uploadResumable,
+  getClips,
   getStitchJobStatus,
   stitchDownloadUrl,
   type StitchJobStatus,
+  type AssetInfo,
 } from "@/lib/api";
 import PromptGenerator from "@/components/prompt-generator";
 
 interface Scene {
   id: number;
   file: File | null;
+  assetPath: string | null; // library clip instead of an upload
   text: string;
   speed: string;
 }
 
 let nextId = 1;
 function makeScene(): Scene {
-  return { id: nextId++, file: null, text: "", speed: "" };
+  return { id: nextId++, file: null, assetPath: null, text: "", speed: "" };
 }
 
 export default function StitcherPage() {
   const [scenes, setScenes] = useState<Scene[]>([makeScene()]);
   const [launching, setLaunching] = useState(false);
   const [job, setJob] = useState<StitchJobStatus | null>(null);
+  const [library, setLibrary] = useState<AssetInfo[]>([]);
   const pollRef = useRef<ReturnType<typeof setInterval> | null>(null);
   const logRef = useRef<HTMLPreElement>(null);
 
-  const canStitch = scenes.some((s) => s.file) && !launching;
+  const canStitch = scenes.some((s) => s.file || s.assetPath) && !launching;
+
+  useEffect(() => {
+    getClips().then(setLibrary).catch(() => setLibrary([]));
+  }, []);
 
   const addScene = () => setScenes((prev) => [...prev, makeScene()]);
 
@@ -96,25 +105,38 @@ export default function StitcherPage() {
   }, []);
 
   const handleStitch = async () => {
-    const validScenes = scenes.filter((s) => s.file);
+    const validScenes = scenes.filter((s) => s.file || s.assetPath);
     if (validScenes.length === 0) return;
 
     setLaunching(true);
     setJob(null);
 
-    const formData = new FormData();
-    const sceneMeta: { text: string; speed: number | null }[] = [];
-
-    for (const scene of validScenes) {
-      formData.append("files", scene.file!);
-      sceneMeta.push({
-        text: scene.text,
-        speed: scene.speed ? parseFloat(scene.speed) : null,
-      });
-    }
-    formData.append("scenes_json", JSON.stringify(sceneMeta));
-
     try {
+      // Chunked uploads resume after network drops; footage the server
+      // already has (same hash, or a library clip) is not sent again
+      const sceneMeta: {
+        text: string;
+        speed: number | null;
+        blob_sha256?: string;
+        asset_path?: string;
+      }[] = [];
+      for (const scene of validScenes) {
+        const source = scene.assetPath
+          ? { asset_path: scene.assetPath }
+          : {
+              blob_sha256: (
+                await uploadResumable(scene.file!, { kind: "stitch", filename: scene.file!.name })
+              ).sha256,
+            };
+        sceneMeta.push({
+          text: scene.text,
+          speed: scene.speed ? parseFloat(scene.speed) : null,
+          ...source,
+        });
+      }
+      const formData = new FormData();
+      formData.append("scenes_json", JSON.stringify(sceneMeta));
+
       const result = await submitStitch(formData);
       setJob({ id: result.job_id, status: result.status, output: "", result_filename: null });
       pollJob(result.job_id);
@@ -171,34 +193,56 @@ export default function StitcherPage() {
                     <label className="block text-xs font-medium text-muted-foreground mb-1">
                       Video clip
                     </label>
-                    {scene.file ? (
+                    {scene.file || scene.assetPath ? (
                       <div className="flex items-center gap-2 text-sm">
-                        <span className="truncate max-w-xs">{scene.file.name}</span>
+                        <span className="truncate max-w-xs">
+                          {scene.file ? scene.file.name : scene.assetPath}
+                        </span>
                         <span className="text-xs text-muted-foreground">
-                          ({(scene.file.size / 1024 / 1024).toFixed(1)} MB)
+                          {scene.file
+                            ? `(${(scene.file.size / 1024 / 1024).toFixed(1)} MB)`
+                            : "(library)"}
                         </span>
                         <button
-                          onClick={() => updateScene(scene.id, { file: null })}
+                          onClick={() => updateScene(scene.id, { file: null, assetPath: null })}
                           className="text-muted-foreground hover:text-foreground"
                         >
                           <X className="h-3.5 w-3.5" />
                         </button>
                       </div>
                     ) : (
-                      <label className="flex items-center justify-center w-full h-20 border-2 border-dashed rounded-md cursor-pointer hover:border-foreground/30 transition-colors">
-                        <span className="text-sm text-muted-foreground">
-                          Click to select video
-                        </span>
-                        <input
-                          type="file"
-                          accept="video/*"
-                          className="hidden"
-                          onChange={(e) => {
-                            const file = e.target.files?.[0] ?? null;
-                            if (file) updateScene(scene.id, { file });
-                          }}
-                        />
-                      </label>
+                      <div className="space-y-2">
+                        <label className="flex items-center justify-center w-full h-20 border-2 border-dashed rounded-md cursor-pointer hover:border-foreground/30 transition-colors">
+                          <span className="text-sm text-muted-foreground">
+                            Click to select video
+                          </span>
+                          <input
+                            type="file"
+                            accept="video/*"
+                            className="hidden"
+                            onChange={(e) => {
+                              const file = e.target.files?.[0] ?? null;
+                              if (file) updateScene(scene.id, { file });
+                            }}
+                          />
+                        </label>
+                        {library.length > 0 && (
+                          <select
+                            value=""
+                            onChange={(e) =>
+                              e.target.value && updateScene(scene.id, { assetPath: e.target.value })
+                            }
+                            className="w-full rounded-md border bg-background px-3 py-2 text-sm text-muted-foreground"
+                          >
+                            <option value="">…or use a library clip (no upload)</option>
+                            {library.map((clip) => (
+                              <option key={clip.path} value={clip.path}>
+                                {clip.path}
+                              </option>
+                            ))}
+                          </select>
+                        )}
+                      </div>
                     )}
                   </div>
 
@@ -297,6 +341,15 @@ export default function StitcherPage() {
             </CardTitle>
           </CardHeader>
           <CardContent className="space-y-4">
+            {job.status === "running" && job.progress && (
+              <p className="text-xs font-mono text-muted-foreground">
+                Scene {job.progress.scene}/{job.progress.scenes}
+                {job.progress.percent !== null && ` — ${job.progress.percent}%`}
+                {` · ${job.progress.fps} fps`}
+                {job.progress.speed !== null && ` · ${job.progress.speed}x`}
+                {job.progress.eta_seconds !== null && ` · ETA ${Math.round(job.progress.eta_seconds)}s`}
+              </p>
+            )}
             <pre
               ref={logRef}
               className="text-xs whitespace-pre-wrap max-h-64 overflow-auto font-mono text-muted-foreground bg-muted/30 rounded-md p-3"
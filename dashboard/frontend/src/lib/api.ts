@@ -1,3 +1,5 @@
+import { Sha256 } from "@/lib/sha256";
+
 const API_BASE =
   process.env.NEXT_PUBLIC_API_URL ||
   (typeof window !== "undefined" ? "" : "http://localhost:8000");
@@ -39,10 +41,22 @@ export function videoByPathUrl(path: string) {
   return `${API_BASE}/api/content/video-by-path?path=${encodeURIComponent(path)}`;
 }
 
+/** Resolve an API-relative URL (e.g. a reel's preview_url / poster_url). */
+export function apiUrl(relative: string) {
+  return `${API_BASE}${relative}`;
+}
+
 export function assetUrl(path: string) {
   return `${API_BASE}/api/assets/file/${path}`;
 }
 
+/** Resized WebP/JPEG of an image asset; pass its content version for an immutable URL. */
+export function assetVariantUrl(path: string, width: number, version?: string | null) {
+  const params = new URLSearchParams({ w: String(width) });
+  if (version) params.set("v", version);
+  return `${API_BASE}/api/assets/file/${path}?${params}`;
+}
+
 export function thumbnailUrl(path: string) {
   return `${API_BASE}/api/assets/thumbnail/${path}`;
 }
@@ -76,6 +90,14 @@ export async function getClips() {
   return fetchAPI<AssetInfo[]>("/api/assets/clips");
 }
 
+/** Sprite sheet of clip thumbnails; omit persona/type to include all of them. */
+export async function getThumbnailAtlas(persona?: string, type?: string) {
+  const params = new URLSearchParams();
+  if (persona) params.set("persona", persona);
+  if (type) params.set("type", type);
+  return fetchAPI<ThumbnailAtlas>(`/api/assets/thumbnail-atlas?${params}`);
+}
+
 export async function getAssetUsage() {
   return fetchAPI<AssetUsageRow[]>("/api/assets/usage");
 }
@@ -98,6 +120,106 @@ export async function uploadReaction(formData: FormData): Promise<{ ok: boolean;
   return res.json();
 }
 
+// ─── Resumable uploads ──────────────────────────────
+
+export type ResumableUploadTarget =
+  | { kind: "hook" | "reaction"; persona: string; clip_name: string }
+  | { kind: "screen-recording"; app: string; filename: string }
+  | { kind: "stitch"; filename?: string };
+
+export interface ResumableUploadResult {
+  complete: true;
+  kind: string;
+  size: number;
+  sha256: string;
+  path?: string;
+  deduplicated?: boolean;
+}
+
+interface UploadSession {
+  id: string;
+  offset: number;
+  chunk_size: number;
+  complete: false;
+}
+
+const sha256Cache = new WeakMap<Blob, Promise<string>>();
+const HASH_SLICE_BYTES = 4 * 1024 * 1024;
+
+async function hashSlices(file: Blob): Promise<string> {
+  const digest = new Sha256();
+  for (let offset = 0; offset < file.size; offset += HASH_SLICE_BYTES) {
+    const slice = file.slice(offset, offset + HASH_SLICE_BYTES);
+    digest.update(new Uint8Array(await slice.arrayBuffer()));
+  }
+  return digest.hex();
+}
+
+/** Hex sha256 of a file, read a slice at a time and hashed once per File object. */
+export function sha256Hex(file: Blob): Promise<string> {
+  let hash = sha256Cache.get(file);
+  if (!hash) {
+    hash = hashSlices(file);
+    sha256Cache.set(file, hash);
+    hash.catch(() => sha256Cache.delete(file));
+  }
+  return hash;
+}
+
+async function sendChunk(id: string, offset: number, chunk: Blob): Promise<number> {
+  const res = await fetch(`${API_BASE}/api/uploads/${id}?offset=${offset}`, {
+    method: "PUT",
+    headers: { "Content-Type": "application/octet-stream" },
+    body: chunk,
+  });
+  if (res.status === 409) {
+    // Offset out of sync (e.g. an earlier attempt landed) — continue from the server's
+    const body = await res.json();
+    if (typeof body.detail?.offset === "number") return body.detail.offset;
+  }
+  if (!res.ok) throw new Error(`API error: ${res.status} ${res.statusText}`);
+  return (await res.json()).offset;
+}
+
+/** Upload a file in chunks, resuming after network errors; known content completes instantly. */
+export async function uploadResumable(
+  file: File,
+  target: ResumableUploadTarget,
+  onProgress?: (sent: number, total: number) => void,
+  retries = 5
+): Promise<ResumableUploadResult> {
+  const sha256 = await sha256Hex(file);
+  const init = await fetchAPI<UploadSession | ResumableUploadResult>("/api/uploads", {
+    method: "POST",
+    headers: { "Content-Type": "application/json" },
+    body: JSON.stringify({
+      filename: file.name,
+      ...target,
+      size: file.size,
+      sha256,
+    }),
+  });
+  if (init.complete) return init;
+
+  let offset = init.offset;
+  let failures = 0;
+  while (offset < file.size) {
+    try {
+      offset = await sendChunk(init.id, offset, file.slice(offset, offset + init.chunk_size));
+      failures = 0;
+      onProgress?.(offset, file.size);
+    } catch (err) {
+      if (++failures > retries) throw err;
+      await new Promise((r) => setTimeout(r, 1000 * 2 ** failures));
+      offset = await fetchAPI<UploadSession>(`/api/uploads/${init.id}`).then(
+        (session) => session.offset,
+        () => offset
+      );
+    }
+  }
+  return fetchAPI<ResumableUploadResult>(`/api/uploads/${init.id}/finalize`, { method: "POST" });
+}
+
 export async function deleteClip(
   persona: string,
   clipType: string,
@@ -278,6 +400,9 @@ export interface PipelineRun {
   content_angle: string;
   reel_path: string | null;
   cost_usd: number | null;
+  render_cache?: "hit" | "miss" | null;
+  preview_url?: string | null;
+  poster_url?: string | null;
 }
 
 export interface DailySpend {
@@ -297,6 +422,19 @@ export interface AssetInfo {
   path: string;
   persona: string | null;
   type?: string;
+  size?: number;
+  duration?: number | null;
+  version?: string | null; // content hash prefix (reference images)
+}
+
+export interface ThumbnailAtlas {
+  version: string;
+  tile_width: number;
+  tile_height: number;
+  width: number;
+  height: number;
+  tiles: Record<string, { x: number; y: number }>;
+  sheet_url: string;
 }
 
 export interface AssetUsageRow {
@@ -332,6 +470,19 @@ export interface PipelineRunRequest {
   reaction_clip?: string;
 }
 
+export interface FFmpegProgress {
+  label?: string;
+  scene?: number;
+  scenes?: number;
+  state: string;
+  out_time: number;
+  duration: number | null;
+  percent: number | null;
+  fps: number;
+  speed: number | null;
+  eta_seconds: number | null;
+}
+
 export interface PipelineRunStatus {
   id: string;
   status: string;
@@ -339,6 +490,7 @@ export interface PipelineRunStatus {
   app?: string;
   started_at: string;
   output: string;
+  progress?: FFmpegProgress | null;
 }
 
 export interface ScheduleSlot {
@@ -409,6 +561,7 @@ export async function generatePrompt(req: PromptRequest): Promise<PromptResponse
 export interface StitchJobResponse {
   job_id: string;
   status: string;
+  sources?: ({ blob_sha256: string } | { asset_path: string })[];
 }
 
 export interface StitchJobStatus {
@@ -416,6 +569,7 @@ export interface StitchJobStatus {
   status: string;
   output: string;
   result_filename: string | null;
+  progress?: FFmpegProgress | null;
 }
 
 export async function submitStitch(formData: FormData): Promise<StitchJobResponse> {
@@ -0,0 +1,182 @@
+#!/usr/bin/env python3
+"""
+Local stand-in for the Anthropic Messages API that simulates prompt caching.
+
+Every cache_control breakpoint in the request (system blocks, then message
+content blocks) is remembered for the cache TTL; a later request whose
+prefix matches a remembered breakpoint is billed as a cache read, the rest
+of the cached prefix as a cache write. Token counts are estimated at ~4
+characters per token and blocks below --min-tokens are not cached, like the
+real API. Responses carry a canned JSON reply containing every field the
+pipeline scripts parse. Streaming (SSE) requests are supported.
+
+Usage:
+  python3 scripts/anthropic_stub.py                    # listen on 127.0.0.1:8765
+  python3 scripts/anthropic_stub.py --port 9000 --reply reply.json
+  ANTHROPIC_BASE_URL=http://127.0.0.1:8765 ANTHROPIC_API_KEY=stub python3 scripts/autopilot.py --dry-run
+  tail -f logs/llm_usage.jsonl                         # cache read/creation counts per call
+"""
+
+import argparse
+import hashlib
+import json
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+CACHE_TTL = 300  # seconds, matching the API's default ephemeral cache
+
+DEFAULT_REPLY = {
+    "pov_text": "stub hook",
+    "reaction_text": "stub reaction",
+    "suggested_screen_recording": "stats-screen",
+    "hook_text": "stub hook",
+    "payoff_text": "stub payoff",
+    "scene_1_text": "stub scene one",
+    "scene_2_text": "stub scene two",
+    "scene_3_text": "stub scene three",
+    "caption": "stub caption",
+    "hashtags": "#one #two #three #four #five",
+    "content_angle": "discovery",
+}
+
+_cache: dict[str, float] = {}  # prefix hash → expiry
+_cache_lock = threading.Lock()
+
+
+def estimate_tokens(value) -> int:
+    return max(1, len(json.dumps(value)) // 4)
+
+
+def _blocks(request: dict) -> list[dict]:
+    """Prompt in cache order: system blocks, then each message's content blocks."""
+    system = request.get("system") or []
+    blocks = [{"type": "text", "text": system}] if isinstance(system, str) else list(system)
+    for message in request.get("messages", []):
+        content = message.get("content")
+        if isinstance(content, str):
+            blocks.append({"type": "text", "text": content, "role": message.get("role")})
+        else:
+            blocks.extend({**b, "role": message.get("role")} for b in content or [])
+    return blocks
+
+
+def simulate_usage(request: dict, min_tokens: int) -> dict:
+    """Input token split (uncached / cache read / cache write) for a request."""
+    blocks = _blocks(request)
+    total = sum(estimate_tokens(b) for b in blocks)
+    now = time.time()
+    hit_tokens = 0
+    breakpoint_tokens = []  # (prefix hash, prefix tokens) for each breakpoint
+    digest = hashlib.sha256()
+    prefix_tokens = 0
+    for block in blocks:
+        digest.update(json.dumps({k: v for k, v in block.items() if k != "cache_control"}, sort_keys=True).encode())
+        prefix_tokens += estimate_tokens(block)
+        if block.get("cache_control") and prefix_tokens >= min_tokens:
+            breakpoint_tokens.append((digest.hexdigest(), prefix_tokens))
+
+    with _cache_lock:
+        for key, tokens in breakpoint_tokens:
+            if _cache.get(key, 0) > now:
+                hit_tokens = tokens
+        for key, _ in breakpoint_tokens:
+            _cache[key] = now + CACHE_TTL
+
+    cached_tokens = breakpoint_tokens[-1][1] if breakpoint_tokens else 0
+    return {
+        "input_tokens": total - cached_tokens,
+        "cache_creation_input_tokens": cached_tokens - hit_tokens,
+        "cache_read_input_tokens": hit_tokens,
+        "output_tokens": 0,
+    }
+
+
+class Handler(BaseHTTPRequestHandler):
+    reply_text = json.dumps(DEFAULT_REPLY)
+    min_tokens = 1024
+
+    def log_message(self, fmt, *args):
+        pass
+
+    def _json(self, status: int, body: dict):
+        data = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("content-type", "application/json")
+        self.send_header("content-length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _event(self, name: str, data: dict):
+        self.wfile.write(f"event: {name}\ndata: {json.dumps(data)}\n\n".encode())
+        self.wfile.flush()
+
+    def do_POST(self):
+        if self.path.split("?")[0] != "/v1/messages":
+            self._json(404, {"type": "error", "error": {"type": "not_found_error", "message": self.path}})
+            return
+        try:
+            request = json.loads(self.rfile.read(int(self.headers.get("content-length", 0))))
+        except (ValueError, json.JSONDecodeError) as e:
+            self._json(400, {"type": "error", "error": {"type": "invalid_request_error", "message": str(e)}})
+            return
+
+        usage = simulate_usage(request, self.min_tokens)
+        usage["output_tokens"] = estimate_tokens(self.reply_text)
+        print(f"{request.get('model')}: {json.dumps(usage)}", flush=True)
+        message = {
+            "id": f"msg_stub_{uuid.uuid4().hex[:20]}",
+            "type": "message",
+            "role": "assistant",
+            "model": request.get("model", "stub"),
+            "content": [{"type": "text", "text": self.reply_text}],
+            "stop_reason": "end_turn",
+            "stop_sequence": None,
+            "usage": usage,
+        }
+        if not request.get("stream"):
+            self._json(200, message)
+            return
+
+        self.send_response(200)
+        self.send_header("content-type", "text/event-stream")
+        self.send_header("cache-control", "no-cache")
+        self.end_headers()
+        self._event("message_start", {"type": "message_start", "message": {
+            **message, "content": [], "stop_reason": None, "usage": {**usage, "output_tokens": 1}}})
+        self._event("content_block_start", {"type": "content_block_start", "index": 0,
+                                            "content_block": {"type": "text", "text": ""}})
+        for i in range(0, len(self.reply_text), 40):
+            self._event("content_block_delta", {"type": "content_block_delta", "index": 0,
+                                                "delta": {"type": "text_delta", "text": self.reply_text[i:i + 40]}})
+        self._event("content_block_stop", {"type": "content_block_stop", "index": 0})
+        self._event("message_delta", {"type": "message_delta",
+                                      "delta": {"stop_reason": "end_turn", "stop_sequence": None},
+                                      "usage": {"output_tokens": usage["output_tokens"]}})
+        self._event("message_stop", {"type": "message_stop"})
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local Anthropic Messages API stub with simulated prompt caching")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--reply", type=Path, help="File whose text is returned as the model reply")
+    parser.add_argument("--min-tokens", type=int, default=1024,
+                        help="Smallest prefix (estimated tokens) that can be cached")
+    args = parser.parse_args()
+
+    if args.reply:
+        Handler.reply_text = args.reply.read_text()
+    Handler.min_tokens = args.min_tokens
+    server = ThreadingHTTPServer((args.host, args.port), Handler)
+    print(f"Anthropic stub listening on http://{args.host}:{args.port} — set ANTHROPIC_BASE_URL to this")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
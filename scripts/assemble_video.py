@@ -7,10 +7,8 @@ All clips normalized to 1080×1920 @ 30fps, audio stripped, uploaded to Google D
 """
 
 import argparse
-import os
-import subprocess
+import json
 import sys
-import tempfile
 from datetime import datetime
 from pathlib import Path
 
@@ -21,6 +19,17 @@ FONT_DIR = BASE_DIR / "fonts"
 OUTPUT_DIR = BASE_DIR / "video_output"
 GDRIVE_FOLDER = "manifest-social-videos"
 
+# Shared ffmpeg helpers live in the dashboard backend
+sys.path.insert(0, str(BASE_DIR / "dashboard" / "backend"))
+from services.ffmpeg_progress import (
+    format_progress_line, probe_duration, progress_enabled, run_ffmpeg_with_progress,
+)
+from services.ffmpeg_slots import run_ffmpeg as run_slotted
+from services.preview_proxy import master_output_args, preview_output_args
+from services.scratch import estimate_mb, intermediate_path, scratch_dir
+from services.upload_queue import enqueue as enqueue_upload
+from services import render_cache
+
 WIDTH, HEIGHT, FPS = 1080, 1920, 30
 BITRATE = "8000k"
 FONT_SIZE = 56
@@ -31,6 +40,9 @@ STROKE_WIDTH = 3
 # Chars per line at 56px on 1080w with ~60px padding each side
 CHARS_PER_LINE = 32
 
+# Bump when the filter graph changes in a way the settings above don't capture
+RENDER_PROFILE_VERSION = 1
+
 
 # ─── Font resolution ─────────────────────────────────
 
@@ -86,13 +98,24 @@ def escape_drawtext(text):
 
 # ─── ffmpeg helpers ──────────────────────────────────
 
-def run_ffmpeg(args, dry_run=False):
-    """Run an ffmpeg command. Returns True on success."""
+def run_ffmpeg(args, dry_run=False, label="ffmpeg", duration=None):
+    """Run an ffmpeg command. Returns True on success.
+
+    When launched by the dashboard, progress updates are printed as marker
+    lines so the run status can show percent / fps / speed / ETA.
+    """
     cmd = ["ffmpeg", "-y", "-hide_banner", "-loglevel", "warning"] + args
     if dry_run:
         print(f"  [DRY RUN] {' '.join(cmd)}")
         return True
-    result = subprocess.run(cmd, capture_output=True, text=True)
+    if progress_enabled():
+        result = run_ffmpeg_with_progress(
+            cmd, duration,
+            lambda p: print(format_progress_line(label, p), flush=True),
+            label=label,
+        )
+    else:
+        result = run_slotted(cmd, label)
     if result.returncode != 0:
         print(f"  ffmpeg error: {result.stderr}")
         return False
@@ -149,7 +172,7 @@ def process_hook(input_path, output_path, text, font_path, dry_run=False):
         "-c:v", "libx264", "-b:v", BITRATE,
         "-profile:v", "high", "-level", "4.0",
         str(output_path),
-    ], dry_run)
+    ], dry_run, label="hook")
 
 
 SCREEN_TEXT = {
@@ -179,6 +202,11 @@ def process_screen_recording(input_path, output_path, speed, font_path, dry_run=
         drawtext = build_drawtext_filter(overlay_text, font_path)
         vf = f"{vf},{drawtext}"
 
+    duration = None
+    if progress_enabled() and not dry_run:
+        duration = probe_duration(input_path)
+        duration = duration / speed if duration else None
+
     return run_ffmpeg([
         "-i", str(input_path),
         "-vf", vf,
@@ -186,7 +214,7 @@ def process_screen_recording(input_path, output_path, speed, font_path, dry_run=
         "-c:v", "libx264", "-b:v", BITRATE,
         "-profile:v", "high", "-level", "4.0",
         str(output_path),
-    ], dry_run)
+    ], dry_run, label="screen", duration=duration)
 
 
 def process_reaction(input_path, output_path, text, font_path, dry_run=False):
@@ -202,11 +230,11 @@ def process_reaction(input_path, output_path, text, font_path, dry_run=False):
         "-c:v", "libx264", "-b:v", BITRATE,
         "-profile:v", "high", "-level", "4.0",
         str(output_path),
-    ], dry_run)
+    ], dry_run, label="reaction")
 
 
 def concatenate(clip_paths, output_path, dry_run=False):
-    """Concatenate processed clips using ffmpeg concat demuxer."""
+    """Concatenate processed clips, writing the preview proxy + poster in the same pass."""
     print(f"  Concatenating {len(clip_paths)} clips...")
     # Write concat file list
     list_path = clip_paths[0].parent / "concat_list.txt"
@@ -218,10 +246,9 @@ def concatenate(clip_paths, output_path, dry_run=False):
     success = run_ffmpeg([
         "-f", "concat", "-safe", "0",
         "-i", str(list_path),
-        "-c", "copy",
-        "-movflags", "+faststart",
-        str(output_path),
-    ], dry_run)
+        *master_output_args(output_path),
+        *preview_output_args(output_path),
+    ], dry_run, label="concat")
 
     # Cleanup concat list
     if not dry_run and list_path.exists():
@@ -229,22 +256,197 @@ def concatenate(clip_paths, output_path, dry_run=False):
     return success
 
 
+# ─── Render cache ────────────────────────────────────
+
+def reel_render_key(reel, speed, font_path):
+    """Render-cache key for one reel (manifest entry format)."""
+    profile = {
+        "renderer": "assemble_video",
+        "version": RENDER_PROFILE_VERSION,
+        "size": [WIDTH, HEIGHT],
+        "fps": FPS,
+        "bitrate": BITRATE,
+        "font_size": FONT_SIZE,
+        "text_y": TEXT_Y_RATIO,
+        "pad": HORIZONTAL_PAD,
+        "stroke": STROKE_WIDTH,
+        "chars_per_line": CHARS_PER_LINE,
+    }
+    reaction = reel.get("reaction_clip")
+    inputs = [
+        render_cache.file_sha256(reel["hook_clip"]),
+        render_cache.file_sha256(reel["screen_recording"]),
+        render_cache.file_sha256(reaction) if reaction else None,
+    ]
+    params = {
+        "hook_text": reel["hook_text"],
+        "screen_text": _infer_screen_text(reel["screen_recording"]),
+        "reaction_text": reel.get("reaction_text") if reaction else None,
+        "speed": float(speed),
+        "font": render_cache.file_sha256(font_path),
+    }
+    return render_cache.render_key(profile, inputs, params)
+
+
+def reuse_cached_reel(key, out_path):
+    """On a cache hit, link the earlier render to out_path. Returns out_path or None."""
+    cached = render_cache.lookup(key)
+    if cached is None:
+        return None
+    render_cache.materialize(cached, out_path)
+    size_mb = out_path.stat().st_size / (1024 * 1024)
+    print(f"  ♻️  Render cache hit {key[:12]} — reusing {cached.name}")
+    print(f"\n✅ Reel assembled: {out_path} ({size_mb:.1f} MB, cache hit)")
+    return out_path
+
+
+# ─── Batch rendering ─────────────────────────────────
+
+def process_fanout(input_path, prefilter, outputs, font_path, dry_run=False, label="fanout"):
+    """Decode + normalize one input once, then burn N overlays in a single ffmpeg graph.
+
+    outputs is a list of (output_path, overlay_text_or_None). The decoded,
+    scaled frames are split N ways, so the source is read and normalized once
+    no matter how many reels use it.
+    """
+    n = len(outputs)
+    overlays = [
+        build_drawtext_filter(text, font_path) if text else "null"
+        for _, text in outputs
+    ]
+    if n == 1:
+        graph = f"[0:v]{prefilter},{overlays[0]}[o0]"
+    else:
+        branches = "".join(f"[s{i}]" for i in range(n))
+        graph = f"[0:v]{prefilter},split={n}{branches};" + ";".join(
+            f"[s{i}]{overlay}[o{i}]" for i, overlay in enumerate(overlays)
+        )
+
+    args = ["-i", str(input_path), "-filter_complex", graph]
+    for i, (output_path, _) in enumerate(outputs):
+        args += [
+            "-map", f"[o{i}]",
+            "-an",
+            "-c:v", "libx264", "-b:v", BITRATE,
+            "-profile:v", "high", "-level", "4.0",
+            str(output_path),
+        ]
+    print(f"  Processing {Path(input_path).name} → {n} output(s)")
+    return run_ffmpeg(args, dry_run, label=label)
+
+
+def plan_batch(reels, speed_default, tmp):
+    """Group every reel's segments by shared input.
+
+    Returns (groups, segments): groups maps (input, prefilter) → list of
+    (output_path, text); segments lists each reel's ordered segment paths.
+    Identical (input, prefilter, text) segments collapse to a single output.
+    """
+    groups = {}
+    outputs_by_key = {}
+    segments = []
+
+    def _segment(kind, input_path, prefilter, text):
+        key = (str(input_path), prefilter, text)
+        if key not in outputs_by_key:
+            out = intermediate_path(tmp, f"{kind}_{len(outputs_by_key):03d}.mp4", estimate_mb([input_path]))
+            outputs_by_key[key] = out
+            groups.setdefault((str(input_path), prefilter, kind), []).append((out, text))
+        return outputs_by_key[key]
+
+    scale = build_scale_pad_filter()
+    for reel in reels:
+        speed = reel.get("speed", speed_default)
+        parts = [
+            _segment("hook", reel["hook_clip"], scale, reel["hook_text"]),
+            _segment("screen", reel["screen_recording"], f"setpts=PTS/{speed},{scale}",
+                     _infer_screen_text(reel["screen_recording"])),
+        ]
+        if reel.get("reaction_clip"):
+            parts.append(_segment("reaction", reel["reaction_clip"], scale, reel.get("reaction_text")))
+        segments.append(parts)
+    return groups, segments
+
+
+def assemble_batch(args):
+    """Render every reel in a batch manifest, decoding each shared input once.
+
+    Manifest format: {"reels": [{"hook_clip", "hook_text", "screen_recording",
+    "reaction_clip"?, "reaction_text"?, "speed"?, "output"}]}
+    """
+    manifest = json.loads(Path(args.batch).read_text())
+    reels = manifest.get("reels", [])
+    if not reels:
+        print("ERROR: Batch manifest has no reels")
+        return []
+
+    OUTPUT_DIR.mkdir(exist_ok=True)
+    font_path = find_font(args.font)
+    print(f"Font: {Path(font_path).name}")
+
+    assembled = []
+    keys = {}
+    if not args.dry_run and not args.no_cache:
+        to_render = []
+        for reel in reels:
+            key = reel_render_key(reel, reel.get("speed", args.speed), font_path)
+            hit = reuse_cached_reel(key, Path(reel["output"]))
+            if hit:
+                assembled.append(hit)
+            else:
+                keys[reel["output"]] = key
+                to_render.append(reel)
+        reels = to_render
+
+    inputs = [r[k] for r in reels for k in ("hook_clip", "screen_recording", "reaction_clip") if r.get(k)]
+    with scratch_dir("reel_batch_", estimate_mb(inputs)) as tmp:
+        tmp = Path(tmp)
+        groups, segments = plan_batch(reels, args.speed, tmp)
+
+        naive = sum(len(parts) for parts in segments)
+        print(f"Batch: {len(reels)} reels, {len(groups)} decodes "
+              f"(vs {naive} rendering one reel at a time)")
+
+        failed_outputs = set()
+        for (input_path, prefilter, kind), outputs in groups.items():
+            ok = process_fanout(input_path, prefilter, outputs, font_path, args.dry_run, label=kind)
+            if not ok:
+                print(f"FAILED: {kind} segment from {Path(input_path).name}")
+                failed_outputs.update(out for out, _ in outputs)
+
+        for reel, parts in zip(reels, segments):
+            out_path = Path(reel["output"])
+            if failed_outputs.intersection(parts):
+                print(f"FAILED: {out_path.name} (segment render failed)")
+                continue
+            out_path.parent.mkdir(parents=True, exist_ok=True)
+            if not concatenate(parts, out_path, args.dry_run):
+                print(f"FAILED: Concatenation for {out_path.name}")
+                continue
+            if not args.dry_run:
+                if reel["output"] in keys:
+                    render_cache.record(keys[reel["output"]], out_path)
+                size_mb = out_path.stat().st_size / (1024 * 1024)
+                print(f"\n✅ Reel assembled: {out_path} ({size_mb:.1f} MB)")
+            assembled.append(out_path)
+
+    if not args.no_upload:
+        for out_path in assembled:
+            upload_to_drive(out_path, args.dry_run)
+
+    return assembled
+
+
 # ─── Upload ──────────────────────────────────────────
 
 def upload_to_drive(file_path, dry_run=False):
-    """Upload finished reel to Google Drive via rclone."""
-    cmd = f"rclone copy {file_path} gdrive:{GDRIVE_FOLDER}/"
+    """Queue finished reel for Google Drive upload; the upload worker sends it in the background."""
     if dry_run:
-        print(f"  [DRY RUN] {cmd}")
+        print(f"  [DRY RUN] queue upload: {file_path} → gdrive:{GDRIVE_FOLDER}/")
         return True
-    print(f"  Uploading to Google Drive ({GDRIVE_FOLDER})...")
-    result = os.system(cmd)
-    if result == 0:
-        print(f"  ✅ Uploaded: {file_path.name}")
-        return True
-    else:
-        print(f"  ⚠️  Upload failed (exit code {result})")
-        return False
+    enqueue_upload(file_path, remote=f"gdrive:{GDRIVE_FOLDER}/")
+    print(f"  ☁️  Queued for Google Drive upload ({GDRIVE_FOLDER}): {file_path.name}")
+    return True
 
 
 # ─── Main ────────────────────────────────────────────
@@ -265,12 +467,28 @@ def assemble(args):
         out_path = OUTPUT_DIR / f"reel_{ts}.mp4"
     out_path.parent.mkdir(parents=True, exist_ok=True)
 
-    with tempfile.TemporaryDirectory(prefix="reel_") as tmp:
+    # Step 0: Identical inputs + text were rendered before — reuse that reel
+    cache_key = None
+    if not args.dry_run and not args.no_cache:
+        cache_key = reel_render_key({
+            "hook_clip": args.hook_clip,
+            "hook_text": args.hook_text,
+            "screen_recording": args.screen_recording,
+            "reaction_clip": args.reaction_clip,
+            "reaction_text": args.reaction_text,
+        }, args.speed, font_path)
+        if reuse_cached_reel(cache_key, out_path):
+            if not args.no_upload:
+                upload_to_drive(out_path, args.dry_run)
+            return out_path
+
+    inputs = [p for p in (args.hook_clip, args.screen_recording, args.reaction_clip) if p]
+    with scratch_dir("reel_", estimate_mb(inputs)) as tmp:
         tmp = Path(tmp)
 
         # Step 1: Process each clip
-        hook_out = tmp / "01_hook.mp4"
-        screen_out = tmp / "02_screen.mp4"
+        hook_out = intermediate_path(tmp, "01_hook.mp4", estimate_mb([args.hook_clip]))
+        screen_out = intermediate_path(tmp, "02_screen.mp4", estimate_mb([args.screen_recording]))
 
         ok = process_hook(args.hook_clip, hook_out, args.hook_text, font_path, args.dry_run)
         if not ok:
@@ -285,7 +503,7 @@ def assemble(args):
         clips_to_concat = [hook_out, screen_out]
 
         if args.reaction_clip is not None:
-            react_out = tmp / "03_reaction.mp4"
+            react_out = intermediate_path(tmp, "03_reaction.mp4", estimate_mb([args.reaction_clip]))
             ok = process_reaction(args.reaction_clip, react_out, args.reaction_text, font_path, args.dry_run)
             if not ok:
                 print("FAILED: Reaction clip processing")
@@ -299,6 +517,8 @@ def assemble(args):
             return None
 
     if not args.dry_run:
+        if cache_key:
+            render_cache.record(cache_key, out_path)
         size_mb = out_path.stat().st_size / (1024 * 1024)
         print(f"\n✅ Reel assembled: {out_path} ({size_mb:.1f} MB)")
 
@@ -313,19 +533,38 @@ def main():
     parser = argparse.ArgumentParser(
         description="Assemble a UGC reel: hook + screen recording + reaction with text overlays"
     )
-    parser.add_argument("--hook-clip", required=True, help="Path to hook/opening clip")
-    parser.add_argument("--screen-recording", required=True, help="Path to screen recording clip")
+    parser.add_argument("--hook-clip", help="Path to hook/opening clip")
+    parser.add_argument("--screen-recording", help="Path to screen recording clip")
     parser.add_argument("--reaction-clip", required=False, default=None, help="Path to closing reaction clip (optional)")
-    parser.add_argument("--hook-text", required=True, help="Text overlay for hook clip (Part 1)")
+    parser.add_argument("--hook-text", help="Text overlay for hook clip (Part 1)")
     parser.add_argument("--reaction-text", required=False, default=None, help="Text overlay for reaction clip (Part 3, optional)")
     parser.add_argument("--speed", type=float, default=2.5, help="Speed multiplier for screen recording (default: 2.5)")
     parser.add_argument("--output", help="Output file path (default: auto-generated in video_output/)")
     parser.add_argument("--font", help="Path to .ttf font file (default: auto-detect)")
     parser.add_argument("--no-upload", action="store_true", help="Skip Google Drive upload")
+    parser.add_argument("--no-cache", action="store_true", help="Re-render even if an identical reel is cached")
     parser.add_argument("--dry-run", action="store_true", help="Print commands without executing")
+    parser.add_argument("--batch", help="Path to a batch manifest JSON — render many reels, sharing decoded inputs")
 
     args = parser.parse_args()
 
+    if args.batch:
+        print("=" * 50)
+        print("Manifest Lock — Batch Video Assembly")
+        print("=" * 50)
+        assembled = assemble_batch(args)
+        if not assembled and not args.dry_run:
+            print("\nBatch assembly failed.")
+            sys.exit(1)
+        print(f"\nDone. {len(assembled)} reel(s) assembled.")
+        return
+
+    for flag, value in (("--hook-clip", args.hook_clip),
+                        ("--screen-recording", args.screen_recording),
+                        ("--hook-text", args.hook_text)):
+        if not value:
+            parser.error(f"{flag} is required (unless --batch is given)")
+
     # Validate inputs exist
     inputs_to_check = [
         (args.hook_clip, "Hook clip"),
@@ -7,21 +7,21 @@ No AI video generation — just text overlays and ffmpeg. ~$0.01 per reel.
 
 Usage:
     python3 scripts/autojournal_reel.py                    # Full run
-    python3 scripts/autojournal_reel.py --dry-run          # Text only, no video
+    python3 scripts/autojournal_reel.py --dry-run          # Text + cached scene 1 still, no video
     python3 scripts/autojournal_reel.py --no-upload        # Skip Google Drive upload
     python3 scripts/autojournal_reel.py --style dark       # Force a specific style
     python3 scripts/autojournal_reel.py --category A       # Force a specific category
 """
 
 import argparse
+import hashlib
 import json
 import os
 import random
 import re
+import shutil
 import smtplib
-import subprocess
 import sys
-import tempfile
 from datetime import datetime, date
 from email.mime.multipart import MIMEMultipart
 from email.mime.text import MIMEText
@@ -34,6 +34,21 @@ PROJECT_ROOT = Path(__file__).resolve().parent.parent
 from dotenv import load_dotenv
 load_dotenv(PROJECT_ROOT / ".env", override=True)
 
+# Shared ffmpeg helpers live in the dashboard backend
+sys.path.insert(0, str(PROJECT_ROOT / "dashboard" / "backend"))
+from services.ffmpeg_progress import (
+    format_progress_line, progress_enabled, run_ffmpeg_with_progress,
+)
+from services import asset_usage
+from services.asset_catalog import list_files as catalog_files
+from services.asset_rotation import pick_lru
+from services.context_compiler import budget_context, format_report
+from services.ffmpeg_slots import run_ffmpeg as run_slotted
+from services.preview_proxy import master_output_args, preview_output_args
+from services.prompt_cache import format_usage, log_usage, system_blocks
+from services.scratch import estimate_mb, intermediate_path, scratch_dir
+from services.upload_queue import enqueue as enqueue_upload
+
 SKILLS_DIR = PROJECT_ROOT / "skills"
 MEMORY_DIR = PROJECT_ROOT / "memory"
 ASSETS_DIR = PROJECT_ROOT / "assets"
@@ -44,8 +59,11 @@ VIDEO_OUTPUT_DIR = PROJECT_ROOT / "video_output"
 WIDTH, HEIGHT, FPS = 1080, 1920, 30
 BITRATE = "8000k"
 SCENE1_DURATION = 2.5
+SCENE1_CACHE_DIR = VIDEO_OUTPUT_DIR / ".cache" / "autojournal-scene1"
 GDRIVE_FOLDER = "autojournal-social-videos"
 JSONL_PATH = LOGS_DIR / "autojournal_reel.jsonl"
+MODEL = "claude-sonnet-4-6"
+MEMORY_CONTEXT_RESERVE = 1500  # context tokens held back for memory files
 
 SCREEN_RECORDINGS_DIR = ASSETS_DIR / "screen-recordings" / "autojournal"
 
@@ -165,19 +183,13 @@ def pick_style(run_count, override=None):
     return STYLE_ORDER[run_count % len(STYLE_ORDER)]
 
 
-def pick_screen_recording(recent_runs):
-    """Pick a screen recording, avoiding the last 4 used."""
-    available = sorted([
-        f for f in SCREEN_RECORDINGS_DIR.iterdir()
-        if f.suffix in (".mp4", ".mov")
-    ])
+def pick_screen_recording():
+    """Pick the least recently used screen recording."""
+    available = catalog_files(SCREEN_RECORDINGS_DIR)
     if not available:
         print(f"ERROR: No screen recordings in {SCREEN_RECORDINGS_DIR}")
         sys.exit(1)
-
-    recent_used = {e.get("screen_recording", "") for e in recent_runs[-4:]}
-    unused = [r for r in available if r.name not in recent_used]
-    return random.choice(unused) if unused else random.choice(available)
+    return SCREEN_RECORDINGS_DIR / pick_lru("autojournal", "screen_rec", [r.name for r in available])
 
 
 def pick_category(override=None):
@@ -193,27 +205,22 @@ def pick_category(override=None):
 # ─── Context loading ─────────────────────────────────
 
 def load_context():
-    """Load skill/memory files for Claude system prompt."""
+    """Load skill/memory files for Claude system prompt, as [skills, memory] cache blocks within the token budget."""
     files = [
-        ("skills", "autojournal.md"),
-        ("skills", "content/autojournal-hooks.md"),
+        ("skills", "autojournal.md", 0),
+        ("skills", "content/autojournal-hooks.md", 1),
     ]
     memory_files = [
-        ("memory", "autojournal-performance.md"),
-        ("memory", "failure-log.md"),
+        ("memory", "autojournal-performance.md", 2),
+        ("memory", "failure-log.md", 0),
     ]
 
-    parts = []
-    for section, f in files:
-        base = SKILLS_DIR if section == "skills" else MEMORY_DIR
-        path = base / f
-        if path.exists():
-            parts.append(f"--- {section}/{f} ---\n{path.read_text()}")
-    for section, f in memory_files:
-        path = MEMORY_DIR / f
-        if path.exists():
-            parts.append(f"--- {section}/{f} ---\n{path.read_text()}")
-    return "\n\n".join(parts)
+    blocks, report = budget_context([
+        [(SKILLS_DIR / f, f"--- {section}/{f} ---", priority) for section, f, priority in files],
+        [(MEMORY_DIR / f, f"--- {section}/{f} ---", priority) for section, f, priority in memory_files],
+    ], reserve=[0, MEMORY_CONTEXT_RESERVE])
+    print(f"  {format_report(report)}")
+    return blocks
 
 
 # ─── Load recent runs ───────────────────────────────
@@ -281,13 +288,18 @@ def generate_text(context, category, screen_desc, recent_hooks):
         category_desc=cat_desc,
     ) + avoid_block
 
+    skills, memory = context
     client = anthropic.Anthropic()
     response = client.messages.create(
-        model="claude-sonnet-4-6",
+        model=MODEL,
         max_tokens=400,
-        system=f"You are the content engine for an AutoJournal reel pipeline. Follow the rules in these skill files:\n\n{context}",
+        system=system_blocks(
+            f"You are the content engine for an AutoJournal reel pipeline. Follow the rules in these skill files:\n\n{skills}",
+            memory,
+        ),
         messages=[{"role": "user", "content": prompt}],
     )
+    print(f"  {format_usage(log_usage('autojournal_reel.generate_text', MODEL, response.usage))}")
 
     raw = response.content[0].text.strip()
     if raw.startswith("```"):
@@ -297,20 +309,54 @@ def generate_text(context, category, screen_desc, recent_hooks):
 
 # ─── ffmpeg helpers ──────────────────────────────────
 
-def run_ffmpeg(args, label=""):
-    """Run ffmpeg. Returns True on success."""
+def run_ffmpeg(args, label="", duration=None):
+    """Run ffmpeg. Returns True on success.
+
+    When launched by the dashboard, progress updates are printed as marker
+    lines so the run status can show percent / fps / speed / ETA.
+    """
     cmd = ["ffmpeg", "-y", "-hide_banner", "-loglevel", "warning"] + args
-    result = subprocess.run(cmd, capture_output=True, text=True)
+    if progress_enabled():
+        result = run_ffmpeg_with_progress(
+            cmd, duration,
+            lambda p: print(format_progress_line(label, p), flush=True),
+            label=label,
+        )
+    else:
+        result = run_slotted(cmd, label)
     if result.returncode != 0:
         print(f"  ffmpeg error ({label}): {result.stderr}")
         return False
     return True
 
 
-def build_scene1(hook_text, style_name, tmp_dir):
-    """Build Scene 1: styled text background with centered text (no pill)."""
+def scene1_cache_key(hook_text, style_name, font_path):
+    """Deterministic key for a scene 1 render: style + hook text + font + frame geometry."""
+    payload = json.dumps({
+        "style": SCENE1_STYLES[style_name],
+        "hook_text": hook_text,
+        "font": font_path,
+        "size": [WIDTH, HEIGHT],
+        "fps": FPS,
+        "duration": SCENE1_DURATION,
+    }, sort_keys=True)
+    return hashlib.sha256(payload.encode()).hexdigest()[:16]
+
+
+def render_scene1_still(hook_text, style_name):
+    """Render Scene 1 as a single PNG frame, cached per (style, hook text).
+
+    The background is static, so one frame is all ffmpeg needs to draw —
+    the grid and drawtext filters run once instead of once per output frame.
+    """
     style = SCENE1_STYLES[style_name]
     font_path = find_font(bold=True)
+    key = scene1_cache_key(hook_text, style_name, font_path)
+
+    SCENE1_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+    still = SCENE1_CACHE_DIR / f"{style_name}_{key}.png"
+    if still.exists():
+        return still
 
     lines = wrap_text(hook_text, max_chars=25)
     escaped = escape_drawtext("\n".join(lines))
@@ -326,19 +372,58 @@ def build_scene1(hook_text, style_name, tmp_dir):
     )
 
     if style["grid"]:
-        vf = f"drawgrid=w=72:h=72:t=1:c=0xC4775A@0.08,{drawtext},format=yuv420p"
+        vf = f"drawgrid=w=72:h=72:t=1:c=0xC4775A@0.08,{drawtext}"
     else:
-        vf = f"{drawtext},format=yuv420p"
+        vf = drawtext
 
-    output = tmp_dir / "01_scene1.mp4"
+    # Write to a temp name first so an interrupted render never poisons the cache
+    partial = still.with_suffix(".partial.png")
     ok = run_ffmpeg([
-        "-f", "lavfi", "-i", f"color=c=0x{style['bg']}:s={WIDTH}x{HEIGHT}:d={SCENE1_DURATION}:r={FPS}",
+        "-f", "lavfi", "-i", f"color=c=0x{style['bg']}:s={WIDTH}x{HEIGHT}:r={FPS}",
         "-vf", vf,
-        "-c:v", "libx264", "-b:v", BITRATE,
-        "-profile:v", "high", "-level", "4.0",
-        str(output),
-    ], "scene1")
-    return output if ok else None
+        "-frames:v", "1",
+        str(partial),
+    ], "scene1 still")
+    if not ok:
+        partial.unlink(missing_ok=True)
+        return None
+    partial.rename(still)
+    return still
+
+
+def build_scene1(hook_text, style_name, tmp_dir):
+    """Build Scene 1: styled text background with centered text (no pill).
+
+    The still is looped into a constant-frame segment with -tune stillimage.
+    Both the still and the encoded segment are cached, so re-running with the
+    same hook + style only copies the segment into the working directory.
+    """
+    still = render_scene1_still(hook_text, style_name)
+    if not still:
+        return None
+
+    segment = still.with_suffix(".mp4")
+    if not segment.exists():
+        partial = still.with_suffix(".partial.mp4")
+        ok = run_ffmpeg([
+            "-loop", "1", "-framerate", str(FPS), "-i", str(still),
+            "-t", str(SCENE1_DURATION),
+            "-vf", "format=yuv420p",
+            "-c:v", "libx264", "-b:v", BITRATE,
+            "-tune", "stillimage",
+            "-profile:v", "high", "-level", "4.0",
+            str(partial),
+        ], "scene1")
+        if not ok:
+            partial.unlink(missing_ok=True)
+            return None
+        partial.rename(segment)
+    else:
+        print("  Scene 1 cache hit")
+
+    output = intermediate_path(tmp_dir, "01_scene1.mp4", estimate_mb(stills=1))
+    shutil.copyfile(segment, output)
+    return output
 
 
 def build_scene2(screen_path, payoff_text, tmp_dir):
@@ -371,7 +456,7 @@ def build_scene2(screen_path, payoff_text, tmp_dir):
     )
     vf = f"{scale_pad},{drawtext}"
 
-    output = tmp_dir / "02_scene2.mp4"
+    output = intermediate_path(tmp_dir, "02_scene2.mp4", estimate_mb([screen_path]))
     ok = run_ffmpeg([
         "-i", str(screen_path),
         "-vf", vf,
@@ -384,7 +469,7 @@ def build_scene2(screen_path, payoff_text, tmp_dir):
 
 
 def concatenate(clip_paths, output_path):
-    """Concatenate clips using ffmpeg concat demuxer."""
+    """Concatenate clips, writing the preview proxy + poster in the same pass."""
     list_path = clip_paths[0].parent / "concat_list.txt"
     with open(list_path, "w") as f:
         for p in clip_paths:
@@ -393,9 +478,8 @@ def concatenate(clip_paths, output_path):
     ok = run_ffmpeg([
         "-f", "concat", "-safe", "0",
         "-i", str(list_path),
-        "-c", "copy",
-        "-movflags", "+faststart",
-        str(output_path),
+        *master_output_args(output_path),
+        *preview_output_args(output_path),
     ], "concat")
 
     if list_path.exists():
@@ -406,13 +490,9 @@ def concatenate(clip_paths, output_path):
 # ─── Upload ──────────────────────────────────────────
 
 def upload_to_drive(file_path):
-    """Upload to Google Drive via rclone."""
-    print(f"  Uploading to Google Drive ({GDRIVE_FOLDER})...")
-    result = os.system(f"rclone copy {file_path} gdrive:{GDRIVE_FOLDER}/")
-    if result == 0:
-        print(f"  Uploaded: {file_path.name}")
-    else:
-        print(f"  Upload failed (exit code {result})")
+    """Queue the reel for Google Drive upload; the upload worker sends it in the background."""
+    enqueue_upload(file_path, remote=f"gdrive:{GDRIVE_FOLDER}/")
+    print(f"  Queued for Google Drive upload ({GDRIVE_FOLDER}): {file_path.name}")
 
 
 # ─── Email notification ──────────────────────────────
@@ -500,7 +580,7 @@ def main():
     print(f"\n  Style: {style_name} | Category: {category}")
 
     # 3. Pick screen recording
-    screen_path = pick_screen_recording(recent)
+    screen_path = pick_screen_recording()
     screen_desc = SCREEN_RECORDING_DESCRIPTIONS.get(screen_path.name, "AutoJournal app screen recording")
     print(f"  Screen: {screen_path.name}")
 
@@ -526,6 +606,9 @@ def main():
 
     if args.dry_run:
         print("\n  [DRY RUN] Skipping video assembly")
+        preview = render_scene1_still(content["hook_text"], style_name)
+        if preview:
+            print(f"  Scene 1 preview: {preview}")
         log_run({
             "timestamp": datetime.now().isoformat(),
             "style": style_name,
@@ -536,6 +619,7 @@ def main():
             "caption": content.get("caption", ""),
             "hashtags": content.get("hashtags", ""),
             "reel_path": None,
+            "scene1_preview": str(preview) if preview else None,
             "cost_usd": 0.01,
             "dry_run": True,
         })
@@ -549,7 +633,7 @@ def main():
     ts = datetime.now().strftime("%Y%m%d_%H%M%S")
     out_path = VIDEO_OUTPUT_DIR / f"autojournal_{ts}.mp4"
 
-    with tempfile.TemporaryDirectory(prefix="autojournal_") as tmp:
+    with scratch_dir("autojournal_", estimate_mb([screen_path], stills=1)) as tmp:
         tmp = Path(tmp)
 
         # Scene 1: styled text background + hook
@@ -593,6 +677,7 @@ def main():
     )
 
     # 8. Log
+    asset_usage.record("autojournal", {"screen_rec": screen_path.name}, account="autojournal")
     log_run({
         "timestamp": datetime.now().isoformat(),
         "style": style_name,
@@ -20,6 +20,7 @@ import random
 import smtplib
 import argparse
 import subprocess
+import threading
 from pathlib import Path
 from datetime import datetime, date
 from email.mime.multipart import MIMEMultipart
@@ -38,6 +39,18 @@ LOGS_DIR = PROJECT_ROOT / "logs"
 SCRIPTS_DIR = PROJECT_ROOT / "scripts"
 VIDEO_OUTPUT_DIR = PROJECT_ROOT / "video_output"
 
+# Asset listings and usage history are shared with the dashboard backend
+sys.path.insert(0, str(PROJECT_ROOT / "dashboard" / "backend"))
+from services import asset_usage
+from services.asset_catalog import list_files as catalog_files
+from services.asset_rotation import pick_lru
+from services.context_compiler import budget_context, format_report
+from services.prompt_cache import format_usage, log_usage, system_blocks
+
+# Marker prefix for ffmpeg progress lines from assemble_video.py (see
+# dashboard/backend/services/ffmpeg_progress.py) — passed through unindented
+PROGRESS_MARKER = "@@ffmpeg-progress "
+
 # Account → persona → app mapping (single source of truth)
 # Priority order: Aliyah > Riley > Sanya > Sophie (based on per-reel performance)
 ACCOUNTS = {
@@ -69,75 +82,82 @@ SMTP_USER = os.environ.get("SMTP_USER", "")
 SMTP_PASS = os.environ.get("SMTP_PASS", "")
 RECIPIENT = os.environ.get("DELIVERY_EMAIL", "")
 
+MODEL = "claude-sonnet-4-5-20250929"
+# Context tokens guaranteed to each block (shared, memory, angle, account) under the budget
+CONTEXT_RESERVE = [0, 1500, 1500, 3000]
+
 
 # ---------------------------------------------------------------------------
 # Skill graph reader — load only what's needed
 # ---------------------------------------------------------------------------
 
-def read_skill(relative_path: str) -> str:
-    """Read a skill file from the graph. Returns content or empty string."""
-    path = SKILLS_DIR / relative_path
-    if path.exists():
-        return path.read_text()
-    print(f"  WARN: Skill not found: {path}")
-    return ""
-
-
-def load_memory_file(filename: str) -> str:
-    """Read a memory file. Returns content or empty string."""
-    path = MEMORY_DIR / filename
-    if path.exists():
-        return path.read_text()
-    return ""
-
-
-def load_context_for_account(account: str, angle: str = "discovery") -> str:
-    """Build the Anthropic system prompt from relevant skill graph nodes + memory."""
+def load_context_for_account(account: str, angle: str = "discovery") -> list[str]:
+    """Build the Anthropic system prompt blocks from relevant skill graph nodes + memory.
+
+    Blocks are ordered from most to least shared so each one can end a
+    prompt-cache breakpoint: skills common to every account, then memory
+    (constant for the whole run), then the angle's hook/caption banks,
+    then this account's product and persona files. The last number on each
+    file is its priority (0 = keep whole) when CONTEXT_TOKEN_BUDGET forces
+    lower-priority files to be trimmed or dropped. Blocks are budgeted in
+    that order, so the shared blocks come out the same for every account;
+    CONTEXT_RESERVE keeps room for memory, angle and account files.
+    """
     cfg = ACCOUNTS[account]
     persona = cfg["persona"]
     app = cfg["app"]
 
-    # Traversal order matches pipeline.md specification
-    skills = [
-        ("INDEX.md",                      "Landscape overview"),
-        (f"{app}.md",                     "Product knowledge"),
-        (f"personas/{persona}.md",        "Persona voice"),
-        ("content/content-mix.md",        "Category ratios"),
-        ("content/hook-architecture.md",  "Hook formulas"),
-        ("content/text-overlays.md",      "Text overlay patterns"),
-        ("content/what-never-works.md",   "Anti-patterns"),
-        ("analytics/proven-hooks.md",     "Proven winners"),
+    shared = [
+        ("INDEX.md",                      "Landscape overview", 2),
+        ("content/content-mix.md",        "Category ratios", 2),
+        ("content/hook-architecture.md",  "Hook formulas", 1),
+        ("content/text-overlays.md",      "Text overlay patterns", 1),
+        ("content/what-never-works.md",   "Anti-patterns", 0),
+        ("analytics/proven-hooks.md",     "Proven winners", 1),
     ]
 
     # Angle-specific skill files
     if angle == "fear":
-        skills += [
-            ("content/fear-hooks.md",     "Fear hook bank — draw from these"),
-            ("content/fear-captions.md",  "Fear caption formulas"),
+        angle_skills = [
+            ("content/fear-hooks.md",     "Fear hook bank — draw from these", 1),
+            ("content/fear-captions.md",  "Fear caption formulas", 2),
         ]
     else:
-        skills += [
-            ("content/hook-bank.md",          "Hook bank — draw from these"),
-            ("content/caption-formulas.md",   "Caption structures"),
+        angle_skills = [
+            ("content/hook-bank.md",          "Hook bank — draw from these", 1),
+            ("content/caption-formulas.md",   "Caption structures", 2),
         ]
 
-    parts = []
-    for filepath, label in skills:
-        content = read_skill(filepath)
-        if content:
-            parts.append(f"--- {label} ({filepath}) ---\n{content}")
+    account_skills = [
+        (f"{app}.md",                     "Product knowledge", 0),
+        (f"personas/{persona}.md",        "Persona voice", 0),
+    ]
+
+    for filepath, _, _ in shared + angle_skills + account_skills:
+        if not (SKILLS_DIR / filepath).exists():
+            print(f"  WARN: Skill not found: {SKILLS_DIR / filepath}")
+
+    # Memory files for performance signal
+    memory = [
+        ("post-performance.md", "Performance data — what works and what doesn't", 2),
+        ("failure-log.md", "Failure log — rules that must not be broken", 0),
+        ("revenue-metrics.md", "Revenue metrics — which app converts, what levers matter", 3),
+    ]
 
-    # Load memory files for performance signal
-    for mem_file, label in [
-        ("post-performance.md", "Performance data — what works and what doesn't"),
-        ("failure-log.md", "Failure log — rules that must not be broken"),
-        ("revenue-metrics.md", "Revenue metrics — which app converts, what levers matter"),
-    ]:
-        content = load_memory_file(mem_file)
-        if content:
-            parts.append(f"--- {label} (memory/{mem_file}) ---\n{content}")
+    def skill_sections(skills):
+        return [(SKILLS_DIR / filepath, f"--- {label} ({filepath}) ---", priority)
+                for filepath, label, priority in skills]
 
-    return "\n\n".join(parts)
+    # Cached across accounts: only re-read when a file's mtime changes
+    blocks, report = budget_context([
+        skill_sections(shared),
+        [(MEMORY_DIR / mem_file, f"--- {label} (memory/{mem_file}) ---", priority)
+         for mem_file, label, priority in memory],
+        skill_sections(angle_skills),
+        skill_sections(account_skills),
+    ], reserve=CONTEXT_RESERVE)
+    print(f"  {format_report(report)}")
+    return blocks
 
 
 # ---------------------------------------------------------------------------
@@ -160,12 +180,13 @@ ANGLE_CLIP_DIRS = {
 }
 
 
-def pick_angle(account: str, usage: dict) -> str:
+def pick_angle(account: str) -> str:
     """Weighted random angle selection with streak prevention.
     Never 3 of the same angle in a row for an account.
     """
     # Check recent angles from usage log
-    recent = [e.get("angle", "discovery") for e in usage["entries"] if e["account"] == account][-3:]
+    recent = [r["angle"] or "discovery"
+              for r in asset_usage.recent_runs(source="autopilot", account=account, limit=3)]
 
     # If last 2 were the same, force the other
     if len(recent) >= 2 and len(set(recent[-2:])) == 1:
@@ -194,58 +215,27 @@ def pick_category(forced: str | None = None) -> str:
 
 # ---------------------------------------------------------------------------
 # Asset selection — cycling with memory
+# Usage history lives in services/asset_usage (SQLite); memory/asset-usage.md
+# is regenerated from it after every record() for the LLM context.
 # ---------------------------------------------------------------------------
 
-def load_asset_usage() -> dict:
-    """Load recent asset usage from memory file."""
-    path = MEMORY_DIR / "asset-usage.md"
-    if not path.exists():
-        return {"entries": []}
-
-    entries = []
-    for line in path.read_text().splitlines():
-        if line.startswith("|") and not line.startswith("| Date") and not line.startswith("|---"):
-            parts = [p.strip() for p in line.split("|")[1:-1]]
-            if len(parts) >= 5:
-                entries.append({
-                    "date": parts[0], "account": parts[1],
-                    "hook": parts[2], "reaction": parts[3], "screen_rec": parts[4],
-                })
-    return {"entries": entries}
-
-
-def save_asset_usage(usage: dict):
-    """Save updated asset usage back to memory file."""
-    path = MEMORY_DIR / "asset-usage.md"
-    lines = ["## Recent Asset Usage\n",
-             "| Date | Account | Hook Clip | Reaction Clip | Screen Recording |",
-             "|------|---------|-----------|---------------|-----------------|"]
-    for e in usage["entries"][-30:]:  # keep last 30 entries
-        lines.append(f"| {e['date']} | {e['account']} | {e['hook']} | {e['reaction']} | {e['screen_rec']} |")
-    path.write_text("\n".join(lines) + "\n")
-
-
 def list_assets(persona: str, clip_type: str) -> list[str]:
     """List available clips for a persona. Returns filenames sorted."""
     folder = ASSETS_DIR / persona / clip_type
-    if not folder.exists():
-        return []
-    return sorted([f.name for f in folder.iterdir() if f.suffix in (".mp4", ".mov")])
+    return [f.name for f in catalog_files(folder)]
 
 
 def list_screen_recordings(app: str) -> list[str]:
     """List available screen recordings for a specific app."""
-    folder = ASSETS_DIR / "screen-recordings" / app
-    if not folder.exists():
-        return []
-    return sorted([f.name for f in folder.iterdir() if f.suffix in (".mp4", ".mov")])
+    return [f.name for f in catalog_files(ASSETS_DIR / "screen-recordings" / app)]
 
 
-def pick_clip_pair(persona: str, usage: dict, account: str, angle: str = "discovery") -> tuple[str, str]:
+def pick_clip_pair(persona: str, account: str, angle: str = "discovery") -> tuple[str, str]:
     """Pick a matched hook+reaction pair (same filename = same session).
 
     Returns (hook_filename, reaction_filename). Falls back to independent
     picks only if no matched pairs exist. Uses angle-specific directories.
+    Pairs rotate least-recently-used first for this account.
     """
     dirs = ANGLE_CLIP_DIRS.get(angle, ANGLE_CLIP_DIRS["discovery"])
     hooks = list_assets(persona, dirs["hook"])
@@ -255,7 +245,7 @@ def pick_clip_pair(persona: str, usage: dict, account: str, angle: str = "discov
         return (f"[NO HOOK CLIPS in assets/{persona}/hook/]",
                 f"[NO REACTION CLIPS in assets/{persona}/reaction/]")
     if not reactions:
-        return (random.choice(hooks),
+        return (pick_lru(account, "hook", hooks),
                 f"[NO REACTION CLIPS in assets/{persona}/reaction/]")
 
     # Find filenames that exist in both hook/ and reaction/
@@ -263,26 +253,18 @@ def pick_clip_pair(persona: str, usage: dict, account: str, angle: str = "discov
 
     if not matched:
         # No matching filenames — fall back to independent picks (shouldn't happen)
-        return (random.choice(hooks), random.choice(reactions))
-
-    # Recently used pairs by this account
-    recent = {e["hook"] for e in usage["entries"][-7:] if e["account"] == account}
+        return (pick_lru(account, "hook", hooks), pick_lru(account, "reaction", reactions))
 
-    # Prefer unused pairs
-    unused = [m for m in matched if m not in recent]
-    pick = random.choice(unused) if unused else random.choice(matched)
+    pick = pick_lru(account, "hook", matched)
     return (pick, pick)
 
 
-def pick_screen_recording(app: str, usage: dict, account: str) -> str:
-    """Pick a screen recording for the correct app, not recently used by this account."""
+def pick_screen_recording(app: str, account: str) -> str:
+    """Pick the screen recording for the app this account used least recently."""
     available = list_screen_recordings(app)
     if not available:
         return f"[NO SCREEN RECORDINGS in assets/screen-recordings/{app}/]"
-
-    recent = {e["screen_rec"] for e in usage["entries"][-7:] if e["account"] == account}
-    unused = [a for a in available if a not in recent]
-    return random.choice(unused) if unused else random.choice(available)
+    return pick_lru(account, "screen_rec", available)
 
 
 # ---------------------------------------------------------------------------
@@ -309,7 +291,7 @@ FEAR_RULES = """HARD RULES (fear/loss-aversion angle):
 9. Never repeat the same hook structure used recently on this account."""
 
 
-def generate_content(account: str, category: str, context: str, dedup_hooks: list[str], angle: str = "discovery") -> dict:
+def generate_content(account: str, category: str, context: list[str], dedup_hooks: list[str], angle: str = "discovery") -> dict:
     """Call Anthropic API to generate text overlays + caption."""
     import anthropic
 
@@ -350,14 +332,18 @@ Follow ALL rules from the skill files. The hook must pass the 3-second test.
 Never mention the app name in the POV text or caption.
 First person, authentic voice matching the persona."""
 
+    preamble = ("You are the content engine for a social media marketing pipeline. "
+                "Generate content strictly following the rules in these skill files:")
+    shared, *rest = context
+
     client = anthropic.Anthropic()
     response = client.messages.create(
-        model="claude-sonnet-4-5-20250929",
+        model=MODEL,
         max_tokens=800,
-        system=f"You are the content engine for a social media marketing pipeline. "
-               f"Generate content strictly following the rules in these skill files:\n\n{context}",
+        system=system_blocks(f"{preamble}\n\n{shared}", *rest),
         messages=[{"role": "user", "content": user_prompt}],
     )
+    print(f"  {format_usage(log_usage('autopilot.generate_content', MODEL, response.usage))}")
 
     raw = response.content[0].text.strip()
     # Strip markdown fences if model adds them despite instruction
@@ -460,12 +446,11 @@ def send_email(subject: str, body: str):
 # Video assembly — stitch clips + upload to Google Drive
 # ---------------------------------------------------------------------------
 
-def assemble_reel(account: str, content: dict, assets: dict,
-                  dry_run: bool = False, no_upload: bool = False,
-                  no_reaction: bool = False, angle: str = "discovery") -> str | None:
-    """Assemble the final reel via assemble_video.py and optionally upload to Drive.
+def plan_reel(account: str, content: dict, assets: dict,
+              no_reaction: bool = False, angle: str = "discovery") -> dict | None:
+    """Resolve one account's reel into an assemble_video.py manifest entry.
 
-    Returns the reel file path on success, or None on failure.
+    Returns None (after printing why) if a required clip is missing.
     """
     cfg = ACCOUNTS[account]
     persona = cfg["persona"]
@@ -492,72 +477,167 @@ def assemble_reel(account: str, content: dict, assets: dict,
     VIDEO_OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
     output_path = VIDEO_OUTPUT_DIR / f"reel_{ts}_{account}.mp4"
 
-    # Build command
-    cmd = [
-        sys.executable, str(SCRIPTS_DIR / "assemble_video.py"),
-        "--hook-clip", str(hook_path),
-        "--screen-recording", str(screen_path),
-        "--hook-text", content["pov_text"],
-        "--output", str(output_path),
-    ]
+    entry = {
+        "hook_clip": str(hook_path),
+        "hook_text": content["pov_text"],
+        "screen_recording": str(screen_path),
+        "output": str(output_path),
+    }
     if not no_reaction:
-        cmd += ["--reaction-clip", str(reaction_path),
-                "--reaction-text", content["reaction_text"]]
-    if no_upload:
-        cmd.append("--no-upload")
-    if dry_run:
-        cmd.append("--dry-run")
+        entry["reaction_clip"] = str(reaction_path)
+        entry["reaction_text"] = content["reaction_text"]
+    return entry
 
-    print(f"  Assembling reel...")
+
+def _run_assembler(cmd: list[str], timeout: int) -> list[str] | None:
+    """Run assemble_video.py, streaming its output. Returns stdout lines, or None on failure."""
     try:
-        result = subprocess.run(
+        # Stream assembly output as it happens so ffmpeg progress lines reach
+        # the dashboard while the encode is still running
+        proc = subprocess.Popen(
             cmd,
             cwd=str(PROJECT_ROOT),
-            capture_output=True,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT,
             text=True,
-            timeout=300,  # 5 minute timeout for ffmpeg
         )
-        # Print assembly output
-        for line in result.stdout.splitlines():
-            print(f"    {line}")
-        if result.stderr:
-            for line in result.stderr.splitlines():
-                print(f"    ERR: {line}")
-
-        if result.returncode != 0:
-            print(f"  ASSEMBLY FAILED (exit code {result.returncode})")
+        timer = threading.Timer(timeout, proc.kill)
+        timer.start()
+        stdout_lines = []
+        try:
+            for line in proc.stdout:
+                line = line.rstrip("\n")
+                if line.startswith(PROGRESS_MARKER):
+                    print(line, flush=True)
+                    continue
+                stdout_lines.append(line)
+                print(f"    {line}", flush=True)
+            proc.wait()
+        finally:
+            timed_out = not timer.is_alive() and proc.returncode != 0
+            timer.cancel()
+
+        if timed_out:
+            raise subprocess.TimeoutExpired(cmd, timeout)
+
+        if proc.returncode != 0:
+            print(f"  ASSEMBLY FAILED (exit code {proc.returncode})")
             return None
-
-        # Parse output for reel path
-        for line in result.stdout.splitlines():
-            if "Reel assembled:" in line:
-                # Line format: "✅ Reel assembled: /path/to/reel.mp4 (X.X MB)"
-                path_part = line.split("Reel assembled:")[1].strip()
-                reel_path = path_part.split("(")[0].strip()
-                print(f"  Reel: {reel_path}")
-                return reel_path
-
-        # If dry run, no "Reel assembled" line — return the intended output path
-        if dry_run:
-            print(f"  [DRY RUN] Would assemble: {output_path}")
-            return str(output_path)
-
-        # Fallback: check if output file exists
-        if output_path.exists():
-            print(f"  Reel: {output_path}")
-            return str(output_path)
-
-        print("  ASSEMBLY WARNING: No reel path found in output")
-        return None
+        return stdout_lines
 
     except subprocess.TimeoutExpired:
-        print("  ASSEMBLY FAILED: Timed out after 5 minutes")
+        print(f"  ASSEMBLY FAILED: Timed out after {timeout // 60} minutes")
         return None
     except Exception as e:
         print(f"  ASSEMBLY ERROR: {e}")
         return None
 
 
+def _assembled_paths(stdout_lines: list[str]) -> list[str]:
+    """Pull reel paths out of assemble_video.py output."""
+    paths = []
+    for line in stdout_lines:
+        if "Reel assembled:" in line:
+            # Line format: "✅ Reel assembled: /path/to/reel.mp4 (X.X MB)"
+            path_part = line.split("Reel assembled:")[1].strip()
+            paths.append(path_part.split("(")[0].strip())
+    return paths
+
+
+def assemble_reel(account: str, content: dict, assets: dict,
+                  dry_run: bool = False, no_upload: bool = False,
+                  no_reaction: bool = False, angle: str = "discovery") -> str | None:
+    """Assemble the final reel via assemble_video.py and optionally upload to Drive.
+
+    Returns the reel file path on success, or None on failure.
+    """
+    entry = plan_reel(account, content, assets, no_reaction=no_reaction, angle=angle)
+    if entry is None:
+        return None
+    output_path = Path(entry["output"])
+
+    # Build command
+    cmd = [
+        sys.executable, str(SCRIPTS_DIR / "assemble_video.py"),
+        "--hook-clip", entry["hook_clip"],
+        "--screen-recording", entry["screen_recording"],
+        "--hook-text", entry["hook_text"],
+        "--output", entry["output"],
+    ]
+    if not no_reaction:
+        cmd += ["--reaction-clip", entry["reaction_clip"],
+                "--reaction-text", entry["reaction_text"]]
+    if no_upload:
+        cmd.append("--no-upload")
+    if dry_run:
+        cmd.append("--dry-run")
+
+    print(f"  Assembling reel...")
+    stdout_lines = _run_assembler(cmd, timeout=300)  # 5 minute timeout for ffmpeg
+    if stdout_lines is None:
+        return None
+
+    for reel_path in _assembled_paths(stdout_lines):
+        print(f"  Reel: {reel_path}")
+        return reel_path
+
+    # If dry run, no "Reel assembled" line — return the intended output path
+    if dry_run:
+        print(f"  [DRY RUN] Would assemble: {output_path}")
+        return str(output_path)
+
+    # Fallback: check if output file exists
+    if output_path.exists():
+        print(f"  Reel: {output_path}")
+        return str(output_path)
+
+    print("  ASSEMBLY WARNING: No reel path found in output")
+    return None
+
+
+def assemble_batch(plans: list[dict], dry_run: bool = False,
+                   no_upload: bool = False) -> dict[str, str | None]:
+    """Assemble every planned reel in one assemble_video.py --batch run.
+
+    Reels that share a screen recording (or any other clip) decode it once.
+    Returns {account: reel_path or None}.
+    """
+    entries = {}
+    for plan in plans:
+        entry = plan_reel(plan["account"], plan["content"], plan["assets"],
+                          no_reaction=plan["no_reaction"], angle=plan["angle"])
+        if entry is not None:
+            entries[plan["account"]] = entry
+
+    results = {plan["account"]: None for plan in plans}
+    if not entries:
+        return results
+
+    manifest_path = VIDEO_OUTPUT_DIR / f"batch_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+    manifest_path.write_text(json.dumps({"reels": list(entries.values())}, indent=2))
+
+    cmd = [sys.executable, str(SCRIPTS_DIR / "assemble_video.py"), "--batch", str(manifest_path)]
+    if no_upload:
+        cmd.append("--no-upload")
+    if dry_run:
+        cmd.append("--dry-run")
+
+    print(f"\n  Assembling {len(entries)} reel(s) in one batch...")
+    try:
+        stdout_lines = _run_assembler(cmd, timeout=300 * len(entries))
+    finally:
+        manifest_path.unlink(missing_ok=True)
+    if stdout_lines is None:
+        return results
+
+    assembled = set(_assembled_paths(stdout_lines))
+    for account, entry in entries.items():
+        if entry["output"] in assembled or (dry_run and not assembled):
+            results[account] = entry["output"]
+            print(f"  Reel ({account}): {entry['output']}")
+    return results
+
+
 # ---------------------------------------------------------------------------
 # Format email body — what you see on your phone
 # ---------------------------------------------------------------------------
@@ -625,19 +705,23 @@ def run_account(account: str, category_override: str | None = None,
                 no_upload: bool = False, no_reaction: bool = False,
                 text_override: dict | None = None,
                 clip_override: dict | None = None,
-                angle_override: str | None = None):
-    """Generate content for one account."""
+                angle_override: str | None = None,
+                defer_assembly: bool = False) -> dict | None:
+    """Generate content for one account.
+
+    With defer_assembly, stops before rendering and returns the reel plan so
+    the caller can assemble every account's reel in one batch.
+    """
     cfg = ACCOUNTS[account]
     print(f"\n{'='*60}")
     print(f"Generating for {cfg['handle']} ({cfg['persona']}, {cfg['app']})")
     print(f"{'='*60}")
 
     # 0. Pick content angle
-    usage_for_angle = load_asset_usage()
     if angle_override and angle_override in ANGLE_WEIGHTS:
         angle = angle_override
     else:
-        angle = pick_angle(account, usage_for_angle)
+        angle = pick_angle(account)
     print(f"  Angle: {angle}")
 
     # 1. Pick category
@@ -654,7 +738,7 @@ def run_account(account: str, category_override: str | None = None,
 
         client = anthropic.Anthropic()
         caption_resp = client.messages.create(
-            model="claude-sonnet-4-5-20250929",
+            model=MODEL,
             max_tokens=300,
             system="You write Instagram/TikTok captions for screen time wellness apps. "
                    "Never mention the app by name. Keep it authentic, first-person, casual.",
@@ -667,6 +751,7 @@ def run_account(account: str, category_override: str | None = None,
                 f'{{"caption": "the caption text", "hashtags": "#tag1 #tag2 #tag3 #tag4 #tag5"}}'
             )}],
         )
+        log_usage("autopilot.caption", MODEL, caption_resp.usage)
         try:
             caption_data = json.loads(caption_resp.content[0].text.strip())
         except (json.JSONDecodeError, IndexError):
@@ -727,38 +812,39 @@ def run_account(account: str, category_override: str | None = None,
 
     # 5. Select assets — use override or cycle
     print("  Selecting assets...")
-    usage = load_asset_usage()
     if clip_override:
         hook_clip, reaction_clip = clip_override["hook"], clip_override["reaction"]
     else:
-        hook_clip, reaction_clip = pick_clip_pair(cfg["persona"], usage, account, angle=angle)
+        hook_clip, reaction_clip = pick_clip_pair(cfg["persona"], account, angle=angle)
     assets = {
         "hook": hook_clip,
         "reaction": reaction_clip,
-        "screen_rec": pick_screen_recording(cfg["app"], usage, account),
+        "screen_rec": pick_screen_recording(cfg["app"], account),
     }
     print(f"  Hook: {assets['hook']}, Reaction: {assets['reaction']}, Screen: {assets['screen_rec']}")
 
     # 6. Record asset usage
-    usage["entries"].append({
-        "date": date.today().isoformat(),
-        "account": account,
-        "hook": assets["hook"],
-        "reaction": assets["reaction"],
-        "screen_rec": assets["screen_rec"],
-        "angle": angle,
-    })
-    save_asset_usage(usage)
+    asset_usage.record("autopilot", assets, account=account, persona=cfg["persona"], angle=angle)
 
     # 7. Save output for dedup
     save_output(account, {"category": category, "content": content, "assets": assets})
 
+    if defer_assembly:
+        return {"account": account, "category": category, "content": content,
+                "assets": assets, "angle": angle, "no_reaction": no_reaction}
+
     # 8. Assemble reel
     reel_path = assemble_reel(account, content, assets,
                               dry_run=dry_run, no_upload=no_upload,
                               no_reaction=no_reaction, angle=angle)
 
     # 9. Deliver
+    deliver(account, category, content, assets, reel_path, dry_run=dry_run)
+
+
+def deliver(account: str, category: str, content: dict, assets: dict,
+            reel_path: str | None, dry_run: bool = False):
+    """Email the day's content (or print it on a dry run)."""
     subject, body = format_email(account, category, content, assets,
                                  reel_path=reel_path)
 
@@ -796,6 +882,9 @@ def main():
                         help="Override reaction clip filename (skip cycling)")
     parser.add_argument("--angle", choices=["discovery", "fear"],
                         help="Force content angle (default: weighted random 70/30)")
+    parser.add_argument("--batch", action="store_true",
+                        help="Plan every account first, then render all reels in one pass "
+                             "(shared clips are decoded once)")
     args = parser.parse_args()
 
     accounts = [args.account] if args.account else list(ACCOUNTS.keys())
@@ -811,10 +900,21 @@ def main():
     if args.hook_clip:
         clip_override = {"hook": args.hook_clip, "reaction": args.reaction_clip or args.hook_clip}
 
+    batch = args.batch and not args.idea_only
+    plans = []
     for account in accounts:
-        run_account(account, args.category, args.dry_run, args.idea_only,
-                    args.no_upload, args.no_reaction, text_override=text_override,
-                    clip_override=clip_override, angle_override=args.angle)
+        plan = run_account(account, args.category, args.dry_run, args.idea_only,
+                           args.no_upload, args.no_reaction, text_override=text_override,
+                           clip_override=clip_override, angle_override=args.angle,
+                           defer_assembly=batch)
+        if plan:
+            plans.append(plan)
+
+    if plans:
+        reel_paths = assemble_batch(plans, dry_run=args.dry_run, no_upload=args.no_upload)
+        for plan in plans:
+            deliver(plan["account"], plan["category"], plan["content"], plan["assets"],
+                    reel_paths[plan["account"]], dry_run=args.dry_run)
 
     print(f"\nAll done. {len(accounts)} account(s) processed.")
 
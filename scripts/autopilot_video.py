@@ -52,6 +52,17 @@ LOGS_DIR = BASE_DIR / "logs"
 CLIPS_DIR = BASE_DIR / "assets"
 REF_IMAGES_DIR = BASE_DIR / "assets" / "reference-images"
 SCREEN_REC_BASE = BASE_DIR / "assets" / "screen-recordings"
+# Paid generations whose split failed are kept here instead of being lost
+GENERATED_DIR = BASE_DIR / "video_output" / ".generated"
+CLIP_COST = 0.60  # 1 video clip (4s)
+
+# Shared ffmpeg helpers live in the dashboard backend
+sys.path.insert(0, str(BASE_DIR / "dashboard" / "backend"))
+from services import asset_catalog, asset_usage, thumbnails
+from services.asset_rotation import pick_lru
+from services.context_compiler import budget_context, format_report
+from services.ffmpeg_slots import run_ffmpeg as run_slotted
+from services.prompt_cache import format_usage, log_usage, messages_url, system_blocks
 
 ANTHROPIC_API_KEY = os.environ.get("ANTHROPIC_API_KEY", "")
 ANTHROPIC_MODEL = "claude-sonnet-4-5-20250929"
@@ -63,6 +74,15 @@ NOTIFY_EMAILS = (os.environ.get("NOTIFY_EMAILS") or os.environ.get("DELIVERY_EMA
 
 MEMORY_FILES = ["post-performance.md", "failure-log.md", "asset-usage.md", "x-trends.md"]
 
+# Context is a short supplement to the inline rules: keep it near the old 6000-char cut
+CONTEXT_BUDGET_TOKENS = 1500
+# Trim/drop order under the budget (0 = keep whole; unlisted files get 2)
+CONTEXT_PRIORITY = {
+    "failure-log.md": 0, "content/what-never-works.md": 0,
+    "content/hook-architecture.md": 1, "content/text-overlays.md": 1, "analytics/proven-hooks.md": 1,
+    "asset-usage.md": 3, "x-trends.md": 3,
+}
+
 
 def get_skill_files_for_persona(persona: str, app: str) -> list[str]:
     """Return graph-based skill files for a persona + app combination."""
@@ -329,37 +349,57 @@ def generate_video(image_url, video_prompt, engine="veo"):
     return url
 
 
-def download_file(url, output_path):
-    """Download a file from URL."""
-    resp = requests.get(url, stream=True, timeout=120)
-    resp.raise_for_status()
-    with open(output_path, "wb") as f:
-        for chunk in resp.iter_content(8192):
-            f.write(chunk)
-    size_mb = output_path.stat().st_size / (1024 * 1024)
-    log.info(f"  Downloaded: {output_path.name} ({size_mb:.1f} MB)")
-    return output_path
-
-
-def trim_clip(input_path, duration_seconds):
-    """Trim a clip to the first N seconds using ffmpeg."""
-    trimmed_path = input_path.with_stem(input_path.stem + "_trimmed")
-    result = subprocess.run(
-        [
-            "ffmpeg", "-y", "-i", str(input_path),
-            "-t", str(duration_seconds),
-            "-c:v", "libx264", "-preset", "fast", "-crf", "18", "-an",
-            str(trimmed_path),
-        ],
-        capture_output=True, text=True,
-    )
-    if result.returncode == 0 and trimmed_path.exists():
-        log.info(f"  Trimmed to {duration_seconds}s: {trimmed_path.name}")
-        input_path.unlink()
-        trimmed_path.rename(input_path)
-        return input_path
-    log.warning(f"  Trim failed, keeping original")
-    return input_path
+def split_clips(source, splits, hook_path, reaction_path=None):
+    """Cut hook (+ optional reaction) from a source clip in a single ffmpeg pass.
+
+    The source is decoded once and fanned out with split/trim, so both outputs
+    share one decode. `source` may be a URL — ffmpeg reads it over HTTP
+    directly (with range requests, so MP4s with a trailing moov atom still
+    work) and the raw file never touches disk.
+    """
+    hook_split = splits["hook"]
+    react_split = splits["reaction"] if reaction_path is not None else None
+
+    def _trim(split):
+        return (f"trim=start={split['start']}:duration={split['duration']},"
+                f"setpts=PTS-STARTPTS")
+
+    if react_split is not None:
+        graph = (f"[0:v]split=2[h][r];"
+                 f"[h]{_trim(hook_split)}[hook];"
+                 f"[r]{_trim(react_split)}[react]")
+    else:
+        graph = f"[0:v]{_trim(hook_split)}[hook]"
+
+    encode = ["-c:v", "libx264", "-preset", "fast", "-crf", "18", "-an"]
+    cmd = ["ffmpeg", "-y", "-hide_banner", "-loglevel", "warning"]
+    if str(source).startswith(("http://", "https://")):
+        cmd += ["-reconnect", "1", "-reconnect_streamed", "1", "-reconnect_delay_max", "5"]
+    cmd += ["-i", str(source), "-filter_complex", graph,
+            "-map", "[hook]", *encode, str(hook_path)]
+    if react_split is not None:
+        cmd += ["-map", "[react]", *encode, str(reaction_path)]
+
+    result = run_slotted(cmd, "clip split", timeout=300)
+    if result.returncode != 0:
+        # Never leave half-written clips in the asset library
+        hook_path.unlink(missing_ok=True)
+        if reaction_path is not None:
+            reaction_path.unlink(missing_ok=True)
+        raise RuntimeError(f"ffmpeg clip split failed: {result.stderr[-500:]}")
+
+
+def download_source(url, dest):
+    """Save a generated clip locally (atomic, so a partial download never looks complete)."""
+    dest.parent.mkdir(parents=True, exist_ok=True)
+    tmp = dest.with_suffix(".part")
+    with requests.get(url, stream=True, timeout=120) as resp:
+        resp.raise_for_status()
+        with open(tmp, "wb") as f:
+            for chunk in resp.iter_content(1024 * 1024):
+                f.write(chunk)
+    os.replace(tmp, dest)
+    return dest
 
 
 def get_clip_split_points(video_type):
@@ -399,37 +439,31 @@ def generate_clips(persona_name, video_type="original", ref_image=None, engine="
     log.info(f"--- Generating clip (engine={engine}, type={video_type}) ---")
     video_prompt = build_video_prompt(video_type)
     video_url = generate_video(image_url, video_prompt, engine=engine)
-    raw_path = hook_dir / f"{ts}_raw.mp4"
-    download_file(video_url, raw_path)
+    record_spend(CLIP_COST)  # paid now, whatever happens to the split
 
     splits = get_clip_split_points(video_type)
-
-    # Hook clip
-    hook_split = splits["hook"]
     hook_path = hook_dir / f"{ts}.mp4"
-    hook_cmd = ["ffmpeg", "-y"]
-    if hook_split["start"] > 0:
-        hook_cmd += ["-ss", str(hook_split["start"])]
-    hook_cmd += ["-i", str(raw_path), "-t", str(hook_split["duration"]),
-                 "-c:v", "libx264", "-preset", "fast", "-crf", "18", "-an", str(hook_path)]
-    subprocess.run(hook_cmd, capture_output=True)
-    log.info(f"  Hook clip: {hook_path.name} ({hook_split['duration']}s)")
-
-    # Reaction clip (optional — None for hook-only formats)
-    react_split = splits["reaction"]
-    reaction_path = None
-    if react_split is not None:
-        reaction_path = reaction_dir / f"{ts}.mp4"
-        react_cmd = ["ffmpeg", "-y"]
-        if react_split["start"] > 0:
-            react_cmd += ["-ss", str(react_split["start"])]
-        react_cmd += ["-i", str(raw_path), "-t", str(react_split["duration"]),
-                      "-c:v", "libx264", "-preset", "fast", "-crf", "18", "-an", str(reaction_path)]
-        subprocess.run(react_cmd, capture_output=True)
-        log.info(f"  Reaction clip: {reaction_path.name} ({react_split['duration']}s)")
-
-    # Clean up raw
-    raw_path.unlink(missing_ok=True)
+    reaction_path = reaction_dir / f"{ts}.mp4" if splits["reaction"] is not None else None
+
+    # 3. Stream the Replicate output straight into one ffmpeg decode → hook + reaction
+    try:
+        split_clips(video_url, splits, hook_path, reaction_path)
+    except RuntimeError as e:
+        # Don't lose a paid clip to a streaming hiccup: keep the source locally and retry
+        log.warning(f"  {e} — downloading the generated clip and retrying")
+        source = download_source(video_url, GENERATED_DIR / f"{persona_name}_{ts}.mp4")
+        try:
+            split_clips(source, splits, hook_path, reaction_path)
+        except RuntimeError as e:
+            raise RuntimeError(f"{e} — generated clip kept at {source}") from e
+        source.unlink()
+    for clip in (hook_path, reaction_path):
+        if clip:
+            asset_catalog.index_file(clip)
+            thumbnails.submit(clip.relative_to(CLIPS_DIR).as_posix())
+    log.info(f"  Hook clip: {hook_path.name} ({splits['hook']['duration']}s)")
+    if reaction_path:
+        log.info(f"  Reaction clip: {reaction_path.name} ({splits['reaction']['duration']}s)")
 
     if reaction_path:
         log.info(f"Clips saved: {hook_path.name}, {reaction_path.name}")
@@ -441,22 +475,17 @@ def generate_clips(persona_name, video_type="original", ref_image=None, engine="
 # ─── Asset helpers ───────────────────────────────────
 
 def find_clips(directory, extensions=(".mp4", ".mov")):
-    """Find all video clips in a directory."""
-    if not directory.exists():
-        return []
-    return sorted(
-        f for f in directory.iterdir()
-        if f.is_file() and f.suffix.lower() in extensions and not f.name.startswith(".")
-    )
+    """Find all video clips in a directory (via the asset catalog)."""
+    return asset_catalog.list_files(directory, extensions)
 
 
-def pick_screen_recording(screen_rec_dir):
-    """Randomly select a screen recording from the given directory."""
+def pick_screen_recording(screen_rec_dir, persona_name):
+    """Select the screen recording this persona used least recently."""
     rec_dir = SCREEN_REC_BASE / screen_rec_dir
     recs = find_clips(rec_dir)
     if not recs:
         raise FileNotFoundError(f"No screen recordings in {rec_dir}")
-    choice = random.choice(recs)
+    choice = rec_dir / pick_lru(persona_name, "screen_rec", [r.name for r in recs])
     log.info(f"Screen rec: {choice.name}")
     return choice
 
@@ -464,19 +493,15 @@ def pick_screen_recording(screen_rec_dir):
 # ─── Context loading ─────────────────────────────────
 
 def load_context(persona: str = "sanya", app: str = "manifest-lock"):
-    """Load skill + memory files as context for Claude."""
-    parts = []
-    for name in get_skill_files_for_persona(persona, app):
-        path = SKILLS_DIR / name
-        if path.exists():
-            parts.append(f"=== SKILL: {name} ===\n{path.read_text()}")
-    for name in MEMORY_FILES:
-        path = MEMORY_DIR / name
-        if path.exists():
-            content = path.read_text().strip()
-            if content:
-                parts.append(f"=== MEMORY: {name} ===\n{content}")
-    return "\n\n".join(parts)
+    """Load skill + memory files as context for Claude, within CONTEXT_BUDGET_TOKENS."""
+    priority = {**CONTEXT_PRIORITY, f"{app}.md": 0, f"personas/{persona}.md": 0}
+    (context,), report = budget_context([
+        [(SKILLS_DIR / name, f"=== SKILL: {name} ===", priority.get(name, 2))
+         for name in get_skill_files_for_persona(persona, app)]
+        + [(MEMORY_DIR / name, f"=== MEMORY: {name} ===", priority.get(name, 2)) for name in MEMORY_FILES]
+    ], CONTEXT_BUDGET_TOKENS)
+    log.info(format_report(report))
+    return context
 
 
 # ─── Text generation via Claude ──────────────────────
@@ -524,14 +549,11 @@ Persona: {persona_name}
 Today: {datetime.now().strftime('%A %B %d')}
 Seed: {random.randint(1000, 9999)}
 
-Context:
-{context[:6000]}
-
 Generate fresh, non-repetitive content. Avoid hooks from memory files."""
 
     log.info("Generating text via Claude API...")
     resp = requests.post(
-        "https://api.anthropic.com/v1/messages",
+        messages_url(),
         headers={
             "x-api-key": ANTHROPIC_API_KEY,
             "anthropic-version": "2023-06-01",
@@ -540,14 +562,17 @@ Generate fresh, non-repetitive content. Avoid hooks from memory files."""
         json={
             "model": ANTHROPIC_MODEL,
             "max_tokens": 1024,
-            "system": system,
+            # Format rules, then the skill/memory context: both stable, both cached
+            "system": system_blocks(system, f"Context:\n{context}"),
             "messages": [{"role": "user", "content": user_msg}],
         },
         timeout=30,
     )
     resp.raise_for_status()
+    data = resp.json()
+    log.info(format_usage(log_usage("autopilot_video.generate_text", ANTHROPIC_MODEL, data.get("usage"))))
 
-    raw = resp.json()["content"][0]["text"].strip()
+    raw = data["content"][0]["text"].strip()
     if raw.startswith("```"):
         raw = raw.split("\n", 1)[1]
     if raw.endswith("```"):
@@ -587,7 +612,11 @@ Generate fresh, non-repetitive content. Avoid hooks from memory files."""
 # ─── Video assembly ──────────────────────────────────
 
 def assemble_video(hook_clip, screen_rec, reaction_clip, text, no_upload=False, persona_name=None, video_type=None):
-    """Call assemble_video.py to stitch the final reel."""
+    """Call assemble_video.py to stitch the final reel.
+
+    Returns (reel_path, cache_hit) — cache_hit is True when assemble_video.py
+    reused an identical earlier render.
+    """
     ts = datetime.now().strftime("%Y%m%d_%H%M%S")
     parts = ["reel"]
     if persona_name:
@@ -623,13 +652,13 @@ def assemble_video(hook_clip, screen_rec, reaction_clip, text, no_upload=False,
 
     for line in result.stdout.split("\n"):
         if "Reel assembled:" in line:
-            return Path(line.split("Reel assembled:")[1].strip().split(" ")[0])
-    return None
+            return Path(line.split("Reel assembled:")[1].strip().split(" ")[0]), "cache hit" in line
+    return None, False
 
 
 # ─── Logging + Email ─────────────────────────────────
 
-def save_log(persona, text, reel_path, cost, video_type="original"):
+def save_log(persona, text, reel_path, cost, video_type="original", cache_hit=False):
     """Append run to JSONL log."""
     LOGS_DIR.mkdir(exist_ok=True)
     entry = {
@@ -642,31 +671,19 @@ def save_log(persona, text, reel_path, cost, video_type="original"):
         "content_angle": text.get("content_angle", ""),
         "reel_path": str(reel_path) if reel_path else None,
         "cost_usd": cost,
+        "render_cache": "hit" if cache_hit else "miss",
     }
     with open(LOGS_DIR / "video_autopilot.jsonl", "a") as f:
         f.write(json.dumps(entry) + "\n")
 
 
 def update_asset_usage(persona, ref_image_name, screen_rec_name, app_name, video_type="original"):
-    """Append an entry to memory/asset-usage.md for tracking."""
-    path = MEMORY_DIR / "asset-usage.md"
-    today = datetime.now().strftime("%Y-%m-%d")
-    entry = f"| {today} | {persona} | {ref_image_name} | {screen_rec_name} | {app_name} | {video_type} |"
-
-    if path.exists():
-        content = path.read_text()
-        # Append entry before the end of the file
-        content = content.rstrip() + "\n" + entry + "\n"
-        path.write_text(content)
-    else:
-        header = (
-            "# Asset Usage Tracker\n\n"
-            "## Recent Asset Usage\n\n"
-            "| Date | Persona | Reference Image | Screen Recording | App | Video Type |\n"
-            "|------|---------|-----------------|-----------------|-----|------------|\n"
-            + entry + "\n"
-        )
-        path.write_text(header)
+    """Record the run's assets in the usage log (regenerates memory/asset-usage.md)."""
+    asset_usage.record(
+        "autopilot_video",
+        {"ref_image": ref_image_name, "screen_rec": screen_rec_name},
+        persona=persona, app=app_name, video_type=video_type,
+    )
 
 
 def send_notification(subject, body):
@@ -732,7 +749,7 @@ def _run_persona_for_app(persona_name, app_name, screen_rec_dir, dry_run=False,
 
         # 1. Pick screen recording for this app
         log.info(f"Persona: {persona_name} ({app_name})")
-        screen_rec = pick_screen_recording(screen_rec_dir)
+        screen_rec = pick_screen_recording(screen_rec_dir, persona_name)
 
         # 1b. Preview reference image selection (for logging)
         ref_image = pick_reference_image(persona_name, video_type)
@@ -783,15 +800,17 @@ def _run_persona_for_app(persona_name, app_name, screen_rec_dir, dry_run=False,
             else:
                 log.info(f"Using existing: {hook_clip.name} (hook only)")
         else:
+            record_spend(cost)  # text generation; generate_clips records the clip once it's paid for
             hook_clip, reaction_clip = generate_clips(persona_name, video_type, ref_image=ref_image, engine=engine)
-            cost += 0.60  # 1 video clip (4s)
-            record_spend(cost)
+            cost += CLIP_COST
 
         # 4. Assemble
-        reel_path = assemble_video(hook_clip, screen_rec, reaction_clip, text, no_upload=no_upload, persona_name=persona_name, video_type=video_type)
+        reel_path, cache_hit = assemble_video(hook_clip, screen_rec, reaction_clip, text, no_upload=no_upload, persona_name=persona_name, video_type=video_type)
+        if cache_hit:
+            log.info("Render cache hit — reused an identical earlier reel")
 
         # 5. Log + notify
-        save_log(persona_name, text, reel_path, cost, video_type)
+        save_log(persona_name, text, reel_path, cost, video_type, cache_hit=cache_hit)
         update_asset_usage(persona_name, ref_image.name, screen_rec.name, app_name, video_type)
         elapsed = (datetime.now() - start_time).total_seconds()
 
@@ -19,6 +19,9 @@ SCRIPTS_DIR = PROJECT_ROOT / "scripts"
 VENV_PYTHON = PROJECT_ROOT / ".venv" / "bin" / "python3"
 ENV_FILE = PROJECT_ROOT / ".env"
 
+sys.path.insert(0, str(PROJECT_ROOT / "dashboard" / "backend"))
+from config import UPLOAD_SPOOL_DIR
+
 
 def _load_dotenv() -> dict[str, str]:
     """Load .env file into os.environ and return the full env dict."""
@@ -84,6 +87,16 @@ def fire(cmd: list[str], label: str, env: dict[str, str]) -> None:
     )
 
 
+def uploads_pending() -> bool:
+    for f in UPLOAD_SPOOL_DIR.glob("*.json"):
+        try:
+            if json.loads(f.read_text()).get("status") == "pending":
+                return True
+        except (ValueError, OSError):
+            pass
+    return False
+
+
 def cleanup_old_locks(max_age_days: int = 7) -> None:
     cutoff = now - timedelta(days=max_age_days)
     for f in LOCK_DIR.glob(".dispatch_*.lock"):
@@ -138,6 +151,11 @@ def main() -> None:
         acquire_lock(key)
         fire([python, autopilot, "--account", account], account, env)
 
+    # Backstop for the Drive upload queue: renders start the worker themselves,
+    # this picks up retries after a crash or reboot (the worker is single-instance)
+    if uploads_pending():
+        fire([python, str(SCRIPTS_DIR / "upload_worker.py")], "upload_worker", env)
+
     cleanup_old_locks()
 
 
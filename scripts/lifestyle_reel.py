@@ -9,17 +9,16 @@ Usage:
     python3 scripts/lifestyle_reel.py                    # Full run
     python3 scripts/lifestyle_reel.py --dry-run          # Text only, no video
     python3 scripts/lifestyle_reel.py --no-upload        # Skip Google Drive upload
+    python3 scripts/lifestyle_reel.py --warm-cache       # Pre-render Ken Burns clips for all images
     python3 scripts/lifestyle_reel.py --scene-1-text "..." --scene-2-text "..." --scene-3-text "..."
 """
 
 import argparse
+import hashlib
 import json
-import os
 import random
-import subprocess
 import sys
-import tempfile
-from datetime import datetime, date
+from datetime import datetime
 from pathlib import Path
 
 # ─── Config ──────────────────────────────────────────
@@ -28,6 +27,21 @@ PROJECT_ROOT = Path(__file__).resolve().parent.parent
 
 from dotenv import load_dotenv
 load_dotenv(PROJECT_ROOT / ".env", override=True)
+
+# Shared ffmpeg helpers live in the dashboard backend
+sys.path.insert(0, str(PROJECT_ROOT / "dashboard" / "backend"))
+from services.ffmpeg_progress import (
+    format_progress_line, progress_enabled, run_ffmpeg_with_progress,
+)
+from services import asset_usage
+from services.asset_catalog import IMAGE_EXTS, list_files as catalog_files
+from services.asset_rotation import pick_lru
+from services.context_compiler import budget_context, format_report
+from services.ffmpeg_slots import run_ffmpeg as run_slotted
+from services.preview_proxy import master_output_args, preview_output_args
+from services.prompt_cache import format_usage, log_usage, system_blocks
+from services.scratch import estimate_mb, intermediate_path, scratch_dir
+from services.upload_queue import enqueue as enqueue_upload
 SKILLS_DIR = PROJECT_ROOT / "skills"
 MEMORY_DIR = PROJECT_ROOT / "memory"
 ASSETS_DIR = PROJECT_ROOT / "assets"
@@ -44,6 +58,11 @@ BITRATE = "8000k"
 SCENE_1_DURATION = 3.0
 SCENE_2_DURATION = 3.0
 SCENE_3_MAX_DURATION = 12
+MODEL = "claude-sonnet-4-6"
+MEMORY_CONTEXT_RESERVE = 1500  # context tokens held back for memory files
+
+# Pre-scaled images + text-free Ken Burns clips, keyed by source image stat
+CACHE_DIR = OUTPUT_DIR / ".cache" / "lifestyle"
 
 # ─── Font resolution ─────────────────────────────────
 
@@ -105,18 +124,12 @@ def wrap_text(text, max_chars=28):
 def list_images(scene: str) -> list[Path]:
     """List available lifestyle images for a scene (scene-1 or scene-2)."""
     prefix = f"{scene}-v"
-    return sorted([
-        f for f in LIFESTYLE_IMAGES_DIR.iterdir()
-        if f.name.startswith(prefix) and f.suffix in (".png", ".jpg", ".jpeg")
-    ])
+    return [f for f in catalog_files(LIFESTYLE_IMAGES_DIR, IMAGE_EXTS) if f.name.startswith(prefix)]
 
 
 def list_screen_recordings() -> list[Path]:
     """List available screen recordings."""
-    return sorted([
-        f for f in SCREEN_RECORDINGS_DIR.iterdir()
-        if f.suffix in (".mp4", ".mov")
-    ])
+    return catalog_files(SCREEN_RECORDINGS_DIR)
 
 
 def load_lifestyle_usage() -> list[dict]:
@@ -134,52 +147,43 @@ def load_lifestyle_usage() -> list[dict]:
     return entries
 
 
-def pick_image(scene: str, recent_entries: list[dict]) -> Path:
-    """Pick an image not recently used."""
+def pick_image(scene: str) -> Path:
+    """Pick the least recently used image for a scene."""
     available = list_images(scene)
     if not available:
         print(f"ERROR: No {scene} images in {LIFESTYLE_IMAGES_DIR}")
         sys.exit(1)
 
-    key = f"{scene.replace('-', '_')}_image"
-    recent_used = {e.get(key, "") for e in recent_entries[-7:]}
-    unused = [img for img in available if img.name not in recent_used]
-    return random.choice(unused) if unused else random.choice(available)
+    return LIFESTYLE_IMAGES_DIR / pick_lru("lifestyle", scene.replace("-", "_"), [img.name for img in available])
 
 
-def pick_screen_recording(recent_entries: list[dict]) -> Path:
-    """Pick a screen recording."""
+def pick_screen_recording() -> Path:
+    """Pick the least recently used screen recording."""
     available = list_screen_recordings()
     if not available:
         print(f"ERROR: No screen recordings in {SCREEN_RECORDINGS_DIR}")
         sys.exit(1)
 
-    recent_used = {e.get("screen_recording", "") for e in recent_entries[-7:]}
-    unused = [r for r in available if r.name not in recent_used]
-    return random.choice(unused) if unused else random.choice(available)
+    return SCREEN_RECORDINGS_DIR / pick_lru("lifestyle", "screen_rec", [r.name for r in available])
 
 
 # ─── Skill context ───────────────────────────────────
 
-def load_skill_context() -> str:
-    """Load skill files for Claude system prompt."""
+def load_skill_context() -> list[str]:
+    """Load skill files for Claude system prompt, as [skills, memory] cache blocks within the token budget."""
     files = [
-        "content/content-mix.md",
-        "content/hook-architecture.md",
-        "content/what-never-works.md",
-        "journal-lock.md",
+        ("content/content-mix.md", 2),
+        ("content/hook-architecture.md", 1),
+        ("content/what-never-works.md", 0),
+        ("journal-lock.md", 0),
     ]
-    parts = []
-    for f in files:
-        path = SKILLS_DIR / f
-        if path.exists():
-            parts.append(f"--- {f} ---\n{path.read_text()}")
-    # Memory files
-    for f in ["post-performance.md", "failure-log.md"]:
-        path = MEMORY_DIR / f
-        if path.exists():
-            parts.append(f"--- memory/{f} ---\n{path.read_text()}")
-    return "\n\n".join(parts)
+    memory_files = [("post-performance.md", 2), ("failure-log.md", 0)]
+    blocks, report = budget_context([
+        [(SKILLS_DIR / f, f"--- {f} ---", priority) for f, priority in files],
+        [(MEMORY_DIR / f, f"--- memory/{f} ---", priority) for f, priority in memory_files],
+    ], reserve=[0, MEMORY_CONTEXT_RESERVE])
+    print(f"  {format_report(report)}")
+    return blocks
 
 
 # ─── Text generation ─────────────────────────────────
@@ -208,7 +212,7 @@ Return ONLY valid JSON:
 }"""
 
 
-def generate_text(context: str, recent_entries: list[dict]) -> dict:
+def generate_text(context: list[str], recent_entries: list[dict]) -> dict:
     """Call Claude to generate text overlays, avoiding recent outputs."""
     import anthropic
 
@@ -235,13 +239,18 @@ def generate_text(context: str, recent_entries: list[dict]) -> dict:
     angle = random.choice(["relatable", "discovery", "challenge", "transformation", "dialogue"])
     angle_hint = f"\n\nFor THIS reel, use the \"{angle}\" angle."
 
+    skills, memory = context
     client = anthropic.Anthropic()
     response = client.messages.create(
-        model="claude-sonnet-4-6",
+        model=MODEL,
         max_tokens=400,
-        system=f"You are the content engine for a lifestyle reel pipeline. Follow the rules in these skill files:\n\n{context}",
+        system=system_blocks(
+            f"You are the content engine for a lifestyle reel pipeline. Follow the rules in these skill files:\n\n{skills}",
+            memory,
+        ),
         messages=[{"role": "user", "content": USER_PROMPT + avoid_block + angle_hint}],
     )
+    print(f"  {format_usage(log_usage('lifestyle_reel.generate_text', MODEL, response.usage))}")
 
     raw = response.content[0].text.strip()
     if raw.startswith("```"):
@@ -251,10 +260,21 @@ def generate_text(context: str, recent_entries: list[dict]) -> dict:
 
 # ─── ffmpeg helpers ──────────────────────────────────
 
-def run_ffmpeg(args, label=""):
-    """Run ffmpeg. Returns True on success."""
+def run_ffmpeg(args, label="", duration=None):
+    """Run ffmpeg. Returns True on success.
+
+    When launched by the dashboard, progress updates are printed as marker
+    lines so the run status can show percent / fps / speed / ETA.
+    """
     cmd = ["ffmpeg", "-y", "-hide_banner", "-loglevel", "warning"] + args
-    result = subprocess.run(cmd, capture_output=True, text=True)
+    if progress_enabled():
+        result = run_ffmpeg_with_progress(
+            cmd, duration,
+            lambda p: print(format_progress_line(label, p), flush=True),
+            label=label,
+        )
+    else:
+        result = run_slotted(cmd, label)
     if result.returncode != 0:
         print(f"  ffmpeg error ({label}): {result.stderr}")
         return False
@@ -294,13 +314,53 @@ def build_drawtext(text, font_path, font_size=55, y_ratio=0.45):
         )
 
 
-def build_scene_image(image_path, text, output_path, duration, font_path,
-                      font_size=55, y_ratio=0.45):
-    """Build a scene from a static image with Ken Burns + text overlay."""
+def _image_cache_key(image_path):
+    """Cache key for a source image — changes whenever the file is replaced."""
+    st = image_path.stat()
+    payload = f"{image_path.name}:{st.st_size}:{st.st_mtime_ns}:{WIDTH}x{HEIGHT}"
+    return hashlib.sha256(payload.encode()).hexdigest()[:16]
+
+
+def prescale_image(image_path):
+    """Return a cached 1080x1920 scaled + center-cropped copy of a lifestyle image."""
+    CACHE_DIR.mkdir(parents=True, exist_ok=True)
+    out = CACHE_DIR / f"{image_path.stem}_{_image_cache_key(image_path)}.png"
+    if out.exists():
+        return out
+
+    partial = out.with_suffix(".partial.png")
+    ok = run_ffmpeg([
+        "-i", str(image_path),
+        "-vf", (
+            f"scale={WIDTH}:{HEIGHT}:force_original_aspect_ratio=increase,"
+            f"crop={WIDTH}:{HEIGHT}"
+        ),
+        "-frames:v", "1",
+        str(partial),
+    ], f"prescale {image_path.name}")
+    if not ok:
+        partial.unlink(missing_ok=True)
+        return None
+    partial.rename(out)
+    return out
+
+
+def build_ken_burns_clip(image_path, duration):
+    """Return a cached text-free Ken Burns clip for (image, duration).
+
+    zoompan is the slow part of a lifestyle reel, and the image pool is
+    small, so the motion clip is rendered once from the pre-scaled image and
+    reused by every reel that picks the same image.
+    """
+    scaled = prescale_image(image_path)
+    if not scaled:
+        return None
+
     total_frames = int(duration * FPS)
-    drawtext = build_drawtext(text, font_path, font_size, y_ratio)
+    out = CACHE_DIR / f"{scaled.stem}_kb{total_frames}.mp4"
+    if out.exists():
+        return out
 
-    # zoompan creates video from image, then text overlay, then normalize
     vf = (
         f"zoompan=z='1+0.05*on/{total_frames}'"
         f":x='iw/2-(iw/zoom/2)'"
@@ -308,13 +368,49 @@ def build_scene_image(image_path, text, output_path, duration, font_path,
         f":d={total_frames}"
         f":s={WIDTH}x{HEIGHT}"
         f":fps={FPS}"
-        f",{drawtext}"
         f",format=yuv420p"
     )
+    partial = out.with_suffix(".partial.mp4")
+    ok = run_ffmpeg([
+        "-i", str(scaled),
+        "-vf", vf,
+        "-frames:v", str(total_frames),
+        "-an",
+        "-c:v", "libx264", "-b:v", BITRATE,
+        "-profile:v", "high", "-level", "4.0",
+        str(partial),
+    ], f"ken burns {image_path.name}", duration=duration)
+    if not ok:
+        partial.unlink(missing_ok=True)
+        return None
+    partial.rename(out)
+    return out
+
+
+def warm_cache():
+    """Pre-build scaled images and Ken Burns clips for every lifestyle image."""
+    for scene, duration in (("scene-1", SCENE_1_DURATION), ("scene-2", SCENE_2_DURATION)):
+        for image_path in list_images(scene):
+            clip = build_ken_burns_clip(image_path, duration)
+            status = clip.name if clip else "FAILED"
+            print(f"  {image_path.name} ({duration}s): {status}")
+
+
+def build_scene_image(image_path, text, output_path, duration, font_path,
+                      font_size=55, y_ratio=0.45):
+    """Build a scene from a static image with Ken Burns + text overlay.
+
+    Only the text is rendered per reel; the motion comes from the cached base clip.
+    """
+    base_clip = build_ken_burns_clip(image_path, duration)
+    if not base_clip:
+        return False
+
+    drawtext = build_drawtext(text, font_path, font_size, y_ratio)
 
     return run_ffmpeg([
-        "-loop", "1", "-i", str(image_path),
-        "-vf", vf,
+        "-i", str(base_clip),
+        "-vf", f"{drawtext},format=yuv420p",
         "-t", str(duration),
         "-an",
         "-c:v", "libx264", "-b:v", BITRATE,
@@ -348,7 +444,7 @@ def build_scene_screen(recording_path, text, output_path, font_path,
 
 
 def concatenate(clip_paths, output_path):
-    """Concatenate clips using ffmpeg concat demuxer."""
+    """Concatenate clips, writing the preview proxy + poster in the same pass."""
     list_path = clip_paths[0].parent / "concat_list.txt"
     with open(list_path, "w") as f:
         for p in clip_paths:
@@ -357,9 +453,8 @@ def concatenate(clip_paths, output_path):
     ok = run_ffmpeg([
         "-f", "concat", "-safe", "0",
         "-i", str(list_path),
-        "-c", "copy",
-        "-movflags", "+faststart",
-        str(output_path),
+        *master_output_args(output_path),
+        *preview_output_args(output_path),
     ], "concat")
 
     if list_path.exists():
@@ -370,13 +465,9 @@ def concatenate(clip_paths, output_path):
 # ─── Upload ──────────────────────────────────────────
 
 def upload_to_drive(file_path):
-    """Upload to Google Drive via rclone."""
-    print(f"  Uploading to Google Drive ({GDRIVE_FOLDER})...")
-    result = os.system(f"rclone copy {file_path} gdrive:{GDRIVE_FOLDER}/")
-    if result == 0:
-        print(f"  Uploaded: {file_path.name}")
-    else:
-        print(f"  Upload failed (exit code {result})")
+    """Queue the reel for Google Drive upload; the upload worker sends it in the background."""
+    enqueue_upload(file_path, remote=f"gdrive:{GDRIVE_FOLDER}/")
+    print(f"  Queued for Google Drive upload ({GDRIVE_FOLDER}): {file_path.name}")
 
 
 # ─── Logging ─────────────────────────────────────────
@@ -390,15 +481,12 @@ def log_run(entry: dict):
 
 
 def update_asset_usage(scene_1_img: str, scene_2_img: str, screen_rec: str):
-    """Append to memory/asset-usage.md."""
-    path = MEMORY_DIR / "asset-usage.md"
-    line = f"| {date.today().isoformat()} | lifestyle | {scene_1_img} | {scene_2_img} | {screen_rec} |"
-    if path.exists():
-        content = path.read_text()
-        path.write_text(content.rstrip() + "\n" + line + "\n")
-    else:
-        header = "## Recent Asset Usage\n\n| Date | Type | Scene 1 | Scene 2 | Screen Recording |\n|------|------|---------|---------|------------------|\n"
-        path.write_text(header + line + "\n")
+    """Record the reel's assets in the usage log (regenerates memory/asset-usage.md)."""
+    asset_usage.record(
+        "lifestyle",
+        {"scene_1": scene_1_img, "scene_2": scene_2_img, "screen_rec": screen_rec},
+        account="lifestyle",
+    )
 
 
 # ─── Main pipeline ───────────────────────────────────
@@ -412,8 +500,15 @@ def main():
     parser.add_argument("--scene-3-text", help="Override scene 3 text")
     parser.add_argument("--scene-1-image", help="Force specific scene 1 image filename")
     parser.add_argument("--scene-2-image", help="Force specific scene 2 image filename")
+    parser.add_argument("--warm-cache", action="store_true",
+                        help="Pre-build scaled images + Ken Burns clips for every image, then exit")
     args = parser.parse_args()
 
+    if args.warm_cache:
+        print("Warming lifestyle image cache...")
+        warm_cache()
+        return
+
     print("=" * 50)
     print("Journal Lock — Lifestyle Reel Pipeline")
     print("=" * 50)
@@ -428,7 +523,7 @@ def main():
             print(f"ERROR: Scene 1 image not found: {scene_1_path}")
             sys.exit(1)
     else:
-        scene_1_path = pick_image("scene-1", recent)
+        scene_1_path = pick_image("scene-1")
 
     if args.scene_2_image:
         scene_2_path = LIFESTYLE_IMAGES_DIR / args.scene_2_image
@@ -436,9 +531,9 @@ def main():
             print(f"ERROR: Scene 2 image not found: {scene_2_path}")
             sys.exit(1)
     else:
-        scene_2_path = pick_image("scene-2", recent)
+        scene_2_path = pick_image("scene-2")
 
-    screen_rec_path = pick_screen_recording(recent)
+    screen_rec_path = pick_screen_recording()
 
     print(f"  Scene 1: {scene_1_path.name}")
     print(f"  Scene 2: {scene_2_path.name}")
@@ -492,11 +587,11 @@ def main():
     ts = datetime.now().strftime("%Y%m%d_%H%M%S")
     out_path = OUTPUT_DIR / f"lifestyle_journallock_{ts}.mp4"
 
-    with tempfile.TemporaryDirectory(prefix="lifestyle_") as tmp:
+    with scratch_dir("lifestyle_", estimate_mb([screen_rec_path], stills=2)) as tmp:
         tmp = Path(tmp)
-        scene_1_out = tmp / "01_scene1.mp4"
-        scene_2_out = tmp / "02_scene2.mp4"
-        scene_3_out = tmp / "03_scene3.mp4"
+        scene_1_out = intermediate_path(tmp, "01_scene1.mp4", estimate_mb(stills=1))
+        scene_2_out = intermediate_path(tmp, "02_scene2.mp4", estimate_mb(stills=1))
+        scene_3_out = intermediate_path(tmp, "03_scene3.mp4", estimate_mb([screen_rec_path]))
 
         # Scene 1: lifestyle image + hook (center, 48px)
         print("  Building scene 1 (hook)...")
@@ -0,0 +1,351 @@
+#!/usr/bin/env python3
+"""
+Render benchmark — times every render path against synthetic fixtures.
+
+Fixture clips and images are generated with lavfi (testsrc2 / color) at the
+same resolutions and codecs as the real assets, so runs are deterministic and
+fully offline: no API calls, no Drive uploads, no render cache.
+
+Usage:
+  python3 scripts/render_bench.py run                          # all paths, 3 runs each → JSON on stdout
+  python3 scripts/render_bench.py run --runs 5 --out bench.json
+  python3 scripts/render_bench.py run --paths assemble_video,video_stitcher
+  python3 scripts/render_bench.py run --warm                   # measure with warm lifestyle/autojournal caches
+  python3 scripts/render_bench.py run --update-baseline        # store result as the baseline
+  python3 scripts/render_bench.py compare bench.json           # flag regressions vs the baseline
+  python3 scripts/render_bench.py compare new.json --baseline old.json --threshold 5
+"""
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from argparse import Namespace
+from datetime import datetime, timezone
+from pathlib import Path
+
+# ─── Config ──────────────────────────────────────────
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+SCRIPTS_DIR = PROJECT_ROOT / "scripts"
+FIXTURES_DIR = PROJECT_ROOT / "video_output" / ".cache" / "bench-fixtures"
+BASELINE_PATH = PROJECT_ROOT / "logs" / "render_bench_baseline.json"
+
+# Bump when fixture specs change — old results stop being comparable
+FIXTURE_VERSION = 1
+
+RENDER_PATHS = ["assemble_video", "video_stitcher", "lifestyle_reel", "autojournal_reel"]
+
+HOOK_TEXT = "POV: you finally stopped doomscrolling before bed"
+REACTION_TEXT = "wait this actually works??"
+PAYOFF_TEXT = "Journal first, then the apps unlock"
+
+# Lower is better for these; encode_fps is the one higher-is-better metric
+COST_METRICS = ["wall_s", "cpu_s", "peak_rss_mb"]
+RATE_METRICS = ["encode_fps"]
+
+
+# ─── Fixtures ────────────────────────────────────────
+
+# name → (lavfi video source, duration or None for a still, extra output args)
+# Shapes match the real assets: AI clips are 720x1280 @ 24fps with audio,
+# iPhone screen recordings are 886x1920 @ 60fps, lifestyle images are 1024x1536 PNG.
+FIXTURES = {
+    "hook.mp4": ("testsrc2=s=720x1280:r=24", 2.5, ["-c:v", "libx264", "-pix_fmt", "yuv420p",
+                                                    "-c:a", "aac", "-b:a", "128k"]),
+    "reaction.mp4": ("testsrc2=s=720x1280:r=24", 1.5, ["-c:v", "libx264", "-pix_fmt", "yuv420p",
+                                                        "-c:a", "aac", "-b:a", "128k"]),
+    "screen.mp4": ("testsrc2=s=886x1920:r=60", 12, ["-c:v", "libx264", "-pix_fmt", "yuv420p",
+                                                     "-b:v", "6000k"]),
+    "scene1.png": ("testsrc2=s=1024x1536", None, []),
+    "scene2.png": ("color=c=0xC4775A:s=1024x1536", None, []),
+}
+
+
+def ensure_fixtures(fixtures_dir: Path) -> Path:
+    """Generate any missing fixture files. Returns the versioned fixture dir."""
+    out_dir = fixtures_dir / f"v{FIXTURE_VERSION}"
+    out_dir.mkdir(parents=True, exist_ok=True)
+    for name, (source, duration, extra) in FIXTURES.items():
+        path = out_dir / name
+        if path.exists():
+            continue
+        args = ["ffmpeg", "-y", "-hide_banner", "-loglevel", "error", "-f", "lavfi", "-i", source]
+        if duration is None:
+            args += ["-frames:v", "1"]
+        else:
+            if "-c:a" in extra:
+                args += ["-f", "lavfi", "-i", f"sine=frequency=440:duration={duration}"]
+            args += ["-t", str(duration)]
+        args += extra
+        partial = path.with_name(f"partial_{name}")
+        result = subprocess.run(args + [str(partial)], capture_output=True, text=True)
+        if result.returncode != 0:
+            partial.unlink(missing_ok=True)
+            raise RuntimeError(f"fixture {name} failed: {result.stderr.strip()}")
+        partial.rename(path)
+        print(f"  fixture: {name}", file=sys.stderr)
+    return out_dir
+
+
+# ─── Render paths (run inside a child process) ───────
+
+def _render_assemble_video(fx: Path, out: Path, cache_dir: Path) -> bool:
+    sys.path.insert(0, str(SCRIPTS_DIR))
+    import assemble_video
+    result = assemble_video.assemble(Namespace(
+        hook_clip=str(fx / "hook.mp4"), hook_text=HOOK_TEXT,
+        screen_recording=str(fx / "screen.mp4"),
+        reaction_clip=str(fx / "reaction.mp4"), reaction_text=REACTION_TEXT,
+        speed=2.5, output=str(out), font=None,
+        no_upload=True, no_cache=True, dry_run=False,
+    ))
+    return result is not None
+
+
+def _render_video_stitcher(fx: Path, out: Path, cache_dir: Path) -> bool:
+    sys.path.insert(0, str(PROJECT_ROOT / "dashboard" / "backend"))
+    from services import video_stitcher
+    font_path = video_stitcher.find_font()
+    scenes = [(fx / "hook.mp4", HOOK_TEXT, 1.0), (fx / "screen.mp4", "", 2.0),
+              (fx / "reaction.mp4", REACTION_TEXT, 1.0)]
+    log_lines = []
+    with tempfile.TemporaryDirectory(prefix="bench_stitch_") as tmp:
+        processed = []
+        for i, (src, text, speed) in enumerate(scenes):
+            dest = Path(tmp) / f"{i:02d}_scene.mp4"
+            if not video_stitcher._process_scene(src, dest, text, speed, font_path, log_lines):
+                print("\n".join(log_lines))
+                return False
+            processed.append(dest)
+        ok = video_stitcher._concatenate(processed, out, log_lines)
+    if not ok:
+        print("\n".join(log_lines))
+    return ok
+
+
+def _render_lifestyle_reel(fx: Path, out: Path, cache_dir: Path) -> bool:
+    sys.path.insert(0, str(SCRIPTS_DIR))
+    import lifestyle_reel as lr
+    lr.CACHE_DIR = cache_dir / "lifestyle"
+    font_path = lr.find_font(bold=True)
+    with tempfile.TemporaryDirectory(prefix="bench_lifestyle_") as tmp:
+        tmp = Path(tmp)
+        parts = [tmp / "01.mp4", tmp / "02.mp4", tmp / "03.mp4"]
+        return (
+            lr.build_scene_image(fx / "scene1.png", HOOK_TEXT, parts[0], lr.SCENE_1_DURATION, font_path)
+            and lr.build_scene_image(fx / "scene2.png", REACTION_TEXT, parts[1], lr.SCENE_2_DURATION, font_path)
+            and lr.build_scene_screen(fx / "screen.mp4", PAYOFF_TEXT, parts[2], font_path)
+            and lr.concatenate(parts, out)
+        )
+
+
+def _render_autojournal_reel(fx: Path, out: Path, cache_dir: Path) -> bool:
+    sys.path.insert(0, str(SCRIPTS_DIR))
+    import autojournal_reel as aj
+    aj.SCENE1_CACHE_DIR = cache_dir / "autojournal-scene1"
+    with tempfile.TemporaryDirectory(prefix="bench_autojournal_") as tmp:
+        tmp = Path(tmp)
+        scene1 = aj.build_scene1(HOOK_TEXT, "journal", tmp)
+        scene2 = scene1 and aj.build_scene2(fx / "screen.mp4", PAYOFF_TEXT, tmp)
+        return bool(scene2) and aj.concatenate([scene1, scene2], out)
+
+
+RENDERERS = {
+    "assemble_video": _render_assemble_video,
+    "video_stitcher": _render_video_stitcher,
+    "lifestyle_reel": _render_lifestyle_reel,
+    "autojournal_reel": _render_autojournal_reel,
+}
+
+
+# ─── Measurement ─────────────────────────────────────
+
+def count_frames(path: Path) -> int:
+    """Video frame count of an output file via ffprobe."""
+    result = subprocess.run(
+        ["ffprobe", "-v", "error", "-select_streams", "v:0", "-count_packets",
+         "-show_entries", "stream=nb_read_packets", "-of", "csv=p=0", str(path)],
+        capture_output=True, text=True,
+    )
+    try:
+        return int(result.stdout.strip())
+    except ValueError:
+        return 0
+
+
+def measure_once(render_path: str, fx: Path, work: Path, cache_dir: Path, run_index: int) -> dict:
+    """Render once in a child process; CPU and peak RSS come from wait4 on that child."""
+    out = work / f"{render_path}_{run_index}.mp4"
+    log_path = work / f"{render_path}_{run_index}.log"
+    env = {k: v for k, v in os.environ.items() if k != "OPENCLAW_FFMPEG_PROGRESS"}
+    cmd = [sys.executable, __file__, "_render", render_path, str(fx), str(out), str(cache_dir)]
+
+    start = time.perf_counter()
+    with open(log_path, "w") as log:
+        proc = subprocess.Popen(cmd, cwd=str(PROJECT_ROOT), stdout=log, stderr=subprocess.STDOUT, env=env)
+        _, status, usage = os.wait4(proc.pid, 0)
+    wall = time.perf_counter() - start
+    proc.returncode = os.waitstatus_to_exitcode(status)
+
+    if proc.returncode != 0 or not out.exists():
+        tail = log_path.read_text()[-2000:]
+        raise RuntimeError(f"{render_path} run {run_index} failed:\n{tail}")
+
+    frames = count_frames(out)
+    result = {
+        "wall_s": round(wall, 3),
+        "cpu_s": round(usage.ru_utime + usage.ru_stime, 3),
+        "peak_rss_mb": round(usage.ru_maxrss / 1024, 1),  # ru_maxrss is KB on Linux
+        "encode_fps": round(frames / wall, 1) if wall else 0.0,
+        "frames": frames,
+        "output_bytes": out.stat().st_size,
+    }
+    out.unlink()
+    return result
+
+
+def summarize(runs: list[dict]) -> dict:
+    keys = COST_METRICS + RATE_METRICS + ["output_bytes"]
+    return {
+        "median": {k: statistics.median(r[k] for r in runs) for k in keys},
+        "min": {k: min(r[k] for r in runs) for k in keys},
+        "max": {k: max(r[k] for r in runs) for k in keys},
+    }
+
+
+def environment() -> dict:
+    ffmpeg = subprocess.run(["ffmpeg", "-version"], capture_output=True, text=True).stdout
+    git = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=str(PROJECT_ROOT),
+                         capture_output=True, text=True).stdout.strip()
+    return {
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "host": platform.node(),
+        "cpu_count": os.cpu_count(),
+        "python": platform.python_version(),
+        "ffmpeg": ffmpeg.split("\n", 1)[0],
+        "git_rev": git or None,
+        "fixture_version": FIXTURE_VERSION,
+    }
+
+
+def run_bench(args) -> dict:
+    paths = args.paths.split(",") if args.paths else RENDER_PATHS
+    unknown = set(paths) - set(RENDERERS)
+    if unknown:
+        sys.exit(f"Unknown render path(s): {', '.join(sorted(unknown))}")
+
+    fx = ensure_fixtures(Path(args.fixtures_dir))
+    report = {"meta": {**environment(), "runs": args.runs, "warm": args.warm}, "results": {}}
+
+    with tempfile.TemporaryDirectory(prefix="render_bench_") as work:
+        work = Path(work)
+        for render_path in paths:
+            warm_cache = work / f"{render_path}_cache"
+            if args.warm:
+                # Prime once (unmeasured) so every measured run sees warm caches
+                measure_once(render_path, fx, work, warm_cache, -1)
+
+            runs = []
+            for i in range(args.runs):
+                cache_dir = warm_cache if args.warm else work / f"{render_path}_cache_{i}"
+                run = measure_once(render_path, fx, work, cache_dir, i)
+                print(f"  {render_path} #{i + 1}: {run['wall_s']:.2f}s wall, "
+                      f"{run['cpu_s']:.2f}s cpu, {run['encode_fps']} fps", file=sys.stderr)
+                runs.append(run)
+            report["results"][render_path] = {"runs": runs, **summarize(runs)}
+    return report
+
+
+# ─── Compare ─────────────────────────────────────────
+
+def compare(baseline: dict, current: dict, threshold_pct: float) -> list[str]:
+    """Print a metric-by-metric diff of medians. Returns regression descriptions."""
+    regressions = []
+    if baseline["meta"].get("fixture_version") != current["meta"].get("fixture_version"):
+        print("WARNING: fixture versions differ — results are not directly comparable")
+    if baseline["meta"].get("host") != current["meta"].get("host"):
+        print(f"WARNING: baseline from {baseline['meta'].get('host')}, "
+              f"current from {current['meta'].get('host')}")
+
+    print(f"{'path':<18} {'metric':<13} {'baseline':>11} {'current':>11} {'change':>9}")
+    for render_path, cur in current["results"].items():
+        base = baseline["results"].get(render_path)
+        if not base:
+            print(f"{render_path:<18} (no baseline)")
+            continue
+        for metric in COST_METRICS + RATE_METRICS + ["output_bytes"]:
+            b, c = base["median"][metric], cur["median"][metric]
+            change = (c - b) / b * 100 if b else 0.0
+            worse = change > threshold_pct if metric in COST_METRICS else change < -threshold_pct
+            flag = ""
+            if metric == "output_bytes":
+                flag = "  (size changed)" if abs(change) > threshold_pct else ""
+            elif worse:
+                flag = "  ← REGRESSION"
+                regressions.append(f"{render_path} {metric}: {b} → {c} ({change:+.1f}%)")
+            print(f"{render_path:<18} {metric:<13} {b:>11} {c:>11} {change:>+8.1f}%{flag}")
+    return regressions
+
+
+# ─── Main ────────────────────────────────────────────
+
+def main():
+    if len(sys.argv) > 1 and sys.argv[1] == "_render":
+        # Child-process entry point used by measure_once
+        render_path, fx, out, cache_dir = sys.argv[2:6]
+        ok = RENDERERS[render_path](Path(fx), Path(out), Path(cache_dir))
+        sys.exit(0 if ok else 1)
+
+    parser = argparse.ArgumentParser(description="Benchmark the reel render paths on synthetic fixtures")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    run_p = sub.add_parser("run", help="Run the benchmark and print a JSON report")
+    run_p.add_argument("--runs", type=int, default=3, help="Measured runs per render path (default: 3)")
+    run_p.add_argument("--paths", help=f"Comma-separated subset of: {', '.join(RENDER_PATHS)}")
+    run_p.add_argument("--warm", action="store_true", help="Reuse lifestyle/autojournal caches across runs")
+    run_p.add_argument("--out", help="Write the JSON report here instead of stdout")
+    run_p.add_argument("--update-baseline", action="store_true", help=f"Also save as {BASELINE_PATH.name}")
+    run_p.add_argument("--fixtures-dir", default=str(FIXTURES_DIR), help="Where generated fixtures are kept")
+
+    cmp_p = sub.add_parser("compare", help="Compare a report against the baseline")
+    cmp_p.add_argument("report", help="JSON report from `run`")
+    cmp_p.add_argument("--baseline", default=str(BASELINE_PATH), help="Baseline report")
+    cmp_p.add_argument("--threshold", type=float, default=10.0,
+                       help="Percent change that counts as a regression (default: 10)")
+
+    args = parser.parse_args()
+
+    if args.command == "run":
+        report = run_bench(args)
+        blob = json.dumps(report, indent=2)
+        if args.out:
+            Path(args.out).write_text(blob + "\n")
+        else:
+            print(blob)
+        if args.update_baseline:
+            BASELINE_PATH.parent.mkdir(parents=True, exist_ok=True)
+            BASELINE_PATH.write_text(blob + "\n")
+            print(f"Baseline saved: {BASELINE_PATH}", file=sys.stderr)
+        return
+
+    baseline_path = Path(args.baseline)
+    if not baseline_path.exists():
+        sys.exit(f"No baseline at {baseline_path} — run with --update-baseline first")
+    regressions = compare(json.loads(baseline_path.read_text()),
+                          json.loads(Path(args.report).read_text()), args.threshold)
+    if regressions:
+        print(f"\n{len(regressions)} regression(s) over {args.threshold:.0f}%:")
+        for r in regressions:
+            print(f"  {r}")
+        sys.exit(1)
+    print("\nNo regressions.")
+
+
+if __name__ == "__main__":
+    main()
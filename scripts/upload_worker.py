@@ -0,0 +1,50 @@
+#!/usr/bin/env python3
+"""Drain the Google Drive upload queue.
+
+Started automatically when a render enqueues a reel, and by the dispatcher
+whenever queued uploads are waiting. Only one worker runs at a time.
+
+Usage:
+  python3 upload_worker.py            # upload everything pending, then exit
+  python3 upload_worker.py --status   # print queue counts
+  python3 upload_worker.py --retry-failed   # re-queue uploads that gave up
+"""
+
+import argparse
+import json
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+
+# Add backend to path so we can reuse the service
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "dashboard" / "backend"))
+
+from services.upload_queue import drain, queue_stats, retry_failed
+
+
+def log(msg: str) -> None:
+    print(f"[{datetime.now().isoformat(timespec='seconds')}] {msg}", flush=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Upload queued reels to Google Drive")
+    parser.add_argument("--status", action="store_true", help="Print queue stats and exit")
+    parser.add_argument("--retry-failed", action="store_true",
+                        help="Reset failed uploads to pending before draining")
+    args = parser.parse_args()
+
+    if args.status:
+        print(json.dumps(queue_stats(), indent=2))
+        return
+
+    if args.retry_failed:
+        log(f"Re-queued {retry_failed()} failed upload(s)")
+
+    start = time.time()
+    uploaded = drain(log)
+    log(f"Done. {uploaded} file(s) uploaded in {time.time() - start:.0f}s")
+
+
+if __name__ == "__main__":
+    main()